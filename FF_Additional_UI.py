@@ -11,21 +11,19 @@
 # Imports
 import logging
 import os
-from json import load, dump
 from subprocess import run
 from sys import platform
 from time import time, ctime
-from unicodedata import normalize
 
 # PySide6 Gui Imports
-from PySide6.QtCore import Qt, Signal, QObject
-from PySide6.QtGui import QFont, QPixmap, QColor
+from PySide6.QtCore import Qt, Signal, QObject, QAbstractListModel, QModelIndex, QStringListModel, QThreadPool
+from PySide6.QtGui import QFont, QPixmap, QColor, QAction
 from PySide6.QtWidgets import QMessageBox, QComboBox, QLabel, QVBoxLayout, QWidget, QMainWindow, QLineEdit, QCompleter
 
 # Projects Libraries
 import FF_Files
-import FF_Menubar
-import FF_Settings
+import FF_Profiling
+import FF_Settings_Store
 
 # keeping a list of all created icons
 icons = set()
@@ -45,8 +43,19 @@ class DirectoryEntry(QLineEdit):
         self.setText(FF_Files.SELECTED_DIR)
         # Execute the validate_dir function if text is changed
         self.textChanged.connect(self.validate_dir)
-        # Loading Completions now
-        self.complete_path(FF_Files.SELECTED_DIR, check=False)
+        # Completions are loaded after the main window was painted (see File-Find.py)
+        self.completer_model = QStringListModel(self)
+        self.setCompleter(QCompleter(self.completer_model, self.parent))
+        self.completion_path = None
+        self.completion_thread_pool = QThreadPool(self)
+
+        # Receiving the listed sub folders in the UI thread
+        class CompletionSignals(QObject):
+            finished = Signal(str, list)
+
+        self.completion_signals = CompletionSignals()
+        self.completion_signals.finished.connect(self.set_completions)
+
         # If app is sandboxed the user must click on the directory for permission
         if FF_Files.IS_SANDBOXED:
             self.setReadOnly(True)
@@ -91,37 +100,29 @@ class DirectoryEntry(QLineEdit):
             # Change color
             self.change_color(FF_Files.RED_LIGHT_THEME_COLOR, FF_Files.RED_DARK_THEME_COLOR)
 
-    # Auto complete paths
+    # Auto complete paths, the sub folders are listed in the background,
+    # so large folders or slow network drives don't freeze the main window while typing
     def complete_path(self, path, check=True):
+        # Check if "/" is at end of inputted path
+        # If executed at launch skip check because home path doesn't end with a "/"
+        if check and not path.endswith(os.sep):
+            return
 
-        # Adds all folders in path into paths
-        def get_paths():
-            paths = []
-            for list_folder in os.listdir(path):
-                if os.path.isdir(os.path.join(FF_Files.SELECTED_DIR, list_folder)):
-                    # Normalising the Unicode form to deal with special characters (e.g. ä, ö, ü) on macOS
-                    normalised_path = normalize("NFC", os.path.join(FF_Files.SELECTED_DIR, list_folder))
-                    paths.append(normalised_path)
+        # Only the completions for the last requested path are used
+        self.completion_path = path
 
-            # Returns the list
-            return paths
+        def list_subfolders():
+            self.completion_signals.finished.emit(path, FF_Files.get_subfolders(path))
 
-        # Check if "/" is at end of inputted path
-        if check:
-            # Going through all paths to look if auto-completion should be loaded
-            if path.endswith(os.sep):
-                completer_paths = get_paths()
-                logging.debug("Changed QCompleter")
-            else:
-                return
-        # If executed at launch skip check because home path doesn't end with a "/"
-        else:
-            completer_paths = get_paths()
-            logging.debug("Changed QCompleter")
+        self.completion_thread_pool.start(list_subfolders)
+
+    # Replacing the completions, when the sub folders were listed
+    def set_completions(self, path, completer_paths):
+        if path != self.completion_path:
+            return
 
-        # Set the saved list as Completer
-        directory_line_edit_completer = QCompleter(completer_paths, parent=self.parent)
-        self.setCompleter(directory_line_edit_completer)
+        self.completer_model.setStringList(completer_paths)
+        logging.debug("Changed QCompleter")
 
     def style_changed(self, scheme):
         if scheme == Qt.ColorScheme.Dark:
@@ -367,6 +368,37 @@ class CheckableComboBox(QComboBox):
             item.setCheckState(Qt.CheckState.Unchecked)
 
 
+# A model for displaying a long list of files in a QListView, items are only created when they are displayed,
+# so no QListWidgetItem has to be created for every file.
+# Colors, icons and fonts of single rows are set with setData() like with a QListWidgetItem
+class FileListModel(QAbstractListModel):
+    def __init__(self, files: list[str], parent=None):
+        super().__init__(parent)
+        self.files = files
+        # Roles set for single rows, like {(row, role): value}
+        self.row_roles = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        # A list has no children
+        if parent.isValid():
+            return 0
+        return len(self.files)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.files[index.row()]
+        return self.row_roles.get((index.row(), role))
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid():
+            return False
+        self.row_roles[(index.row(), role)] = value
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+
 class PopUps:
     # Error PopUp
     @staticmethod
@@ -433,6 +465,8 @@ class PopUps:
             msg_info.setWindowTitle(title)
             msg_info.show()
 
+            # Imported here, because FF_Menubar isn't needed at launch
+            import FF_Menubar
             FF_Menubar.MenuBar(parent=msg_info, window="info_box", listbox=None)
 
             # Return the Value of the Message Box
@@ -441,7 +475,7 @@ class PopUps:
     # Ask to search MessageBoy
     @staticmethod
     def show_delete_question(parent, file):
-        if FF_Settings.SettingsWindow.load_setting("popup")["delete_question"]:
+        if FF_Settings_Store.SETTINGS.get_dict("popup")["delete_question"]:
             if QMessageBox.information(parent, "Are You Sure You Want To Delete This File?",
                                        f"Do you want to delete {file}?",
                                        QMessageBox.StandardButton.Ok | QMessageBox.StandardButton.Cancel) \
@@ -458,10 +492,8 @@ def welcome_popups(parent, force_popups=False):
     # Debug
     logging.debug("Testing for PopUps...")
 
-    # Loading already displayed Popups with json
-    with open(os.path.join(FF_Files.FF_LIB_FOLDER, "Settings")) as settings_file:
-        settings = load(settings_file)
-        popup_dict = settings["popup"]
+    # Loading already displayed Popups
+    popup_dict = FF_Settings_Store.SETTINGS.get_dict("popup")
 
     if popup_dict["FF_welcome"] or force_popups:
         # Debug
@@ -574,9 +606,52 @@ def welcome_popups(parent, force_popups=False):
     # Setting PopUp File
     popup_dict["FF_ver_welcome"] = False
     popup_dict["FF_welcome"] = False
-    settings["popup"] = popup_dict
-    with open(os.path.join(FF_Files.FF_LIB_FOLDER, "Settings"), "w") as settings_file:
-        dump(settings, settings_file)
+    FF_Settings_Store.SETTINGS.set("popup", popup_dict)
+
+
+# Adding the "Profile next Search" toggle to a menu,
+# the check mark is updated when the menu is shown, because profiling is requested for all windows
+def add_profile_action(parent, menu):
+    def toggle_profiling(enabled):
+        FF_Profiling.request_profile(enabled)
+        if enabled:
+            PopUps.show_info_messagebox(
+                "Profiling next Search",
+                "The next search, finding of duplicated files or comparing of searches will be profiled.\n\n"
+                "The profile and a report of the slowest functions and the top allocations are saved in:\n"
+                f"{FF_Profiling.PROFILES_FOLDER}",
+                parent)
+
+    profile_action = QAction("&Profile next Search", parent)
+    profile_action.setCheckable(True)
+    profile_action.triggered.connect(toggle_profiling)
+    menu.aboutToShow.connect(lambda: profile_action.setChecked(FF_Profiling.is_profile_requested()))
+    menu.addAction(profile_action)
+    return profile_action
+
+
+# Emitting the changes of the settings store as Qt signals, so windows can update when a setting is changed,
+# also by another File Find process.
+# Changes are received in the thread, which changed the setting and queued, so changed is always emitted in the UI
+class SettingsSignals(QObject):
+    received = Signal(str, object)
+    changed = Signal(str, object)
+
+    def __init__(self):
+        super().__init__()
+        self.received.connect(self.changed, Qt.ConnectionType.QueuedConnection)
+
+
+settings_signals = None
+
+
+# The signals of the settings store, created when first used, which has to be in the UI thread
+def get_settings_signals() -> SettingsSignals:
+    global settings_signals
+    if settings_signals is None:
+        settings_signals = SettingsSignals()
+        FF_Settings_Store.SETTINGS.add_listener(settings_signals.received.emit)
+    return settings_signals
 
 
 # Debug
@@ -19,15 +19,19 @@ import gc
 from PySide6.QtGui import QFont, Qt
 from PySide6.QtCore import QObject, Signal, QThreadPool, QSize
 from PySide6.QtWidgets import (
-    QMainWindow, QFileDialog, QListWidget, QLabel, QPushButton, QWidget, QGridLayout, QHBoxLayout, QScrollArea,
-    QSpacerItem, QSizePolicy)
+    QMainWindow, QFileDialog, QListView, QLabel, QPushButton, QWidget, QGridLayout, QHBoxLayout, QScrollArea,
+    QSpacerItem, QSizePolicy, QAbstractItemView)
 
 # Projects Libraries
 import FF_Additional_UI
+import FF_Compare_Engine
 import FF_Files
 import FF_Main_UI
 import FF_Menubar
+import FF_Profiling
 import FF_Search
+import FF_Search_Engine
+import FF_Search_Format
 
 
 # The window
@@ -41,10 +45,18 @@ class CompareUi:
         # Set up the Window
         self.Compare_Window = QMainWindow(parent)
         # Set up the window title
-        self.Compare_Window.setWindowTitle(
-            "File Find | Comparing Searches: "
-            f"{FF_Files.display_path(path_of_first_search, 15)} (base) --> "
-            f"{FF_Files.display_path(compared_searches.path_of_second_search[0], 15)}")
+        if compared_searches.is_compare_to_now:
+            self.Compare_Window.setWindowTitle(
+                "File Find | Comparing Search to Now: "
+                f"{FF_Files.display_path(compared_searches.path_of_second_search[0], 30)}")
+            # The first search are the files as they are now
+            first_search_name = "Now"
+        else:
+            self.Compare_Window.setWindowTitle(
+                "File Find | Comparing Searches: "
+                f"{FF_Files.display_path(path_of_first_search, 15)} (base) --> "
+                f"{FF_Files.display_path(compared_searches.path_of_second_search[0], 15)}")
+            first_search_name = path_of_first_search
         # Set the start size of the Window, because it's resizable
         self.BASE_WIDTH = 800
         self.BASE_HEIGHT = 700
@@ -67,13 +79,13 @@ class CompareUi:
         self.Listbox_Layout = QGridLayout(self.Compare_Window)
         self.Listbox_Layout.setContentsMargins(0, 0, 0, 0)
         # Add to main Layout
-        self.Compare_Layout.addLayout(self.Listbox_Layout, 3, 0, 8, 2)
+        self.Compare_Layout.addLayout(self.Listbox_Layout, 3, 0, 8, 4)
 
         # Bottom Layout
         self.Bottom_Layout = QHBoxLayout(self.Compare_Window)
         self.Bottom_Layout.setContentsMargins(0, 20, 0, 0)
         # Add to main Layout
-        self.Compare_Layout.addLayout(self.Bottom_Layout, 11, 0, 1, 2)
+        self.Compare_Layout.addLayout(self.Bottom_Layout, 11, 0, 1, 4)
 
         # Setting up the menu bar...
         menu_bar = FF_Menubar.MenuBar(parent=self.Compare_Window, window="compare",
@@ -82,99 +94,37 @@ class CompareUi:
 
         # Set up both list-boxes
         # Added files / files only in first search
-        '''Creating a QScrollArea in which the QListWidget is put. This is because QListWidget.setUniformItemSizes(True)
-            allows for insane speed gains (up to 100x), but it makes all item the same size (if they are too long it
-            will cut them of) so to profit from the speed gains but at the same time not cutting of the file paths, the
-            QListWidget (takes care of vertical scrolling)
-            is put into a QScrollArea, which takes care of the horizontal scrolling.'''
         # Debug
         logging.debug("Setting up Added files / files only in first search listbox..")
-        # Scroll Area
-        self.added_files_area = QScrollArea(self.Compare_Window)
-        # List widget
-        self.added_files_listbox = QListWidget(self.Compare_Window)
-        self.added_files_area.setWidget(self.added_files_listbox)
-        # Adding to grid
-        self.Listbox_Layout.addWidget(self.added_files_area, 0, 0)
-        # Show the Listbox
-        self.added_files_listbox.show()
-        # Double-Clicking Event
-        self.added_files_listbox.doubleClicked.connect(menu_bar.double_clicking_item)
-        # If there were no files added and the list is empty
-        if not compared_searches.files_only_in_first_search:
-            self.added_files_listbox.setDisabled(True)
-            self.added_files_listbox.addItem("No file of directory found")
-        else:
-            # If there is at least one file, add all files
-            self.added_files_listbox.addItems(compared_searches.files_only_in_first_search)
-            # Setting the row to the first
-            self.added_files_listbox.setCurrentRow(0)
-        # Set scrollbars and optimization
-        try:
-            # Get the longest file, fails if there is no item, and then multiply by font size to get the length
-            self.added_files_listbox.setMinimumWidth(len(max(compared_searches.files_only_in_first_search, key=len))
-                                                     * self.added_files_listbox.font().pointSize())
-        except ValueError:
-            pass
-        # Setting all the Scrollbars
-        self.added_files_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        self.added_files_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.added_files_listbox.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        # Optimisations
-        self.added_files_area.setWidgetResizable(True)
-        self.added_files_listbox.setUniformItemSizes(True)
-        # Moving the Scrollbar into the right place, so it's always visible
-        self.Listbox_Layout.addWidget(self.added_files_listbox.verticalScrollBar(), 0, 0,
-                                      Qt.AlignmentFlag.AlignRight)
+        self.added_files_area, self.added_files_listbox = self.generate_listbox(
+            compared_searches.files_only_in_first_search, 0, menu_bar)
 
         # Removed files / files only in second search
         # Debug
         logging.debug("Done!, Setting up Removed files / files only in second search listbox..")
+        self.removed_files_area, self.removed_files_listbox = self.generate_listbox(
+            compared_searches.files_only_in_second_search, 1, menu_bar)
 
-        # Scroll Area
-        self.removed_files_area = QScrollArea(self.Compare_Window)
-        # List widget
-        self.removed_files_listbox = QListWidget(self.Compare_Window)
-        self.removed_files_area.setWidget(self.removed_files_listbox)
-        # Adding to grid
-        self.Listbox_Layout.addWidget(self.removed_files_area, 0, 1)
-        # Show the Listbox
-        self.removed_files_listbox.show()
-        # Double-Clicking Event
-        self.removed_files_listbox.doubleClicked.connect(menu_bar.double_clicking_item)
-        # If there were no files removed and the list is empty
-        if not compared_searches.files_only_in_second_search:
-            self.removed_files_listbox.setDisabled(True)
-            self.removed_files_listbox.addItem("No file of directory found")
-        else:
-            # If there is at least one file, add all files
-            self.removed_files_listbox.addItems(compared_searches.files_only_in_second_search)
-            # Setting the row to the second
-            self.removed_files_listbox.setCurrentRow(0)
-        # Set scrollbars and optimization
-        try:
-            # Get the longest file, fails if there is no item, and then multiply by font size to get the length
-            self.removed_files_listbox.setMinimumWidth(len(max(compared_searches.files_only_in_second_search, key=len))
-                                                       * self.removed_files_listbox.font().pointSize())
-        except ValueError:
-            pass
-        # Setting all the Scrollbars
-        self.removed_files_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        self.removed_files_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.removed_files_listbox.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        # Optimisations
-        self.removed_files_area.setWidgetResizable(True)
-        self.removed_files_listbox.setUniformItemSizes(True)
-        # Moving the Scrollbar into the right place, so it's always visible
-        self.Listbox_Layout.addWidget(self.removed_files_listbox.verticalScrollBar(), 0, 1,
-                                      Qt.AlignmentFlag.AlignRight)
+        # Modified and moved files, if the second search has metadata
+        if compared_searches.is_snapshot:
+            # Debug
+            logging.debug("Done!, Setting up Modified and Moved files listboxes..")
+            self.modified_files_area, self.modified_files_listbox = self.generate_listbox(
+                compared_searches.modified_files, 2, menu_bar)
+            self.moved_files_area, self.moved_files_listbox = self.generate_listbox(
+                compared_searches.moved_files, 3, menu_bar)
+
+            # Showing the old path of moved files as tooltip
+            for row, moved_file in enumerate(compared_searches.moved_files):
+                self.moved_files_listbox.model().row_roles[(row, Qt.ItemDataRole.ToolTipRole)] = \
+                    f"Moved from: {compared_searches.moved_from[moved_file]}"
         # Debug
         logging.debug("Done!")
 
         # Labels
         # Added files
         self.added_files_label1, self.added_files_label2 = self.generate_title_label(
-            text="Added Files", text2=path_of_first_search,
+            text="Added Files", text2=first_search_name,
             light_color=FF_Files.GREEN_LIGHT_THEME_COLOR,
             dark_color=FF_Files.GREEN_DARK_THEME_COLOR,
             length_of_list=len(compared_searches.files_only_in_first_search))
@@ -190,6 +140,27 @@ class CompareUi:
         self.Compare_Layout.addWidget(self.removed_files_label1, 1, 1)
         self.Compare_Layout.addWidget(self.removed_files_label2, 2, 1)
 
+        if compared_searches.is_snapshot:
+            # Modified files
+            self.modified_files_label1, self.modified_files_label2 = self.generate_title_label(
+                text="Modified Files", text2=first_search_name,
+                light_color=FF_Files.YELLOW_LIGHT_THEME_COLOR,
+                dark_color=FF_Files.YELLOW_DARK_THEME_COLOR,
+                length_of_list=len(compared_searches.modified_files),
+                description="modified in")
+            self.Compare_Layout.addWidget(self.modified_files_label1, 1, 2)
+            self.Compare_Layout.addWidget(self.modified_files_label2, 2, 2)
+
+            # Moved files
+            self.moved_files_label1, self.moved_files_label2 = self.generate_title_label(
+                text="Moved Files", text2=first_search_name,
+                light_color=FF_Files.BLUE_LIGHT_THEME_COLOR,
+                dark_color=FF_Files.BLUE_DARK_THEME_COLOR,
+                length_of_list=len(compared_searches.moved_files),
+                description="moved in")
+            self.Compare_Layout.addWidget(self.moved_files_label1, 1, 3)
+            self.Compare_Layout.addWidget(self.moved_files_label2, 2, 3)
+
         # Buttons
         # Button to open the File in Finder
         move_file = self.generate_button("Move / Rename", menu_bar.move_file,
@@ -237,7 +208,7 @@ class CompareUi:
         # Top Layout
         self.Top_Layout = QHBoxLayout()
         self.Top_Layout.setContentsMargins(0, 0, 0, 0)
-        self.Compare_Layout.addLayout(self.Top_Layout, 0, 0, 1, 2)
+        self.Compare_Layout.addLayout(self.Top_Layout, 0, 0, 1, 4)
 
         # Time needed
         time_text = QLabel(self.Compare_Window)
@@ -268,9 +239,20 @@ class CompareUi:
             with open(FF_Files.path_to_cache_file(path_of_first_search, True)) as time_file1:
                 # Load time
                 search1_created_time = ctime(load(time_file1)["c_time"])
-            # Getting the creation time of the cache file which is stored separately
-            with open(FF_Files.path_to_cache_file(compared_searches.path_of_second_search[0], True)) as time_file2:
-                search2_created_time = ctime(load(time_file2)["c_time"])
+            # Saved searches in version 3 store their creation time, older ones have it with their cache
+            if FF_Search_Format.is_search_format(compared_searches.path_of_second_search[0]):
+                search2_created_time = ctime(
+                    FF_Search_Format.read_search_header(compared_searches.path_of_second_search[0])["created"])
+            else:
+                with open(FF_Files.path_to_cache_file(compared_searches.path_of_second_search[0], True)) as time_file2:
+                    search2_created_time = ctime(load(time_file2)["c_time"])
+
+            # Number of folders that had to be listed again, if comparing to now
+            if compared_searches.is_compare_to_now:
+                rescan_text = (f"Listed {compared_searches.listed_folders} of {compared_searches.folder_count} "
+                               f"folders again\n")
+            else:
+                rescan_text = ""
 
             # Displaying infobox with time info
             FF_Additional_UI.PopUps.show_info_messagebox(
@@ -279,8 +261,9 @@ class CompareUi:
                 f"Comparing: {round(comparing_time, 3)}s\n"
                 f"Creating UI: {round(building_time, 3)}s"
                 "\n---------\n"
-                f"Total: {round(total_time, 3)}s\n\n\n"
-                ""
+                f"Total: {round(total_time, 3)}s\n\n"
+                f"Files in both searches: {compared_searches.files_in_both_searches}\n"
+                f"{rescan_text}\n\n"
                 "Timestamps:\n"
                 f"Base Search ({FF_Files.display_path(path_of_first_search, 60)}):\n{search1_created_time}\n"
                 f"Second Search ({FF_Files.display_path(compared_searches.path_of_second_search[0], 60)}):"
@@ -310,8 +293,56 @@ class CompareUi:
         # Return the value of the Button, to move the Button
         return button
 
+    # Function for generating a listbox for a list of files in the column of the listbox layout
+    def generate_listbox(self, files: list[str], column: int, menu_bar) -> tuple[QScrollArea, QListView]:
+        '''Creating a QScrollArea in which the QListView is put. This is because QListView.setUniformItemSizes(True)
+            allows for insane speed gains (up to 100x), but it makes all item the same size (if they are too long it
+            will cut them of) so to profit from the speed gains but at the same time not cutting of the file paths, the
+            QListView (takes care of vertical scrolling)
+            is put into a QScrollArea, which takes care of the horizontal scrolling.'''
+        # Scroll Area
+        files_area = QScrollArea(self.Compare_Window)
+        # List view
+        files_listbox = QListView(self.Compare_Window)
+        # Multiple files can be selected with Shift or Ctrl/Cmd
+        files_listbox.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        files_area.setWidget(files_listbox)
+        # Adding to grid
+        self.Listbox_Layout.addWidget(files_area, 0, column)
+        # Show the Listbox
+        files_listbox.show()
+        # Double-Clicking Event
+        files_listbox.doubleClicked.connect(menu_bar.double_clicking_item)
+        # If there are no files and the list is empty
+        if not files:
+            files_listbox.setDisabled(True)
+            files_listbox.setModel(FF_Additional_UI.FileListModel(["No file of directory found"], self.Compare_Window))
+        else:
+            # If there is at least one file, add all files, rows are only created when they are displayed
+            files_listbox.setModel(FF_Additional_UI.FileListModel(files, self.Compare_Window))
+            # Setting the row to the first
+            files_listbox.setCurrentIndex(files_listbox.model().index(0))
+        # Set scrollbars and optimization
+        try:
+            # Get the longest file, fails if there is no item, and then multiply by font size to get the length
+            files_listbox.setMinimumWidth(len(max(files, key=len)) * files_listbox.font().pointSize())
+        except ValueError:
+            pass
+        # Setting all the Scrollbars
+        files_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        files_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        files_listbox.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        # Optimisations
+        files_area.setWidgetResizable(True)
+        files_listbox.setUniformItemSizes(True)
+        # Moving the Scrollbar into the right place, so it's always visible
+        self.Listbox_Layout.addWidget(files_listbox.verticalScrollBar(), 0, column, Qt.AlignmentFlag.AlignRight)
+
+        return files_area, files_listbox
+
     # Function for generating the added / removed files labels
-    def generate_title_label(self, text, text2, light_color, dark_color, length_of_list) -> tuple[QLabel, QLabel]:
+    def generate_title_label(self, text, text2, light_color, dark_color, length_of_list,
+                             description="only in") -> tuple[QLabel, QLabel]:
         # Label 1
         label1 = FF_Additional_UI.ColoredLabel(text, self.Compare_Window, light_color, dark_color)
 
@@ -330,7 +361,7 @@ class CompareUi:
 
         # Shorten the text string to only include the first to the 30th
         # and the last ten character if the string is longer then 43 characters
-        text2_shortened = f"{length_of_list} file(s) only in:\n{FF_Files.display_path(text2, 30)}"
+        text2_shortened = f"{length_of_list} file(s) {description}:\n{FF_Files.display_path(text2, 30)}"
         # Set the label to the shortened string
         label2.setText(text2_shortened)
 
@@ -346,6 +377,9 @@ class CompareUi:
 
 # The engine
 class CompareSearches:
+    # If the first search are the files as they are now
+    is_compare_to_now = False
+
     def __init__(self, files_of_first_search: list, path_of_first_search, cache_file, parent):
         # Debug
         logging.debug("User pressed Compare Search")
@@ -364,8 +398,12 @@ class CompareSearches:
 
             # Get the files of both searches
             self.files_of_first_search = files_of_first_search
+            self.path_of_first_search = path_of_first_search
+            # Metadata of the first search, read when comparing if it is None
+            self.metadata_of_first_search = None
             logging.debug("Asking for a second File Find Search file...")
-            self.files_of_second_search, self.path_of_second_search = self.load_second_search()
+            (self.files_of_second_search, self.metadata_of_second_search,
+             self.path_of_second_search) = self.load_second_search()
 
             # Setting up the UI-logging
             logging.info("Setting up the UI-logging and the search status label...")
@@ -381,13 +419,20 @@ class CompareSearches:
             # Saving time
             self.time_dict = {"start_time": perf_counter()}
 
-            # Files which are only in one list
+            # If the second search has metadata, it is compared as a snapshot,
+            # saved searches in version 3 (which are read while comparing) always have metadata
+            self.is_snapshot = self.files_of_second_search is None or self.metadata_of_second_search is not None
+            # The differences, see FF_Compare_Engine.SearchComparison
             self.files_only_in_first_search = []
             self.files_only_in_second_search = []
+            self.files_in_both_searches = 0
+            self.modified_files = []
+            self.moved_files = []
+            self.moved_from = {}
 
             # Starting the thread
             logging.debug("Starting thread...")
-            comparing_thread.start(self.compare)
+            comparing_thread.start(FF_Profiling.profiled_if_requested("compare", self.compare))
         except (TypeError, UserWarning):
             # If no file was selected
             logging.info("No file was selected, when comparing files")
@@ -397,19 +442,18 @@ class CompareSearches:
         # Debug
         logging.debug("Comparing searches, finding differences...")
 
-        # Converting the lists to sets for a faster lockup
-        first_search_files_set = set(self.files_of_first_search)
-        second_search_files_set = set(self.files_of_second_search)
-
-        for file_in_first_search in self.files_of_first_search:
-            if not (file_in_first_search in second_search_files_set):
-                self.files_only_in_first_search.append(file_in_first_search)
+        # Both searches are walked through in sorted order at the same time, so only the differences are kept
+        comparison = FF_Compare_Engine.SearchComparison(self.is_snapshot)
+        comparison.compare(self.get_first_entries(), self.get_second_entries(),
+                           read_first_metadata=self.metadata_of_first_search is None)
 
-        for file_in_second_search in self.files_of_second_search:
-            if not (file_in_second_search in first_search_files_set):
-                self.files_only_in_second_search.append(file_in_second_search)
+        self.files_only_in_first_search = comparison.files_only_in_first_search
+        self.files_only_in_second_search = comparison.files_only_in_second_search
+        self.files_in_both_searches = comparison.files_in_both_searches
+        self.modified_files = comparison.modified_files
+        self.moved_files = comparison.moved_files
+        self.moved_from = comparison.moved_from
 
-        del first_search_files_set, second_search_files_set
         logging.debug("Done comparing searches!\n")
 
         # Setting the global var compared_searches to self to include all 'self.' vars
@@ -420,6 +464,24 @@ class CompareSearches:
         logging.debug("Finished thread, Emitting finished signal!")
         self.signals.finished.emit()
 
+    # The files of the first search in sorted order, read from the saved search if the first search was loaded
+    # from a sorted saved search in version 3 and still has all of its files
+    def get_first_entries(self):
+        if (self.metadata_of_first_search is None and self.path_of_first_search.endswith(".FFSearch")
+                and os.path.isfile(self.path_of_first_search)
+                and FF_Search_Format.is_search_format(self.path_of_first_search)
+                and FF_Compare_Engine.is_sorted_search(self.path_of_first_search)
+                and FF_Search_Format.read_search_header(self.path_of_first_search)["counts"]["matched"]
+                == len(self.files_of_first_search)):
+            return FF_Compare_Engine.iter_saved_entries(self.path_of_first_search)
+        return FF_Compare_Engine.iter_sorted_entries(self.files_of_first_search, self.metadata_of_first_search)
+
+    # The files of the second search in sorted order, saved searches in version 3 are read block by block
+    def get_second_entries(self):
+        if self.files_of_second_search is None:
+            return FF_Compare_Engine.iter_saved_entries(self.path_of_second_search[0])
+        return FF_Compare_Engine.iter_sorted_entries(self.files_of_second_search, self.metadata_of_second_search)
+
     @staticmethod
     def load_second_search():
         # Get the user to select a valid search file
@@ -438,8 +500,89 @@ class CompareSearches:
         else:
             # Normalise the oath and create a new tuple, because they don't support editing
             second_search_file = (os.path.normpath(second_search_file[0]), second_search_file[1])
-        # Load list from file and return path and files
-        return FF_Search.LoadSearch.load_search_content(second_search_file[0])["matched_list"], second_search_file
+        # Saved searches in version 3 are read while comparing, no files are returned
+        if FF_Search_Format.is_search_format(second_search_file[0]):
+            return None, None, second_search_file
+        # Load list from older versions and return files, their metadata (only in newer searches) and the path
+        saved_file_content = FF_Search.LoadSearch.load_search_content(second_search_file[0])
+        return saved_file_content["matched_list"], saved_file_content.get("metadata"), second_search_file
+
+
+# Comparing a saved search to the files as they are now, without searching again.
+# The saved search is the second search, the first search is built from the saved files that still exist
+# and the files that were added to the folders of the saved search
+class CompareToNow(CompareSearches):
+    is_compare_to_now = True
+
+    def __init__(self, parent):
+        # Get the user to select a saved search
+        saved_search_file = QFileDialog.getOpenFileName(
+            parent=None,
+            caption="Select Search to Compare to Now",
+            dir=FF_Files.USER_FOLDER,
+            filter="*.FFSearch")
+
+        # If no file was selected
+        if saved_search_file[0] == "":
+            logging.info("No file was selected, when comparing to now")
+            return
+        saved_search_file = (os.path.normpath(saved_search_file[0]), saved_search_file[1])
+
+        # Load the saved search, older searches have no folder modification times and creation time
+        saved_file_content = FF_Search.LoadSearch.load_search_content(saved_search_file[0])
+        self.folder_mtimes = saved_file_content.get("folder_mtimes")
+        # Filters of the search, added files have to match them, older searches didn't store them
+        self.filters = saved_file_content.get("header", {}).get("filters")
+        self.snapshot_time = saved_file_content.get("created", os.path.getmtime(saved_search_file[0]))
+        self.saved_search = (saved_file_content["matched_list"], saved_file_content.get("metadata"), saved_search_file)
+
+        super().__init__([], saved_search_file[0], FF_Files.path_to_cache_file(saved_search_file[0]), parent)
+
+    # The saved search is used as second search
+    def load_second_search(self):
+        return self.saved_search
+
+    def compare(self):
+        # Debug
+        logging.debug("Finding the current state of the saved files...")
+
+        # Files which still exist
+        saved_metadata = FF_Files.get_snapshot_metadata(self.files_of_second_search)
+        self.files_of_first_search = [saved_file for saved_file, file_metadata
+                                      in zip(self.files_of_second_search, saved_metadata) if file_metadata is not None]
+        self.metadata_of_first_search = [file_metadata for file_metadata in saved_metadata if file_metadata is not None]
+        del saved_metadata
+
+        # Files added since the search was saved, only changed folders are listed again
+        added_types, self.listed_folders = FF_Files.find_added_files(
+            self.files_of_second_search, self.folder_mtimes, self.snapshot_time)
+        self.folder_count = len(self.folder_mtimes) if self.folder_mtimes is not None else self.listed_folders
+        added_files = self.filter_added_files(added_types)
+        del added_types
+        self.files_of_first_search.extend(added_files)
+        self.metadata_of_first_search.extend(FF_Files.get_snapshot_metadata(added_files))
+
+        # Debug
+        logging.debug(f"Listed {self.listed_folders} of {self.folder_count} folders again, "
+                      f"found {len(added_files)} new files")
+
+        super().compare()
+
+    # Keeping only the added files that match the filters of the saved search, like a new search would
+    def filter_added_files(self, added_types: dict[str, str]) -> list[str]:
+        if not self.filters:
+            logging.info("The saved search has no filters, keeping all added files")
+            return list(added_types)
+
+        try:
+            query = FF_Search_Engine.SearchQuery.from_dict(self.filters)
+        except TypeError as filters_error:
+            logging.error(f"Couldn't load the filters of the saved search, keeping all added files: {filters_error}")
+            return list(added_types)
+
+        # Debug
+        logging.debug(f"Filtering {len(added_types)} added files...")
+        return FF_Search_Engine.SearchEngine(query).filter_paths(list(added_types), added_types)
 
 
 global compared_searches
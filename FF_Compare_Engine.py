@@ -0,0 +1,167 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the engine for comparing searches without any user-interface,
+# so it can be used by the compare window and the benchmarks
+#
+# Both searches are walked through in sorted order at the same time (a merge join), so only the differences
+# have to be kept in memory. Saved searches in version 3 store their paths sorted and are read block by block
+
+# Imports
+import logging
+
+# Projects Libraries
+import FF_Files
+import FF_Search_Format
+
+# Number of files in both searches whose metadata is compared at once
+METADATA_BATCH_SIZE = 65536
+
+
+# The paths of a search in sorted order, with their metadata (or None), like iter_saved_entries()
+def iter_sorted_entries(files: list[str], metadata: list | None = None):
+    if metadata is None:
+        return ((path, None) for path in sorted(files))
+    return iter(sorted(zip(files, metadata), key=lambda entry: entry[0]))
+
+
+# Testing if the paths of a saved search in version 3 are stored sorted, older saves in version 3 weren't sorted
+def is_sorted_search(save_file: str) -> bool:
+    return FF_Search_Format.read_search_header(save_file).get("sorted", False)
+
+
+# The paths of a saved search in version 3 in sorted order, with their metadata (or None).
+# Sorted saves are read block by block, older ones are sorted in memory
+def iter_saved_entries(save_file: str):
+    saved_entries = ((path, path_metadata)
+                     for path, _flags, path_metadata in FF_Search_Format.iter_search_entries(save_file))
+    if is_sorted_search(save_file):
+        return saved_entries
+    return iter(sorted(saved_entries, key=lambda entry: entry[0]))
+
+
+# Merging two searches in sorted order, yields ("first", path, metadata, None) or ("second", path, None, metadata)
+# for a path that is only in the first or second search and ("both", path, first metadata, second metadata)
+# for a path in both searches
+def merge_join(first_entries, second_entries):
+    first_entries = iter(first_entries)
+    second_entries = iter(second_entries)
+    first_entry = next(first_entries, None)
+    second_entry = next(second_entries, None)
+
+    while first_entry is not None and second_entry is not None:
+        if first_entry[0] < second_entry[0]:
+            yield "first", first_entry[0], first_entry[1], None
+            first_entry = next(first_entries, None)
+        elif first_entry[0] > second_entry[0]:
+            yield "second", second_entry[0], None, second_entry[1]
+            second_entry = next(second_entries, None)
+        else:
+            yield "both", first_entry[0], first_entry[1], second_entry[1]
+            first_entry = next(first_entries, None)
+            second_entry = next(second_entries, None)
+
+    # The rest of the longer search
+    while first_entry is not None:
+        yield "first", first_entry[0], first_entry[1], None
+        first_entry = next(first_entries, None)
+    while second_entry is not None:
+        yield "second", second_entry[0], None, second_entry[1]
+        second_entry = next(second_entries, None)
+
+
+# The differences between two searches.
+# If the second search has metadata, it is compared as a snapshot:
+# files in both searches are modified, if their size or modification time changed.
+# Files only in one search are moved, if a file with the same inode, size and modification time was only in
+# the other search. Renaming a file keeps all of them, but a new file can get the inode of a deleted file
+class SearchComparison:
+    def __init__(self, is_snapshot: bool):
+        self.is_snapshot = is_snapshot
+
+        # Files which are only in one search
+        self.files_only_in_first_search = []
+        self.files_only_in_second_search = []
+        # Only the number of files in both searches is needed
+        self.files_in_both_searches = 0
+        # Files with a different size or modification time and files at a new path (the new paths)
+        self.modified_files = []
+        self.moved_files = []
+        # The old path of every moved file
+        self.moved_from = {}
+
+    # Comparing the entries of both searches, which have to be sorted by their path.
+    # The first search is the current state, if read_first_metadata is True its metadata is read from the files,
+    # else the metadata of its entries is used
+    def compare(self, first_entries, second_entries, read_first_metadata: bool = True):
+        # Metadata of the files only in one search, for finding moved files
+        first_only_metadata = []
+        second_only_metadata = []
+        # Files in both searches, their metadata is compared in batches
+        both_batch = []
+
+        for search, compared_file, first_metadata, second_metadata in merge_join(first_entries, second_entries):
+            if search == "first":
+                self.files_only_in_first_search.append(compared_file)
+                if self.is_snapshot and not read_first_metadata:
+                    first_only_metadata.append(first_metadata)
+            elif search == "second":
+                self.files_only_in_second_search.append(compared_file)
+                if self.is_snapshot:
+                    second_only_metadata.append(second_metadata)
+            else:
+                self.files_in_both_searches += 1
+                if self.is_snapshot:
+                    both_batch.append((compared_file, first_metadata, second_metadata))
+                    if len(both_batch) == METADATA_BATCH_SIZE:
+                        self.find_modified(both_batch, read_first_metadata)
+                        both_batch = []
+
+        if self.is_snapshot:
+            self.find_modified(both_batch, read_first_metadata)
+            if read_first_metadata:
+                first_only_metadata = FF_Files.get_snapshot_metadata(self.files_only_in_first_search)
+            self.find_moved(first_only_metadata, second_only_metadata)
+
+            # Debug
+            logging.debug(f"Found {len(self.modified_files)} modified and {len(self.moved_files)} moved files")
+
+    # Finding the modified files of a batch of (path, first metadata, second metadata) of files in both searches
+    def find_modified(self, both_batch: list, read_first_metadata: bool):
+        if read_first_metadata:
+            first_batch_metadata = FF_Files.get_snapshot_metadata([compared_file for compared_file, _first, _second
+                                                                   in both_batch])
+        else:
+            first_batch_metadata = [first_metadata for _file, first_metadata, _second in both_batch]
+
+        for (compared_file, _first, second_metadata), first_metadata in zip(both_batch, first_batch_metadata):
+            if first_metadata is not None and second_metadata is not None and first_metadata[:2] != second_metadata[:2]:
+                self.modified_files.append(compared_file)
+
+    # Finding moved files, joined by size, modification time, device and inode
+    def find_moved(self, first_only_metadata: list, second_only_metadata: list):
+        removed_inodes = {}
+        for removed_file, removed_metadata in zip(self.files_only_in_second_search, second_only_metadata):
+            if removed_metadata is not None:
+                removed_inodes[tuple(removed_metadata)] = removed_file
+        for added_file, added_metadata in zip(self.files_only_in_first_search, first_only_metadata):
+            if added_metadata is None:
+                continue
+            old_path = removed_inodes.pop(tuple(added_metadata), None)
+            if old_path is not None:
+                self.moved_files.append(added_file)
+                self.moved_from[added_file] = old_path
+
+        # Moved files are neither added nor removed
+        if self.moved_files:
+            moved_old_paths = set(self.moved_from.values())
+            self.files_only_in_first_search = [
+                added_file for added_file in self.files_only_in_first_search if added_file not in self.moved_from]
+            self.files_only_in_second_search = [
+                removed_file for removed_file in self.files_only_in_second_search
+                if removed_file not in moved_old_paths]
@@ -0,0 +1,380 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the optional search daemon and the code for sending searches to it.
+#
+# The daemon keeps the scanned files of searched folders in memory and answers searches over a Unix domain socket,
+# so the cache doesn't have to be loaded again for every search. It is started with
+# "python3 File-Find-CLI.py --start-daemon", the main window and the command line use it if it is running.
+#
+# Protocol: the client sends one JSON line, like {"VERSION": 1, "command": "search", "query": {...}, "sort": true},
+# the daemon answers with JSON lines: {"stage": "scanning"} for every stage, {"results": [[path, type], ...]}
+# for every batch of results and {"done": {...}} or {"error": {...}} at the end
+
+# Imports
+import logging
+import os
+import socket
+import socketserver
+import sys
+import threading
+from bisect import bisect_left
+from concurrent.futures import Future
+from json import dumps, loads, load
+from time import sleep, time
+
+# Projects Libraries
+import FF_Files
+import FF_Search_Engine
+
+# Version of the protocol
+FF_DAEMON_VERSION = 1
+# The socket in the library folder
+SOCKET_PATH = os.path.join(FF_Files.FF_LIB_FOLDER, "daemon.sock")
+# Number of results sent in one line
+RESULT_BATCH_SIZE = 4096
+# Memory the indexes can use, the least recently used ones are removed if there are more
+MEMORY_CAP = 1024 * 1024 * 1024
+# Memory the indexes can use after no search was sent for IDLE_TIME seconds
+IDLE_MEMORY_CAP = 256 * 1024 * 1024
+IDLE_TIME = 15 * 60
+# How often the daemon tests if it is idle
+HOUSEKEEPING_INTERVAL = 60
+
+
+# Raised if the daemon isn't running or can't be reached, searches are run locally then
+class DaemonUnavailable(Exception):
+    pass
+
+
+# The scanned files of a folder, kept in memory by the daemon.
+# The paths are sorted, so the files of a sub folder are next to each other and found with bisect
+class WarmIndex:
+    def __init__(self, root: str, new_cache_file: bool = False):
+        self.root = root
+
+        # Scanning like the search engine does, which loads the cache or creates it
+        engine = FF_Search_Engine.SearchEngine(FF_Search_Engine.SearchQuery(root, new_cache_file=new_cache_file))
+        engine.scan()
+        engine.write_cache()
+        # If the files were loaded from the cache instead of scanning the folder
+        self.used_cache = engine.used_cache
+
+        self.paths = sorted(engine.found_path_set)
+        # Only folders are stored, every other path is a file
+        self.folders = {path for path, path_type in engine.type_dict.items() if path_type == "folder"}
+        del engine
+
+        # The cache the index was created from, it is loaded again if the cache changes
+        self.cache_file = FF_Files.path_to_cache_file(root)
+        self.cache_state = self.get_cache_state()
+
+        # Estimated memory, the strings of folders are the same objects as in paths
+        self.memory = (sys.getsizeof(self.paths) + sum(map(sys.getsizeof, self.paths))
+                       + sys.getsizeof(self.folders))
+        self.last_used = time()
+
+        # Debug
+        logging.info(f"Loaded index of {root} with {len(self.paths)} files, "
+                     f"using {FF_Files.conv_file_size(self.memory)}")
+
+    # Types are looked up like in the type_dict of the search engine
+    def __getitem__(self, path: str) -> str:
+        return "folder" if path in self.folders else "file"
+
+    # Creation time of the cache and modification time of the cache file, which changes if files are removed from it
+    def get_cache_state(self):
+        try:
+            with open(FF_Files.path_to_cache_file(self.root, True)) as metadata_file:
+                return load(metadata_file)["c_time"], os.path.getmtime(self.cache_file)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    # Testing if the cache was deleted or changed since the index was loaded
+    def is_valid(self) -> bool:
+        return self.cache_state is not None and self.get_cache_state() == self.cache_state
+
+    # The files in a folder, which is the root or in the root
+    def get_files_in(self, directory: str) -> list[str]:
+        if directory == self.root:
+            return self.paths
+        # Every path in the folder starts with the folder and a separator,
+        # they are between the folder with a separator and the folder with the next character after the separator
+        prefix = directory + os.sep
+        return self.paths[bisect_left(self.paths, prefix):bisect_left(self.paths, directory + chr(ord(os.sep) + 1))]
+
+    # Testing if a folder is the root or in the root
+    def contains(self, directory: str) -> bool:
+        return directory == self.root or directory.startswith(self.root.rstrip(os.sep) + os.sep)
+
+
+# Search engine using an index in memory instead of scanning or loading the cache
+class WarmSearchEngine(FF_Search_Engine.SearchEngine):
+    def __init__(self, query: FF_Search_Engine.SearchQuery, index: WarmIndex, progress=None,
+                 index_used_cache: bool = True):
+        super().__init__(query, progress)
+        self.index = index
+        # False if the index was loaded for this search by scanning the folder
+        self.index_used_cache = index_used_cache
+
+    def scan(self):
+        # Update the status
+        self.report("scanning")
+
+        self.found_path_set = self.index.get_files_in(self.query.directory)
+        self.type_dict = self.index
+        self.used_cache = self.index_used_cache
+        self.cache_file = self.index.cache_file
+
+    # The cache already exists, because the index was created from it
+    def write_cache(self):
+        pass
+
+
+# The daemon, keeping the indexes and answering searches
+class SearchDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str = SOCKET_PATH):
+        self.indexes: dict[str, WarmIndex] = {}
+        self.indexes_lock = threading.Lock()
+        # Indexes which are being loaded, searches in the same folder wait for them instead of scanning again
+        self.loading_indexes: dict[str, Future] = {}
+        self.last_search = time()
+        self.socket_path = socket_path
+
+        # Removing the socket of a daemon that didn't exit properly
+        if os.path.exists(socket_path):
+            if is_running(socket_path):
+                raise OSError(f"The daemon is already running at {socket_path}")
+            os.remove(socket_path)
+
+        super().__init__(socket_path, DaemonRequestHandler)
+        # Only the user can connect
+        os.chmod(socket_path, 0o600)
+
+    # Running until stopped, removing indexes when idle
+    def run(self):
+        # Debug
+        logging.info(f"Search daemon listening on {self.socket_path}")
+
+        housekeeping = threading.Thread(target=self.housekeeping, daemon=True)
+        housekeeping.start()
+        try:
+            self.serve_forever()
+        finally:
+            self.server_close()
+            try:
+                os.remove(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+    def housekeeping(self):
+        while True:
+            sleep(HOUSEKEEPING_INTERVAL)
+            if time() - self.last_search > IDLE_TIME:
+                self.evict(IDLE_MEMORY_CAP)
+
+    # Removing the least recently used indexes until they use less than memory_cap
+    def evict(self, memory_cap: int):
+        with self.indexes_lock:
+            for index in sorted(self.indexes.values(), key=lambda sort_index: sort_index.last_used):
+                if sum(warm_index.memory for warm_index in self.indexes.values()) <= memory_cap:
+                    break
+                del self.indexes[index.root]
+                # Debug
+                logging.info(f"Removed index of {index.root} from memory")
+
+    # Getting an index, which contains the directory and is still valid, or loading one.
+    # Indexes are loaded without holding the lock, so other searches and the status aren't blocked.
+    # Returns the index and if its files came from memory or the cache, which is False if it was scanned for the search
+    def get_index(self, directory: str, new_cache_file: bool) -> tuple[WarmIndex, bool]:
+        # Deleting old caches, which removes their indexes
+        FF_Files.cache_test(is_launching=False)
+
+        with self.indexes_lock:
+            # Removing indexes whose cache was deleted or changed
+            for index in list(self.indexes.values()):
+                if not index.is_valid():
+                    del self.indexes[index.root]
+
+            # The smallest index containing the directory
+            fitting_indexes = [index for index in self.indexes.values() if index.contains(directory)]
+            if fitting_indexes and not new_cache_file:
+                index = min(fitting_indexes, key=lambda fitting_index: len(fitting_index.paths))
+                index.last_used = time()
+                return index, True
+
+            # Another search is already loading the folder
+            loading_index = self.loading_indexes.get(directory)
+            if loading_index is None:
+                loading_index = self.loading_indexes[directory] = Future()
+                is_loading = True
+            else:
+                is_loading = False
+
+        # Waiting for the other search, raises the same error if loading failed
+        if not is_loading:
+            index = loading_index.result()
+            return index, index.used_cache
+
+        try:
+            index = WarmIndex(directory, new_cache_file)
+        except BaseException as loading_error:
+            with self.indexes_lock:
+                del self.loading_indexes[directory]
+            loading_index.set_exception(loading_error)
+            raise
+
+        with self.indexes_lock:
+            self.indexes[directory] = index
+            del self.loading_indexes[directory]
+        loading_index.set_result(index)
+
+        self.evict(MEMORY_CAP)
+        return index, index.used_cache
+
+    # The state of the daemon for the status command
+    def get_status(self) -> dict:
+        with self.indexes_lock:
+            return {"indexes": [{"root": index.root,
+                                 "entries": len(index.paths),
+                                 "memory": index.memory,
+                                 "idle": time() - index.last_used} for index in self.indexes.values()],
+                    "loading": list(self.loading_indexes),
+                    "memory": sum(index.memory for index in self.indexes.values())}
+
+
+# Answering one connection
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def send(self, message: dict):
+        self.wfile.write(dumps(message).encode() + b"\n")
+
+    def handle(self):
+        try:
+            request = loads(self.rfile.readline())
+        except ValueError:
+            self.send({"error": {"kind": "protocol", "title": "Protocol Error!", "message": "Invalid request"}})
+            return
+
+        if request.get("command") == "status":
+            self.send({"done": self.server.get_status()})
+        elif request.get("command") == "stop":
+            self.send({"done": {}})
+            threading.Thread(target=self.server.shutdown).start()
+        elif request.get("command") == "search":
+            self.search(request)
+        else:
+            self.send({"error": {"kind": "protocol", "title": "Protocol Error!",
+                                 "message": f"Unknown command: {request.get('command')}"}})
+
+    def search(self, request: dict):
+        self.server.last_search = time()
+        try:
+            query = FF_Search_Engine.SearchQuery(**request["query"])
+            query.validate()
+            index, index_used_cache = self.server.get_index(query.directory, query.new_cache_file)
+        except FF_Search_Engine.SearchError as search_error:
+            self.send({"error": {"kind": search_error.kind, "title": search_error.title,
+                                 "message": search_error.message}})
+            return
+        except (TypeError, KeyError, OSError) as request_error:
+            self.send({"error": {"kind": "protocol", "title": "Protocol Error!", "message": str(request_error)}})
+            return
+
+        engine = WarmSearchEngine(query, index, progress=lambda stage: self.send({"stage": stage}),
+                                  index_used_cache=index_used_cache)
+
+        # Sorted results are sent after searching, else every result is sent as soon as it is found
+        if request.get("sort", True):
+            search_result = engine.run()
+            results = search_result.found_path_list
+        else:
+            search_result = None
+            results = engine.iter_results()
+
+        batch = []
+        result_count = 0
+        for result in results:
+            batch.append((result, index[result]))
+            if len(batch) == RESULT_BATCH_SIZE:
+                self.send({"results": batch})
+                result_count += len(batch)
+                batch = []
+        if batch:
+            self.send({"results": batch})
+            result_count += len(batch)
+
+        self.send({"done": {"count": result_count,
+                            "timings": search_result.timings if search_result is not None else None,
+                            "stats": engine.stats.as_dict(),
+                            "cache_file": index.cache_file}})
+
+
+# Testing if a daemon is answering at the socket
+def is_running(socket_path: str = SOCKET_PATH) -> bool:
+    try:
+        send_command("status", socket_path)
+        return True
+    except DaemonUnavailable:
+        return False
+
+
+# Connecting to the daemon and sending a request, yields every message of the answer
+def send_request(request: dict, socket_path: str = SOCKET_PATH):
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        raise DaemonUnavailable
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(socket_path)
+    except OSError:
+        raise DaemonUnavailable
+
+    with client, client.makefile("rb") as answer:
+        client.sendall(dumps({"VERSION": FF_DAEMON_VERSION, **request}).encode() + b"\n")
+        for line in answer:
+            yield loads(line)
+
+
+# Sending a command (status or stop), returns the answer
+def send_command(command: str, socket_path: str = SOCKET_PATH) -> dict:
+    for message in send_request({"command": command}, socket_path):
+        if "done" in message:
+            return message["done"]
+    raise DaemonUnavailable
+
+
+# Sending a search to the daemon, yields every result with its type,
+# the last value of the iterator is the done message, raises SearchError if the query is wrong
+def iter_search(query: FF_Search_Engine.SearchQuery, progress=None, sort: bool = True,
+                socket_path: str = SOCKET_PATH):
+    for message in send_request({"command": "search", "query": query.as_dict(), "sort": sort}, socket_path):
+        if "results" in message:
+            yield from message["results"]
+        elif "stage" in message:
+            if progress is not None:
+                progress(message["stage"])
+        elif "done" in message:
+            return message["done"]
+        elif "error" in message:
+            raise FF_Search_Engine.SearchError(**message["error"])
+
+    # The daemon closed the connection without finishing
+    raise DaemonUnavailable
+
+
+# Sending a search to the daemon and returning the sorted results like SearchEngine.run()
+def run_search(query: FF_Search_Engine.SearchQuery, progress=None, socket_path: str = SOCKET_PATH):
+    results = iter_search(query, progress, True, socket_path)
+    found_path_list = []
+    while True:
+        try:
+            found_path_list.append(next(results)[0])
+        except StopIteration as done:
+            return FF_Search_Engine.SearchResult(found_path_list, done.value["timings"], done.value["cache_file"], query,
+                                                 done.value.get("stats"))
@@ -12,16 +12,14 @@
 import logging
 import os
 from sys import platform
-from json import load
+from json import dump, load
 from time import perf_counter, time, ctime
-import difflib
 import gc
-import hashlib
 
 # PySide6 Gui Imports
 from PySide6.QtWidgets import (QMainWindow, QWidget, QGridLayout, QHBoxLayout, QVBoxLayout, QLabel, QSlider, QSpinBox,
                                QDialogButtonBox, QSpacerItem, QSizePolicy, QPushButton, QTreeWidget, QTreeWidgetItem,
-                               QComboBox)
+                               QComboBox, QFileDialog, QAbstractItemView)
 from PySide6.QtCore import Qt, QSize, Signal, QObject, QThreadPool
 from PySide6.QtGui import QFont, QAction
 
@@ -29,9 +27,16 @@ from PySide6.QtGui import QFont, QAction
 import FF_Main_UI
 import FF_Menubar
 import FF_Additional_UI
+import FF_Profiling
 import FF_Files
+import FF_Duplicated_Report
+import FF_Grouping
+import FF_Hashing
+import FF_Image_Hashing
 import FF_About_UI
 import FF_Search
+import FF_Search_Engine
+import FF_Settings
 
 # Global variables
 global duplicated_dict, time_dict, duplicated_parent_file_path_dict
@@ -115,6 +120,8 @@ class DuplicatedSettings:
         # Match percentage label
         self.match_label = QLabel(parent=self.Duplicated_Settings)
         self.match_label.setText("Files must match at least (percentage):")
+        self.match_label.setToolTip("For file content: Below 100%, images are compared by how they look "
+                                    "and other files are ignored")
         self.Duplicated_Settings_Layout.addWidget(self.match_label)
 
         # Slider
@@ -132,21 +139,16 @@ class DuplicatedSettings:
         # Set value to 100 %
         self.spinbox.setValue(100)
 
-        # Deactivate and activate the slider and spinbox if content is selected
+        # Set the slider and spinbox to 100% if content is selected,
+        # below 100% only images are compared by how they look
         def de_activate_content():
             if self.mode_selector_combobox.currentText() == self.duplicated_mode_display_name_dict["content"]:
-                logging.debug("deactivating content")
-                self.match_label.setDisabled(True)
-                self.slider.setDisabled(True)
-                self.spinbox.setDisabled(True)
+                logging.debug("content selected")
                 # Set it to 100%
                 self.spinbox.setValue(100)
 
             else:
                 logging.debug("activating name")
-                self.match_label.setDisabled(False)
-                self.slider.setDisabled(False)
-                self.spinbox.setDisabled(False)
                 # Set it to the saved value
                 self.spinbox.setValue(self.saved_value)
 
@@ -240,9 +242,10 @@ class DuplicatedSettings:
             # Closing the menu bar logger
             self.event_class.finished.connect(self.ui_logger.close)
 
-            # Starting Thread
+            # Starting Thread, profiling it if it was requested
+            find_duplicated = FF_Profiling.profiled_if_requested("duplicated", FindDuplicated)
             QThreadPool(self.Duplicated_Settings).start(
-                lambda: FindDuplicated(
+                lambda: find_duplicated(
                     criteria=criteria,
                     matched_list=matched_list,
                     signals=self.event_class))
@@ -343,11 +346,20 @@ class DuplicatedUI:
         self.Duplicated_Tree.setColumnWidth(1, 20)
         self.Duplicated_Tree.setColumnWidth(0, 550)
         self.Duplicated_Tree.horizontalScrollBar().show()
+        # Multiple files can be selected with Shift or Ctrl/Cmd
+        self.Duplicated_Tree.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
 
         # Taking the keys which are the size or a filename and replacing them with absolute paths
+        # The original keys (hash, name or size) are kept for exporting a report
+        group_keys = {}
         for file_name in matched_dict.copy():
+            parent_path = matched_parent_file_path_dict[file_name]
+            group_keys[parent_path] = file_name
+            # Similar images already use the path as key
+            if parent_path == file_name:
+                continue
             # Taking a name like "name.pdf" or a size like 13MB and converting it to an absolute path
-            matched_dict[matched_parent_file_path_dict[file_name]] = matched_dict[file_name]
+            matched_dict[parent_path] = matched_dict[file_name]
             # Cleaning up
             del matched_dict[file_name]
 
@@ -357,19 +369,19 @@ class DuplicatedUI:
         if criteria["sorting"] == "File Name":
             logging.info("Sorting list by name...")
             # Sort the main files
-            matched_sorted_list.sort(key=FF_Search.Sort.name)
+            matched_sorted_list.sort(key=FF_Search_Engine.Sort.name)
             # Sort files in file groups
             for sub_file_set_key in matched_sorted_list:
-                matched_dict[sub_file_set_key] = sorted(list(matched_dict[sub_file_set_key]), key=FF_Search.Sort.name)
+                matched_dict[sub_file_set_key] = sorted(list(matched_dict[sub_file_set_key]), key=FF_Search_Engine.Sort.name)
 
         elif criteria["sorting"] == "File Size":
             logging.info("Sorting list by size...")
             # Sort the main files
-            matched_sorted_list.sort(key=FF_Search.Sort.size, reverse=True)
+            matched_sorted_list.sort(key=FF_Search_Engine.Sort.size, reverse=True)
             # Sort files in file groups
             for sub_file_set_key in matched_sorted_list:
                 matched_dict[sub_file_set_key] = sorted(
-                    list(matched_dict[sub_file_set_key]), key=FF_Search.Sort.size, reverse=True)
+                    list(matched_dict[sub_file_set_key]), key=FF_Search_Engine.Sort.size, reverse=True)
 
         elif criteria["sorting"] == "Date Created":
             logging.info(f"Sorting list by creation date on {platform}...")
@@ -378,28 +390,28 @@ class DuplicatedUI:
             # because it's impossible to access with pure python)
             if platform == "win32" or platform == 'cygwin' or platform == "linux":
                 # Sort the main files
-                matched_sorted_list.sort(key=FF_Search.Sort.c_date_win)
+                matched_sorted_list.sort(key=FF_Search_Engine.Sort.c_date_win)
                 # Sort files in file groups
                 for sub_file_set_key in matched_sorted_list:
                     matched_dict[sub_file_set_key] = sorted(list(matched_dict[sub_file_set_key]),
-                                                            key=FF_Search.Sort.c_date_win)
+                                                            key=FF_Search_Engine.Sort.c_date_win)
 
             # On Mac
             if platform == "darwin":
                 # Sort the main files
-                matched_sorted_list.sort(key=FF_Search.Sort.c_date_mac)
+                matched_sorted_list.sort(key=FF_Search_Engine.Sort.c_date_mac)
                 # Sort files in file groups
                 for sub_file_set_key in matched_sorted_list:
                     matched_dict[sub_file_set_key] = sorted(list(matched_dict[sub_file_set_key]),
-                                                            key=FF_Search.Sort.c_date_mac)
+                                                            key=FF_Search_Engine.Sort.c_date_mac)
 
         elif criteria["sorting"] == "Date Modified":
             logging.info("Sorting list by modification date...")
             # Sort the main files
-            matched_sorted_list.sort(key=FF_Search.Sort.m_date)
+            matched_sorted_list.sort(key=FF_Search_Engine.Sort.m_date)
             # Sort files in file groups
             for sub_file_set_key in matched_sorted_list:
-                matched_dict[sub_file_set_key] = sorted(list(matched_dict[sub_file_set_key]), key=FF_Search.Sort.m_date)
+                matched_dict[sub_file_set_key] = sorted(list(matched_dict[sub_file_set_key]), key=FF_Search_Engine.Sort.m_date)
 
         elif criteria["sorting"] == "Path":
             logging.info("Sorting list by path...")
@@ -417,6 +429,8 @@ class DuplicatedUI:
         for main_item in matched_sorted_list:
             # main item
             main_tree_item = QTreeWidgetItem(self.Duplicated_Tree)
+            # Files (device and inode) in the group, to mark hard links to the same file
+            group_inodes = {self.get_inode(main_item)}
 
             # Iterating through the set of single files under the key
             for sub_item in matched_dict[main_item]:
@@ -426,6 +440,13 @@ class DuplicatedUI:
                 sub_tree_item.setText(1, FF_Files.conv_file_size(FF_Files.get_file_size(sub_item)))
                 sub_tree_item.setTextAlignment(1, Qt.AlignmentFlag.AlignRight)
 
+                # Hard links don't take up space, so they are marked
+                sub_item_inode = self.get_inode(sub_item)
+                if sub_item_inode is not None and sub_item_inode in group_inodes:
+                    sub_tree_item.setText(1, f"Hard link, {sub_tree_item.text(1)}")
+                    sub_tree_item.setToolTip(1, "Same file as another file in this group, deleting it frees no space")
+                group_inodes.add(sub_item_inode)
+
             # Set the text
             main_tree_item.setText(0, main_item)
             main_tree_item.setText(1, FF_Files.conv_file_size(FF_Files.get_file_size(main_item)))
@@ -440,10 +461,64 @@ class DuplicatedUI:
         # Add the model to the Layout
         self.Duplicated_Layout.addWidget(self.Duplicated_Tree, 1, 0, 5, 8)
 
+        # Exporting all groups as JSON Lines or CSV
+        def export_report():
+            save_dialog = QFileDialog.getSaveFileName(self.Duplicated_Window, "Export Duplicated Files Report",
+                                                      FF_Files.USER_FOLDER, "JSON Lines (*.jsonl);;CSV (*.csv)")
+            # Debug
+            logging.debug(f"Asked for storage place of report. Got: {save_dialog}")
+
+            if save_dialog[0] == "":
+                return
+
+            # Normalize the path and selecting the first item, because it's the path
+            report_file = os.path.normpath(save_dialog[0])
+
+            # If the suffix wasn't added, add it
+            if not (report_file.endswith(".jsonl") or report_file.endswith(".csv")):
+                if "CSV" in save_dialog[1]:
+                    report_file += ".csv"
+                else:
+                    report_file += ".jsonl"
+
+            # Taking the groups now, because files can be moved or deleted while exporting
+            report_groups = [(group_keys.get(main_item, main_item), [main_item, *matched_dict[main_item]])
+                             for main_item in matched_sorted_list]
+
+            # Qt6 signals, so the result is shown in the main thread
+            class ExportSignals(QObject):
+                finished = Signal()
+                failed = Signal(str)
+
+            export_signals = ExportSignals()
+            export_signals.finished.connect(lambda: FF_Additional_UI.PopUps.show_info_messagebox(
+                "Report exported", f"Exported {len(report_groups)} groups to:\n{report_file}",
+                self.Duplicated_Window))
+            export_signals.failed.connect(lambda export_error: FF_Additional_UI.PopUps.show_critical_messagebox(
+                "Export Error!", f"Couldn't export the report to:\n{report_file}\n\n{export_error}",
+                self.Duplicated_Window))
+
+            # Writing one group after the other, sizes are read from disk, so this runs in a separate thread
+            def write_report():
+                try:
+                    with FF_Duplicated_Report.DuplicatedReportWriter(report_file, match_path) as report_writer:
+                        for group_key, group_members in report_groups:
+                            report_writer.add_group(group_key, group_members)
+                except (OSError, ValueError) as export_error:
+                    # Debug
+                    logging.error(f"Couldn't export the report to {report_file}: {export_error}")
+                    export_signals.failed.emit(str(export_error))
+                else:
+                    # Debug
+                    logging.info(f"Exported the report to {report_file}")
+                    export_signals.finished.emit()
+
+            QThreadPool(self.Duplicated_Window).start(write_report)
+
         # Setup menu bar
         menu_bar = FF_Menubar.MenuBar(
             parent=self.Duplicated_Window, window="duplicated", listbox=self.Duplicated_Tree, search_path=match_path,
-            cache_file_path=cache_file, matched_list=matched_dict)
+            cache_file_path=cache_file, matched_list=matched_dict, save_search=export_report)
 
         # If item is double-clicked
         self.Duplicated_Tree.itemDoubleClicked.connect(menu_bar.double_clicking_item)
@@ -533,6 +608,12 @@ class DuplicatedUI:
                 # Load time
                 cache_created_time = ctime(load(time_file)["c_time"])
 
+            # Time and bytes read of every stage, if finding duplicated files by content
+            if "stages" in time_needed_dict:
+                stages_text = f"\n\nStages:\n{FF_Hashing.format_stage_stats(time_needed_dict['stages'])}"
+            else:
+                stages_text = ""
+
             # Displaying infobox with time info
             FF_Additional_UI.PopUps.show_info_messagebox(
                 "Time Stats",
@@ -542,7 +623,8 @@ class DuplicatedUI:
                 "Creating UI: "
                 f"{round(time_needed_dict['time_after_building_ui'] - time_needed_dict['time_before_building_ui'], 3)}s"
                 f"\n---------\n"
-                f"Total: {round(time_needed_dict['time_after_building_ui'] - time_needed_dict['start_time'], 3)}s\n\n\n"
+                f"Total: {round(time_needed_dict['time_after_building_ui'] - time_needed_dict['start_time'], 3)}s"
+                f"{stages_text}\n\n\n"
                 ""
                 "Timestamps:\n"
                 f"Cache (basis for search results) created:\n{cache_created_time}\n"
@@ -561,6 +643,71 @@ class DuplicatedUI:
         # Collect garbage
         gc.collect()
 
+    # Getting the device and inode of a file, which are the same for hard links to the same file
+    @staticmethod
+    def get_inode(path: str) -> tuple[int, int] | None:
+        try:
+            path_stat = os.lstat(path)
+        except OSError:
+            return None
+
+        # Folders can't have hard links
+        if path_stat.st_nlink <= 1 or os.path.isdir(path):
+            return None
+        return path_stat.st_dev, path_stat.st_ino
+
+
+# Opening an exported report without finding the duplicated files again
+class LoadReport:
+    @staticmethod
+    def open_file(load_file, parent):
+        # No file was selected
+        if load_file == "":
+            return
+        # Debug
+        logging.info(f"Loading {load_file}")
+
+        # Time for loading the report is displayed as time for finding the duplicates
+        report_time_dict = {"start_time": perf_counter()}
+
+        header = FF_Duplicated_Report.read_report_header(load_file)
+        # Debug
+        logging.info(f"Report has version: {header['VERSION']}, local version: {FF_Duplicated_Report.FF_REPORT_VERSION}")
+
+        # The report is read group by group, like the result of FindDuplicated
+        report_dict = {}
+        report_parent_file_path_dict = {}
+        for group_key, group_members in FF_Duplicated_Report.read_report_groups(load_file):
+            # Keys could repeat in an edited report
+            while group_key in report_dict:
+                group_key = f"{group_key}-{len(report_dict)}"
+            report_parent_file_path_dict[group_key] = group_members[0]
+            # A list, so the files keep the order of the report
+            report_dict[group_key] = group_members[1:]
+
+        # Creating a cache file for the menu bar, like with a saved search
+        cache_file = FF_Files.path_to_cache_file(load_file)
+        found_path_set = [member for group_key in report_dict
+                          for member in (report_parent_file_path_dict[group_key], *report_dict[group_key])]
+        with open(cache_file, "w") as cached_report:
+            dump({"VERSION": FF_Files.FF_CACHE_VERSION,
+                  "found_path_set": found_path_set,
+                  "type_dict": {}}, cached_report)
+        with open(FF_Files.path_to_cache_file(load_file, True), "w") as cached_report:
+            dump({"c_time": header["created"],
+                  "cache_version": FF_Files.FF_CACHE_VERSION,
+                  "original_cache_file": cache_file},
+                 cached_report)
+
+        # Update search status label, the UI reduces it again
+        FF_Search.ACTIVE_SEARCH_THREADS += 1
+        FF_Main_UI.MainWindow.update_search_status_label()
+
+        # Open the UI, the groups keep the order of the report
+        search_path = header["search_path"] if header["search_path"] is not None else load_file
+        DuplicatedUI(parent, search_path, {"sorting": "None (fastest)"},
+                     report_dict, report_parent_file_path_dict, report_time_dict, cache_file)
+
 
 # Algorithms to find duplicated files
 class FindDuplicated:
@@ -577,11 +724,6 @@ class FindDuplicated:
 
         found_path_set = matched_list
 
-        # Content checking always requires size checking
-        if criteria["content"]["activated"]:
-            criteria["size"]["activated"] = True
-            criteria["size"]["match_percentage"] = criteria["content"]["match_percentage"]
-
         logging.debug("Finished loading cache")
 
         # Sort by name
@@ -613,43 +755,37 @@ class FindDuplicated:
             else:
 
                 match_factor = criteria["name"]["match_percentage"] / 100
+                # Index of all names, which are the parent of a group, for finding the closest name fast
+                name_index = FF_Grouping.NameIndex(cutoff=match_factor)
 
                 # Iterating through all files
                 for file in found_path_set:
                     # Get the basename, ignoring case
                     low_basename = os.path.basename(file).lower()
                     # If low_basename isn't already in exist already_text if there is something in the allowed range
-                    if low_basename not in exists_already:
+                    if low_basename not in name_index:
 
-                        # If this is the first file being iterated
-                        if exists_already == set():
-                            exists_already.add(low_basename)
-                            duplicated_name_dict[low_basename] = set()
-                            duplicated_name_parent_file_path_dict[low_basename] = file
-                            continue
+                        # Get the closest match, over the match factor, same as difflib.get_close_matches()
+                        closest_match = name_index.closest_match(low_basename)
 
-                        # Get the closest match, over the match factor. Function returns a list
-                        closest_match = difflib.get_close_matches(
-                            low_basename, exists_already, n=1, cutoff=match_factor)
-
-                        # There is no match (empty list) with the file, add it to exists_already
-                        if not closest_match:
-                            exists_already.add(low_basename)
+                        # There is no match with the file, add it to the index
+                        if closest_match is None:
+                            name_index.add(low_basename)
                             duplicated_name_dict[low_basename] = set()
                             duplicated_name_parent_file_path_dict[low_basename] = file
 
                         # Add it to the closest match
                         else:
-                            # Take tho only element of the list
-                            duplicated_name_dict[closest_match[0]].add(file)
+                            duplicated_name_dict[closest_match].add(file)
 
                     else:
                         # Add the file to the duplicated dict
                         duplicated_name_dict[low_basename].add(file)
 
-            # Removing sets that have no duplicates
+            # Removing groups that have no duplicates, the sets don't contain the parent,
+            # so a group with one file in the set has two files
             for duplicated_file in duplicated_name_dict.copy():
-                if len(duplicated_name_dict[duplicated_file]) <= 1:
+                if not duplicated_name_dict[duplicated_file]:
                     duplicated_name_dict.pop(duplicated_file)
 
             # Finalize
@@ -684,187 +820,92 @@ class FindDuplicated:
                         duplicated_size_dict[size].add(file)
 
             else:
-                # factor of allowed divergence
-                # factor 1, upper = 1, lower = 1
-                # factor 0.8, upper = 1.2, lower = 0.8
-                # factor 0.4, upper = 1.6, lower = 0.8
-                lower_allowed_divergence_factor = criteria["size"]["match_percentage"] / 100
-                upper_allowed_divergence_factor = 1 + (1 - lower_allowed_divergence_factor)
-
-                logging.info(f"{lower_allowed_divergence_factor=}, {upper_allowed_divergence_factor=}")
+                match_factor = criteria["size"]["match_percentage"] / 100
 
+                # Getting the size of every file
+                file_sizes = {}
                 for file in found_path_set:
-
                     # Try getting the size
                     try:
-                        size = FF_Files.get_file_size(file)
+                        file_sizes[file] = FF_Files.get_file_size(file)
                     except OSError:
                         continue
 
-                    if size not in exists_already:
-
-                        # If exist already is empty
-                        if not exists_already == set():
-                            # Get the closest match
-                            closest_match = sorted(
-                                exists_already,
-                                key=lambda file_size: self.sort_size(list_file_size=file_size, file_size=size))[0]
-                        else:
-                            closest_match = -1
-
-                        if lower_allowed_divergence_factor <= closest_match <= upper_allowed_divergence_factor:
-                            # Add the file to the closest match
-                            duplicated_size_dict[closest_match].add(file)
-                            # Next file
-                            continue
-
-                        # If there really isn't anything in the allowed range
-                        else:
-                            # Add the file to the exists_already
-                            exists_already.add(size)
-                            duplicated_size_dict[size] = set()
-                            duplicated_size_parent_file_path_dict[size] = file
-
-                    # If there is an exact duplicate
-                    else:
-                        # Add the file to the duplicated dict
-                        duplicated_size_dict[size].add(file)
-                        continue
+                # Grouping files sorted by size
+                for size, size_group in FF_Grouping.group_by_similar_size(file_sizes, match_factor).items():
+                    # The smallest file is displayed as the parent of the group
+                    duplicated_size_parent_file_path_dict[size] = size_group[0]
+                    duplicated_size_dict[size] = set(size_group[1:])
 
-            # Removing sets that have no duplicates
+            # Removing groups that have no duplicates, the sets don't contain the parent,
+            # so a group with one file in the set has two files
             for duplicated_file in duplicated_size_dict.copy():
-                if len(duplicated_size_dict[duplicated_file]) <= 1:
+                if not duplicated_size_dict[duplicated_file]:
                     duplicated_size_dict.pop(duplicated_file)
 
-            # If content is activated size is ALWAYS checked first
-            if criteria["content"]["activated"]:
-                # Debug
-                logging.debug(f"Grouping by content, {criteria['content']['match_percentage']=}")
-
-                # Getting file that have a chance of being duplicated
-                duplicated_files = set()
-                for duplicated_file_set_key in duplicated_size_dict.keys():
-                    for duplicated_file in duplicated_size_dict[duplicated_file_set_key]:
-                        duplicated_files.add(duplicated_file)
-
-                duplicated_content_dict = {}
-                duplicated_content_parent_file_path_dict = {}
-                exists_already = set()
-
-                # If files must match exactly
-                if criteria["content"]["match_percentage"] == 100:
-
-                    # Buffer size
-                    buffer_size = 65536
-
-                    # Iterating through all files that have the same size
-                    for file in duplicated_files:
-
-                        # If the file isn't a folder
-                        if os.path.isfile(file):
-                            # Open every file
-                            try:
-                                with open(file, "rb") as open_hash_file:
-                                    # Initializing the sha1() method
-                                    computing_hash = hashlib.sha1(usedforsecurity=False)
-
-                                    # Loading the file into the hash function
-                                    while True:
-                                        # reading data = BUF_SIZE from the
-                                        # file and saving it in a variable
-                                        data = open_hash_file.read(buffer_size)
-
-                                        # True if eof = 1
-                                        if not data:
-                                            break
-                                        # Updating hash
-                                        computing_hash.update(data)
-
-                                    # Getting hash in hex form
-                                    file_hash = computing_hash.hexdigest()
-                            except OSError:
-                                continue
-                        else:
-                            # If the file is a folder
-                            # Test if the folder is empty
-                            if not os.listdir(file):
-                                continue
-                            # Initializing the sha1() method
-                            computing_hash = hashlib.sha1(usedforsecurity=False)
-
-                            # Walk through all folders
-                            for (root_dir, _folders, files) in os.walk(file):
-                                for sub_file in files:
-                                    try:
-                                        with open(os.path.join(root_dir, sub_file), "rb") as open_hash_file:
-
-                                            # Loading the file into the hash function
-                                            while True:
-                                                # reading data = BUF_SIZE from the
-                                                # file and saving it in a variable
-                                                data = open_hash_file.read(buffer_size)
-
-                                                # True if eof = 1
-                                                if not data:
-                                                    break
-                                                # Updating hash
-                                                computing_hash.update(data)
-
-                                    except OSError:
-                                        continue
-                            # Getting hash in hex form
-                            file_hash = computing_hash.hexdigest()
-
-                        # If everything ran successful
-                        # If hash doesn't already exist
-                        if file_hash not in exists_already:
-                            exists_already.add(file_hash)
-                            duplicated_content_dict[file_hash] = set()
-                            duplicated_content_parent_file_path_dict[file_hash] = file
-
-                        # If hash exists
-                        else:
-                            duplicated_content_dict[file_hash].add(file)
+            # Finalize
+            duplicated_parent_file_path_dict = duplicated_size_parent_file_path_dict
+            duplicated_dict = duplicated_size_dict
 
-                # TODO: If match percentage is not 100% use pHash
-                else:
-                    pass
+        # Group by content
+        if criteria["content"]["activated"]:
+            # Debug
+            logging.debug(f"Grouping by content, {criteria['content']['match_percentage']=}")
+
+            duplicated_content_dict = {}
+            duplicated_content_parent_file_path_dict = {}
+
+            # If files must match exactly
+            if criteria["content"]["match_percentage"] == 100:
+                # Grouping by size, then by a partial hash and only then by the full hash
+                # Hashing in parallel with the number of threads from the settings
+                hashing_engine = FF_Hashing.HashingEngine(
+                    workers=FF_Settings.SettingsWindow.load_setting("hashing_threads"))
+                # Hash algorithm from the settings, xxHash may not be installed anymore
+                hashing_algorithm = FF_Settings.SettingsWindow.load_setting("hashing_algorithm")
+                if hashing_algorithm not in FF_Hashing.HASH_ALGORITHMS:
+                    logging.warning(f"{hashing_algorithm} is not available, "
+                                    f"using {FF_Files.DEFAULT_HASHING_ALGORITHM} instead")
+                    hashing_algorithm = FF_Files.DEFAULT_HASHING_ALGORITHM
+
+                # Hashes of unchanged files are loaded from the hash cache
+                with FF_Hashing.HashCache() as hash_cache:
+                    content_groups, time_dict["stages"] = FF_Hashing.group_by_content(
+                        found_path_set, hashing_engine, hash_cache, algorithm=hashing_algorithm,
+                        buffer_size=FF_Settings.SettingsWindow.load_setting("hashing_buffer_size"))
+
+                for file_hash, content_group in content_groups.items():
+                    # The first file is displayed as the parent of the group
+                    duplicated_content_parent_file_path_dict[file_hash] = content_group[0]
+                    duplicated_content_dict[file_hash] = set(content_group[1:])
+
+            # If match percentage is not 100%, compare how images look with a perceptual hash
+            else:
+                # Number of bits the hashes of two images can be different
+                max_distance = FF_Image_Hashing.match_percentage_to_distance(
+                    criteria["content"]["match_percentage"])
 
-                # Removing sets that have no duplicates
-                for duplicated_file in duplicated_content_dict.copy():
-                    # If set lengths is only 1, that means there are no files that are the same
-                    if len(duplicated_content_dict[duplicated_file]) <= 1:
-                        duplicated_content_dict.pop(duplicated_file)
+                # Hashes of unchanged images are loaded from the hash cache
+                with FF_Hashing.HashCache() as hash_cache:
+                    image_groups = FF_Image_Hashing.group_similar_images(found_path_set, max_distance, hash_cache)
 
-                    elif os.path.isdir(duplicated_file):
+                for parent_image, image_group in image_groups.items():
+                    # The first image is displayed as the parent of the group
+                    duplicated_content_parent_file_path_dict[parent_image] = parent_image
+                    duplicated_content_dict[parent_image] = set(image_group[1:])
+
+                # Removing groups without similar images
+                for duplicated_file in duplicated_content_dict.copy():
+                    if not duplicated_content_dict[duplicated_file]:
                         duplicated_content_dict.pop(duplicated_file)
 
-                # Finalize
-                duplicated_parent_file_path_dict = duplicated_content_parent_file_path_dict
-                duplicated_dict = duplicated_content_dict
+            # Finalize
+            duplicated_parent_file_path_dict = duplicated_content_parent_file_path_dict
+            duplicated_dict = duplicated_content_dict
 
-            # If content is not activated
-            else:
-                # Finalize
-                duplicated_parent_file_path_dict = duplicated_size_parent_file_path_dict
-                duplicated_dict = duplicated_size_dict
         # Debug
         logging.info("Finished grouping, launching UI...")
         # Launch UI
         signals.finished.emit()
 
         gc.collect()
-
-    # Function is used as a "key" in list.sorted(). Sorts the list by closest proximity to file_size
-    @staticmethod
-    def sort_size(list_file_size, file_size):
-
-        # Difference in size between the file getting checked and the stored file
-        size_difference = file_size - list_file_size
-
-        # Make size_different positive
-        if size_difference < 0:
-            return size_difference * -1
-
-        else:
-            return size_difference
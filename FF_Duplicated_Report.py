@@ -0,0 +1,160 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the code for exporting and importing reports of duplicated files as JSON Lines or CSV
+
+# Imports
+import csv
+import logging
+import os
+import stat
+from json import dumps, loads
+from time import time
+
+# Projects Libraries
+import FF_Files
+
+# Version of the report format
+FF_REPORT_VERSION = 1
+# The header is written first and overwritten with the totals at the end, so space is reserved for it
+REPORT_HEADER_SIZE = 4096
+# Columns of a CSV report, every member of a group has its own row
+CSV_COLUMNS = ["group_id", "digest", "member", "size", "reclaimable_bytes"]
+
+
+# Writing a report group by group, so only one group has to be in memory.
+# JSON Lines reports have one line per group, CSV reports one row per member of a group.
+# The first line is a header with the total number of groups, files and wasted bytes
+class DuplicatedReportWriter:
+    def __init__(self, report_path: str, search_path: str):
+        self.report_path = report_path
+        self.search_path = search_path
+        self.is_csv = report_path.lower().endswith(".csv")
+
+        # Totals for the header
+        self.group_count = 0
+        self.file_count = 0
+        self.wasted_bytes = 0
+
+        self.report_file = open(report_path, "w", newline="", encoding="utf-8")
+        # Reserving space for the header
+        self.report_file.write(" " * (REPORT_HEADER_SIZE - 1) + "\n")
+
+        if self.is_csv:
+            self.csv_writer = csv.writer(self.report_file)
+            self.csv_writer.writerow(CSV_COLUMNS)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exception):
+        self.close()
+
+    # Writing a group, the first member is the one that is kept,
+    # every other member can be deleted and frees its size, except hard links to an already counted file
+    def add_group(self, digest, members: list[str]):
+        self.group_count += 1
+        group_id = self.group_count
+
+        member_sizes = []
+        reclaimable_bytes = []
+        counted_inodes = set()
+        for member in members:
+            try:
+                member_stat = os.lstat(member)
+            except OSError:
+                member_sizes.append(-1)
+                reclaimable_bytes.append(0)
+                continue
+
+            if stat.S_ISDIR(member_stat.st_mode):
+                size = FF_Files.get_file_size(member)
+            else:
+                size = member_stat.st_size
+            member_sizes.append(size)
+
+            # Hard links to the same file don't take up more space
+            inode = (member_stat.st_dev, member_stat.st_ino)
+            if not counted_inodes or inode in counted_inodes or size < 0:
+                reclaimable_bytes.append(0)
+            else:
+                reclaimable_bytes.append(size)
+            counted_inodes.add(inode)
+
+        self.file_count += len(members)
+        self.wasted_bytes += sum(reclaimable_bytes)
+
+        if self.is_csv:
+            for member, size, member_reclaimable_bytes in zip(members, member_sizes, reclaimable_bytes):
+                self.csv_writer.writerow([group_id, digest, member, size, member_reclaimable_bytes])
+        else:
+            self.report_file.write(dumps({"group_id": group_id,
+                                          "digest": digest,
+                                          "size": member_sizes[0] if member_sizes else 0,
+                                          "members": members,
+                                          "reclaimable_bytes": sum(reclaimable_bytes)}) + "\n")
+
+    # Writing the header with the totals and closing the file
+    def close(self):
+        header = {"type": "File Find duplicated report",
+                  "VERSION": FF_REPORT_VERSION,
+                  "search_path": self.search_path,
+                  "created": time(),
+                  "groups": self.group_count,
+                  "files": self.file_count,
+                  "wasted_bytes": self.wasted_bytes}
+        header_line = dumps(header)
+        # If the search path is too long for the reserved space, it is left out
+        if len(header_line) >= REPORT_HEADER_SIZE - 2:
+            header["search_path"] = None
+            header_line = dumps(header)
+        # CSV readers can skip the header as a comment
+        if self.is_csv:
+            header_line = f"#{header_line}"
+
+        # Overwriting the reserved space, the header only contains ASCII, so the length in bytes is the same
+        self.report_file.seek(0)
+        self.report_file.write(header_line.ljust(REPORT_HEADER_SIZE - 1))
+        self.report_file.close()
+
+        # Debug
+        logging.info(f"Exported {self.group_count} groups to {self.report_path}, "
+                     f"{FF_Files.conv_file_size(self.wasted_bytes)} can be freed")
+
+
+# Reading the header of a report
+def read_report_header(report_path: str) -> dict:
+    with open(report_path, encoding="utf-8") as report_file:
+        return loads(report_file.readline().strip().removeprefix("#"))
+
+
+# Reading the groups of a report one by one, yields the digest and the members of every group
+def read_report_groups(report_path: str):
+    with open(report_path, newline="", encoding="utf-8") as report_file:
+        # Skipping the header
+        report_file.readline()
+
+        if report_path.lower().endswith(".csv"):
+            # Rows of the same group are next to each other
+            group_id = None
+            digest = None
+            members = []
+            for row in csv.DictReader(report_file):
+                if row["group_id"] != group_id:
+                    if members:
+                        yield digest, members
+                    group_id, digest, members = row["group_id"], row["digest"], []
+                members.append(row["member"])
+            if members:
+                yield digest, members
+
+        else:
+            for line in report_file:
+                if line.strip():
+                    group = loads(line)
+                    yield group["digest"], group["members"]
@@ -11,17 +11,21 @@
 # Imports
 import os
 import logging
+import stat
+import threading
 from json import load, dump, JSONDecodeError
 from sys import platform
 from time import time
+from unicodedata import normalize
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 
 # Versions
 VERSION: str = "5-feb-2025"
 VERSION_SHORT: str = "1.2"
 # Versions of file formats
 FF_FILTER_VERSION = 1
-FF_SEARCH_VERSION = 2
+FF_SEARCH_VERSION = 3
 FF_SETTINGS_VERSION = 1
 FF_CACHE_VERSION = 2
 
@@ -46,6 +50,7 @@ else:
 CACHED_SEARCHES_FOLDER = os.path.join(FF_LIB_FOLDER, "Cached Searches")
 CACHE_METADATA_FOLDER = os.path.join(FF_LIB_FOLDER, "Cache Metadata")
 ASSETS_FOLDER = os.path.join(FF_LIB_FOLDER, "assets")
+HASH_CACHE_FILE = os.path.join(FF_LIB_FOLDER, "Hash Cache.sqlite")
 
 SELECTED_DIR = USER_FOLDER
 
@@ -61,6 +66,24 @@ TARGET_ASSETS_FOLDER_HASH = "eb391462d1d9ad75cc63f8eca37a01abc3bbb3bd7af90b6eb86
 SECONDS_OF_A_DAY = 86400
 SECONDS_OF_A_WEEK = 604800
 
+# Number of threads used for hashing files when finding duplicated files
+DEFAULT_HASHING_THREADS = min(16, (os.cpu_count() or 1) * 2)
+# Hash algorithm and buffer size (in bytes) used for hashing files
+DEFAULT_HASHING_ALGORITHM = "sha1"
+DEFAULT_HASHING_BUFFER_SIZE = 65536
+# Number of threads and paths per task used for testing if found files still exist or reading their metadata
+STAT_THREADS = min(32, (os.cpu_count() or 1) * 4)
+STAT_CHUNK_SIZE = 4096
+
+# Held while testing if caches should be deleted
+CACHE_TEST_LOCK = threading.Lock()
+
+# Sub folders of the last listed folders, used for completing the directory, with the modification time of the folder
+SUBFOLDER_CACHE: dict[str, tuple[int, list[str]]] = {}
+SUBFOLDER_CACHE_SIZE = 64
+SUBFOLDER_CACHE_LOCK = threading.Lock()
+
+
 # File formats
 FILE_FORMATS = {"Image": ("png", "jpeg", "webp", "heic", "tiff", "gif", "tif", "bmp", "jpg", "tga"),
 
@@ -107,13 +130,20 @@ DEFAULT_SETTINGS = {"settings_version": FF_SETTINGS_VERSION,
                          "last_update_notice": time()},
                     "filter_preset_name": "Default",
                     "display_menu_bar_icon": True,
-                    "double_click_action": "View file in Finder/File Explorer"}
+                    "double_click_action": "View file in Finder/File Explorer",
+                    "hashing_threads": DEFAULT_HASHING_THREADS,
+                    "hashing_algorithm": DEFAULT_HASHING_ALGORITHM,
+                    "hashing_buffer_size": DEFAULT_HASHING_BUFFER_SIZE}
 
 # Color schemes
 RED_LIGHT_THEME_COLOR = "#b1100c"
 RED_DARK_THEME_COLOR = "#f27171"
 GREEN_LIGHT_THEME_COLOR = "#008200"
 GREEN_DARK_THEME_COLOR = "#1ae087"
+YELLOW_LIGHT_THEME_COLOR = "#a86b00"
+YELLOW_DARK_THEME_COLOR = "#f5c542"
+BLUE_LIGHT_THEME_COLOR = "#0b5cad"
+BLUE_DARK_THEME_COLOR = "#6cb4f5"
 GREY_DISABLED_COLOR = "#7f7f7f"
 
 
@@ -127,6 +157,18 @@ def remove_cache():
     logging.info("Cleared Cache successfully!\n")
 
 
+# Remove the cache of file hashes, used for finding duplicated files
+def remove_hash_cache():
+    logging.debug("Removing Hash Cache..")
+    # Also removing the files SQLite uses for writing
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(HASH_CACHE_FILE + suffix)
+        except FileNotFoundError:
+            pass
+    logging.info("Cleared Hash Cache successfully!\n")
+
+
 # Convert a file path to the corresponding cache file or metadata
 def path_to_cache_file(path, metadata=False):
     if not metadata:
@@ -145,79 +187,92 @@ def get_metadata_file_from_cache_file(cache_file):
 
 # Test if Cache should be deleted
 def cache_test(is_launching):
-    logging.debug("Testing if cache should be deleted..")
-    allowed_time_difference = None
-
-    # Loading Settings File
-    with open(os.path.join(FF_LIB_FOLDER, "Settings")) as settings_file:
-        # Taking the item four because it is the Cache Setting
-        cache_settings = load(settings_file)["cache"]
+    # Only one test at a time, because the test at launch runs in the background while a search can start
+    with CACHE_TEST_LOCK:
+        logging.debug("Testing if cache should be deleted..")
+        allowed_time_difference = None
+
+        # Loading the Cache Setting, imported here, because FF_Settings_Store imports this file
+        import FF_Settings_Store
+        cache_settings = FF_Settings_Store.SETTINGS.get_str("cache")
         logging.debug(f"{cache_settings=}")
 
-    # Deleting Cache on Launch
-    if cache_settings.lower() == "on launch" and is_launching:
-        logging.debug("Deleting Cache!")
-        remove_cache()
+        # Deleting Cache on Launch
+        if cache_settings.lower() == "on launch" and is_launching:
+            logging.debug("Deleting Cache!")
+            remove_cache()
 
-    elif cache_settings.lower() == "after two hours":
-        # Two hours are 7'200 seconds
-        allowed_time_difference = 7200
+        elif cache_settings.lower() == "after two hours":
+            # Two hours are 7'200 seconds
+            allowed_time_difference = 7200
 
-    # Deleting Cache after a Day
-    elif cache_settings == "after a Day":
-        allowed_time_difference = SECONDS_OF_A_DAY
+        # Deleting Cache after a Day
+        elif cache_settings == "after a Day":
+            allowed_time_difference = SECONDS_OF_A_DAY
 
-    # Deleting Cache after a Week
-    elif cache_settings == "after a Week":
-        allowed_time_difference = SECONDS_OF_A_WEEK
+        # Deleting Cache after a Week
+        elif cache_settings == "after a Week":
+            allowed_time_difference = SECONDS_OF_A_WEEK
 
-    # Skipping
-    else:
-        logging.debug("Skipping deleting...")
+        # Skipping
+        else:
+            logging.debug("Skipping deleting...")
 
-    if cache_settings.lower() in ("after a Week", "after a Day", "after two hours"):
-        # Looping through every file in CACHED_SEARCHES_FOLDER and getting separately stored creation tie
-        # Iterating through all files in the cache folder
-        for file in os.listdir(CACHED_SEARCHES_FOLDER):
-            try:
-                with open(os.path.join(CACHE_METADATA_FOLDER, file)) as time_file:
-                    # Load creation time
-                    cache_created_time = load(time_file)["c_time"]
-            except (JSONDecodeError, KeyError, FileNotFoundError):
+        if cache_settings.lower() in ("after a week", "after a day", "after two hours"):
+            # Looping through every file in CACHED_SEARCHES_FOLDER and getting separately stored creation tie
+            # Iterating through all files in the cache folder
+            for file in os.listdir(CACHED_SEARCHES_FOLDER):
                 try:
-                    os.remove(os.path.join(CACHE_METADATA_FOLDER, file))
-                except FileNotFoundError:
-                    pass
-                try:
-                    os.remove(os.path.join(CACHED_SEARCHES_FOLDER, file))
-                except FileNotFoundError:
-                    pass
-                continue
+                    with open(os.path.join(CACHE_METADATA_FOLDER, file)) as time_file:
+                        # Load creation time
+                        cache_created_time = load(time_file)["c_time"]
+                except (JSONDecodeError, KeyError, FileNotFoundError):
+                    try:
+                        os.remove(os.path.join(CACHE_METADATA_FOLDER, file))
+                    except FileNotFoundError:
+                        pass
+                    try:
+                        os.remove(os.path.join(CACHED_SEARCHES_FOLDER, file))
+                    except FileNotFoundError:
+                        pass
+                    continue
 
-            if cache_created_time < time() - allowed_time_difference:
-                logging.debug(f"Deleting Cache and it's metadata for dir: {file} because it's older than the allowed"
-                              f" time difference, {allowed_time_difference=}sec.")
-                # Remove cache
-                os.remove(os.path.join(CACHED_SEARCHES_FOLDER, file))
-                # Remove cache Metadata
-                os.remove(os.path.join(CACHE_METADATA_FOLDER, file))
+                if cache_created_time < time() - allowed_time_difference:
+                    logging.debug(f"Deleting Cache and it's metadata for dir: {file} because it's older than the allowed"
+                                  f" time difference, {allowed_time_difference=}sec.")
+                    # Remove cache
+                    os.remove(os.path.join(CACHED_SEARCHES_FOLDER, file))
+                    # Remove cache Metadata
+                    os.remove(os.path.join(CACHE_METADATA_FOLDER, file))
 
-    logging.debug("Finished Cache Testing!\n")
+        logging.debug("Finished Cache Testing!\n")
 
 
 # Function to get the File Size of a directory
 def get_file_size(input_file: str) -> int:
     if os.path.isdir(input_file):
         file_size_list_obj = 0
+        # Files with multiple hard links, which were already counted
+        counted_inodes = set()
         # Gets the size if the path is a folder with recursively searching th director<
         for root, _dirs, files in os.walk(input_file):
             for file in files:
                 try:
-                    if not os.path.islink(file):
-                        file_size_list_obj += os.path.getsize(os.path.join(root, file))
+                    file_stat = os.lstat(os.path.join(root, file))
+                except (OSError, ValueError):
+                    continue
 
-                except (FileNotFoundError, ValueError):
+                # Links don't take up space
+                if stat.S_ISLNK(file_stat.st_mode):
                     continue
+
+                # Hard links to the same file are only counted once
+                if file_stat.st_nlink > 1:
+                    if (file_stat.st_dev, file_stat.st_ino) in counted_inodes:
+                        continue
+                    counted_inodes.add((file_stat.st_dev, file_stat.st_ino))
+
+                file_size_list_obj += file_stat.st_size
     elif os.path.isfile(input_file):
         try:
             file_size_list_obj = os.path.getsize(input_file)
@@ -232,6 +287,165 @@ def get_file_size(input_file: str) -> int:
         return file_size_list_obj
 
 
+# Finding all files that don't exist anymore, the paths are tested in chunks by multiple threads,
+# because most time is spent waiting for the file system, especially on network drives
+def find_deleted_files(paths: list[str], workers: int = STAT_THREADS) -> set[str]:
+    def find_deleted_chunk(chunk_start):
+        return [path for path in paths[chunk_start:chunk_start + STAT_CHUNK_SIZE]
+                if not os.path.exists(path)]
+
+    deleted_files = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for deleted_chunk in executor.map(find_deleted_chunk, range(0, len(paths), STAT_CHUNK_SIZE)):
+            deleted_files.update(deleted_chunk)
+    return deleted_files
+
+
+# Getting the size, the modification time, the device and the inode of files, used for comparing snapshots.
+# Returns a list in the same order as paths, with None for files that don't exist anymore,
+# folders have no size and modification time, because they change with every file in them
+def get_snapshot_metadata(paths: list[str], workers: int = STAT_THREADS) -> list[list[int | None] | None]:
+    def get_chunk_metadata(chunk_start):
+        chunk_metadata = []
+        for path in paths[chunk_start:chunk_start + STAT_CHUNK_SIZE]:
+            try:
+                path_stat = os.lstat(path)
+            except OSError:
+                chunk_metadata.append(None)
+                continue
+
+            if stat.S_ISDIR(path_stat.st_mode):
+                chunk_metadata.append([None, None, path_stat.st_dev, path_stat.st_ino])
+            else:
+                chunk_metadata.append([path_stat.st_size, path_stat.st_mtime_ns, path_stat.st_dev, path_stat.st_ino])
+        return chunk_metadata
+
+    snapshot_metadata = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for chunk_metadata in executor.map(get_chunk_metadata, range(0, len(paths), STAT_CHUNK_SIZE)):
+            snapshot_metadata.extend(chunk_metadata)
+    return snapshot_metadata
+
+
+# Getting the modification time of every folder containing one of the files, of every folder in the files
+# and of the folders the search looked at (see SearchEngine.get_searched_folders()).
+# Used for finding new files in a snapshot without listing unchanged folders again
+def get_folder_mtimes(paths: list[str], snapshot_metadata: list, searched_folders=(),
+                      workers: int = STAT_THREADS) -> dict[str, int]:
+    folders = {os.path.dirname(path) for path in paths}
+    # Folders have no size in the metadata
+    folders.update(path for path, path_metadata in zip(paths, snapshot_metadata)
+                   if path_metadata is not None and path_metadata[0] is None)
+    # Folders without any found file, new files in them could match the filters too
+    folders.update(searched_folders)
+
+    def get_folder_mtime(folder):
+        try:
+            return folder, os.stat(folder).st_mtime_ns
+        except OSError:
+            return folder, None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return {folder: mtime for folder, mtime in executor.map(get_folder_mtime, folders) if mtime is not None}
+
+
+# Finding entries that were added to the folders of a snapshot since it was created.
+# Only folders with a different modification time are listed again, because adding, removing or renaming
+# an entry changes the modification time of its folder. Entries that were already there, but didn't match
+# the filters of the search, are skipped with their change time, which is set when a file is created or moved.
+# If no modification times were saved, all folders of the files are listed.
+# Returns the added paths with their type ("file" or "folder", like the type_dict of a search),
+# so they can be filtered like when searching, and the number of listed folders
+def find_added_files(paths: list[str], folder_mtimes: dict[str, int] | None, snapshot_time: float,
+                     workers: int = STAT_THREADS) -> tuple[dict[str, str], int]:
+    known_paths = set(paths)
+    if folder_mtimes is None:
+        folders = {os.path.dirname(path) for path in paths}
+    else:
+        folders = set(folder_mtimes)
+
+    def find_added_in_folder(folder):
+        try:
+            if folder_mtimes is not None and os.stat(folder).st_mtime_ns == folder_mtimes[folder]:
+                return {}, False
+
+            added_files = {}
+            with os.scandir(folder) as folder_entries:
+                for folder_entry in folder_entries:
+                    # Known folders are listed themselves if they changed, adding a file to a folder changes
+                    # its change time, so it would look like a new folder
+                    if folder_entry.path in known_paths or folder_entry.path in folders:
+                        continue
+                    try:
+                        if folder_entry.stat(follow_symlinks=False).st_ctime < snapshot_time:
+                            continue
+                    except OSError:
+                        continue
+
+                    # Links to folders are folders, like with os.walk() when searching
+                    if not folder_entry.is_dir():
+                        added_files[folder_entry.path] = "file"
+                        continue
+                    added_files[folder_entry.path] = "folder"
+
+                    # Everything in a new folder is new
+                    for roots, dirs, files in os.walk(folder_entry.path):
+                        for name in dirs:
+                            added_files[os.path.join(roots, name)] = "folder"
+                        for name in files:
+                            added_files[os.path.join(roots, name)] = "file"
+            return {added_file: file_type for added_file, file_type in added_files.items()
+                    if added_file not in known_paths}, True
+
+        except OSError:
+            # The folder was removed, so its files are removed too
+            return {}, False
+
+    added_paths = {}
+    listed_folders = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for added_files, was_listed in executor.map(find_added_in_folder, folders):
+            added_paths.update(added_files)
+            listed_folders += was_listed
+    return added_paths, listed_folders
+
+
+# Listing the sub folders of a folder for completing the directory, with the type information of scandir,
+# so only symlinks need a stat call. The result is cached until the modification time of the folder changes
+def get_subfolders(path: str) -> list[str]:
+    try:
+        folder_mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return []
+
+    with SUBFOLDER_CACHE_LOCK:
+        cached = SUBFOLDER_CACHE.get(path)
+    if cached is not None and cached[0] == folder_mtime:
+        return cached[1]
+
+    subfolders = []
+    try:
+        with os.scandir(path) as folder_entries:
+            for folder_entry in folder_entries:
+                try:
+                    if folder_entry.is_dir():
+                        # Normalising the Unicode form to deal with special characters (e.g. ä, ö, ü) on macOS
+                        subfolders.append(normalize("NFC", folder_entry.path))
+                except OSError:
+                    continue
+    except OSError:
+        return []
+
+    with SUBFOLDER_CACHE_LOCK:
+        # Removing the oldest folder, dicts keep the order in which keys were added
+        SUBFOLDER_CACHE.pop(path, None)
+        if len(SUBFOLDER_CACHE) >= SUBFOLDER_CACHE_SIZE:
+            del SUBFOLDER_CACHE[next(iter(SUBFOLDER_CACHE))]
+        SUBFOLDER_CACHE[path] = (folder_mtime, subfolders)
+
+    return subfolders
+
+
 # Convert File Size to a String
 def conv_file_size(byte_size: int, decimal_places=2) -> str:
     if byte_size == -1:
@@ -329,6 +543,9 @@ def setup():
 
     with open(os.path.join(FF_LIB_FOLDER, "Settings"), "w") as excluded_dump_file:
         dump(settings, excluded_dump_file)
+    # Loading the updated settings into the settings store
+    import FF_Settings_Store
+    FF_Settings_Store.SETTINGS.load()
 
     # Byte-Encoded Images
     # Calculate hash of file-find assets folder to test if assets must be replaced
@@ -0,0 +1,247 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the algorithms for grouping files with similar names or sizes, used for finding duplicated files
+
+# Imports
+from collections import Counter
+from math import ceil
+from difflib import SequenceMatcher
+
+
+# Sizes of the tokens names are indexed by, single characters and trigrams
+TOKEN_SIZES = (1, 3)
+
+
+# Splitting a name into its substrings of the given size, every repeated substring gets its own number,
+# so the number of tokens two names share is the size of the intersection of their substrings as multisets
+def numbered_tokens(name: str, size: int) -> list[tuple[str, int]]:
+    occurrences = Counter()
+    tokens = []
+    for position in range(len(name) - size + 1):
+        token = name[position:position + size]
+        tokens.append((token, occurrences[token]))
+        occurrences[token] += 1
+    return tokens
+
+
+# Smallest number of matching characters two names with the combined length need for a ratio of at least threshold.
+# Calculated like difflib calculates the ratio, so rounding never leads to a different result
+def required_matches(total_length: int, threshold: float) -> int:
+    if total_length == 0:
+        return 0
+    matches = max(0, ceil(threshold * total_length / 2))
+    while matches > 0 and 2.0 * (matches - 1) / total_length >= threshold:
+        matches -= 1
+    while 2.0 * matches / total_length < threshold:
+        matches += 1
+    return matches
+
+
+# Minimum number of tokens of the size two names with the combined length and at least matches matching characters
+# share. The matching characters are in k blocks, which are separated by at least one not matching character,
+# so k - 1 <= total_length - 2 * matches and k <= matches.
+# Every block of length L contains L - size + 1 tokens, so both names share at least matches - (size - 1) * k tokens
+def shared_tokens_bound(size: int, total_length: int, matches: int) -> int:
+    return max(0, matches - (size - 1) * min(total_length - 2 * matches + 1, matches))
+
+
+# For every character of the name, a bit for every position it is at, used by longest_common_subsequence()
+def character_positions(name: str) -> dict[str, int]:
+    positions = {}
+    for position, character in enumerate(name):
+        positions[character] = positions.get(character, 0) | 1 << position
+    return positions
+
+
+# Length of the longest common subsequence of two names, calculated with the bit-parallel algorithm by Hyyrö,
+# which takes one step for every character of the other name.
+# The matching characters found by difflib are a common subsequence, so there are at most this many
+def longest_common_subsequence(positions: dict[str, int], length: int, other: str) -> int:
+    all_positions = (1 << length) - 1
+    remaining = all_positions
+    for character in other:
+        matching = remaining & positions.get(character, 0)
+        remaining = ((remaining + matching) | (remaining - matching)) & all_positions
+    return length - remaining.bit_count()
+
+
+# Index of names for finding the closest match of a name,
+# gives the same result as difflib.get_close_matches(name, names, n=1, cutoff=cutoff) but without comparing every name.
+#
+# Names are indexed by their characters and trigrams together with their length. A name with a ratio of at least the
+# threshold shares at least a minimum number of tokens (see shared_tokens_bound()), so it has to contain one of the
+# len(tokens) - minimum + 1 rarest tokens of the name. For every length, only the names containing these tokens are
+# looked at, using the characters or the trigrams, whichever means looking at fewer names.
+# Lengths closest to the length of the name are searched first and after every better match, the threshold is raised
+# to its ratio, which makes the number of tokens to look up smaller. So the long lists of common tokens (like ".pdf")
+# are only needed if there is no close match.
+# Names with too few shared characters (like difflib's quick_ratio()) or too few characters in the same order
+# (see longest_common_subsequence()) are skipped, the rest is compared with difflib
+class NameIndex:
+    def __init__(self, cutoff: float):
+        self.cutoff = cutoff
+
+        # All names, grouped by their length
+        self.names_by_length: dict[int, list[str]] = {}
+        # For every token and length, all names with the length containing it
+        self.token_index: dict[tuple[str, int, int], list[str]] = {}
+        # For every name, a bit for every one of its characters (every repeated character has its own bit),
+        # so the number of shared characters is the number of bits set in both
+        self.character_masks: dict[str, int] = {}
+        self.character_bits: dict[tuple[str, int], int] = {}
+
+        # Number of names that were looked at, used by the benchmark and the tests
+        self.checked_names = 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.character_masks
+
+    def __len__(self) -> int:
+        return len(self.character_masks)
+
+    # Adding a name to the index
+    def add(self, name: str):
+        if name in self.character_masks:
+            return
+
+        character_mask = 0
+        for character_token in numbered_tokens(name, 1):
+            character_mask |= 1 << self.character_bits.setdefault(character_token, len(self.character_bits))
+        self.character_masks[name] = character_mask
+
+        self.names_by_length.setdefault(len(name), []).append(name)
+        for size in TOKEN_SIZES:
+            for token, occurrence in numbered_tokens(name, size):
+                self.token_index.setdefault((token, occurrence, len(name)), []).append(name)
+
+    # Finding the most similar name with a ratio of at least cutoff, returns None if there is no such name
+    def closest_match(self, name: str) -> str | None:
+        name_length = len(name)
+        # Characters, which no name in the index contains, can't be shared
+        name_mask = 0
+        for character_token in numbered_tokens(name, 1):
+            if character_token in self.character_bits:
+                name_mask |= 1 << self.character_bits[character_token]
+        query_tokens = {size: numbered_tokens(name, size) for size in TOKEN_SIZES}
+
+        best_match = None
+        threshold = self.cutoff
+        name_positions = character_positions(name)
+        sequence_matcher = SequenceMatcher()
+        sequence_matcher.set_seq2(name)
+
+        # The most similar lengths first, they can reach the highest ratio
+        for length in sorted(self.names_by_length, key=lambda other_length: abs(other_length - name_length)):
+            total_length = name_length + length
+            required = required_matches(total_length, threshold)
+            # Names with a too different length can't reach the threshold (like difflib's real_quick_ratio())
+            if min(length, name_length) < required:
+                continue
+
+            # For every token size, the lists of names with this length containing the tokens, rarest first.
+            # Created when the number of shared tokens gets useful, which gets more likely with a higher threshold
+            token_lists = {}
+            # Number of looked up lists for every size and names that were already looked at
+            looked_up = {}
+            checked = set()
+
+            while True:
+                required = required_matches(total_length, threshold)
+                # Names with a too different length can't reach the threshold (like difflib's real_quick_ratio())
+                if min(length, name_length) < required:
+                    break
+
+                # Every name that could reach the threshold contains one of the tokens before the end of the prefix,
+                # so if all of them were looked up, all these names were looked at
+                options = []
+                for size, tokens in query_tokens.items():
+                    minimum_shared = shared_tokens_bound(size, total_length, required)
+                    if minimum_shared >= 1:
+                        if size not in token_lists:
+                            token_lists[size] = sorted((self.token_index.get((token, occurrence, length), ())
+                                                        for token, occurrence in tokens), key=len)
+                            looked_up[size] = 0
+                        lists = token_lists[size]
+                        prefix_end = len(lists) - minimum_shared + 1
+                        options.append((sum(map(len, lists[looked_up[size]:prefix_end])), size))
+                # Looking at every name with the length, if this is cheaper
+                options.append((len(self.names_by_length[length]), 0))
+
+                cost, size = min(options)
+                if cost == 0:
+                    break
+                if size == 0:
+                    candidates = self.names_by_length[length]
+                else:
+                    candidates = token_lists[size][looked_up[size]]
+                    looked_up[size] += 1
+
+                # The number of shared characters (like difflib's quick_ratio()), the names with the most are compared
+                # first, so the threshold is raised early and the remaining names can be skipped
+                self.checked_names += len(candidates)
+                bounds = []
+                for candidate in candidates:
+                    bound = (name_mask & self.character_masks[candidate]).bit_count()
+                    if bound >= required and candidate not in checked:
+                        checked.add(candidate)
+                        bounds.append((bound, candidate))
+                bounds.sort(reverse=True)
+
+                for bound, candidate in bounds:
+                    if bound < required:
+                        break
+                    # The number of characters in the same order
+                    if longest_common_subsequence(name_positions, name_length, candidate) < required:
+                        continue
+
+                    # Comparing exactly like difflib.get_close_matches(), if the ratio is the same,
+                    # difflib prefers the greater name
+                    sequence_matcher.set_seq1(candidate)
+                    match = (sequence_matcher.ratio(), candidate)
+                    if match[0] >= threshold and (best_match is None or match > best_match):
+                        best_match = match
+                        # Only names at least as similar can be a better match
+                        threshold = match[0]
+                        required = required_matches(total_length, threshold)
+
+                # All names were looked at
+                if size == 0:
+                    break
+
+        if best_match is None:
+            return None
+        return best_match[1]
+
+
+# Grouping files with similar sizes in one sweep over the files sorted by size.
+# The smallest file of a group is its parent, every file that is at most (2 - match_factor) times
+# as big as the parent is added to the group, the next bigger file starts a new group.
+# Files with a negative size (couldn't be read) are skipped.
+# Returns a dict with the size of the parent as key and a list of the files (parent first)
+def group_by_similar_size(file_sizes: dict[str, int], match_factor: float) -> dict[int, list[str]]:
+    # factor of allowed divergence
+    # factor 1, upper = 1
+    # factor 0.8, upper = 1.2
+    upper_allowed_divergence_factor = 1 + (1 - match_factor)
+
+    size_groups = {}
+    parent_size = None
+    # Sorting by size and then by path, so the result doesn't depend on the order of the files
+    for file, size in sorted(file_sizes.items(), key=lambda file_size: (file_size[1], file_size[0])):
+        if size < 0:
+            continue
+
+        # Start a new group if the file is too big for the current group
+        if parent_size is None or size > parent_size * upper_allowed_divergence_factor:
+            parent_size = size
+            size_groups[parent_size] = []
+
+        size_groups[parent_size].append(file)
+
+    return size_groups
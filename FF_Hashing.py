@@ -0,0 +1,721 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the code for hashing files, used for finding duplicated files by their content
+
+# Imports
+import logging
+import os
+import stat
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from queue import Full, Queue
+from sys import platform
+from time import perf_counter, time
+
+# xxHash is optional and only used if it is installed
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Projects Libraries
+import FF_Files
+
+# How many bytes of the start and the end of a file are hashed in the partial hash stage
+PARTIAL_HASH_SIZE = 65536
+# Name of the partial hash in the hash cache, includes the size, so changing it doesn't use outdated hashes
+PARTIAL_HASH_KIND = f"partial-{PARTIAL_HASH_SIZE}"
+
+# How many files can be read at the same time from one device (SSD),
+# spinning disks (HDD) are limited to one file at a time so that the disk isn't thrashed
+DEFAULT_PER_DEVICE_LIMIT = 8
+# How many finished results can wait to be grouped
+DEFAULT_QUEUE_SIZE = 256
+# How often (in seconds) waiting threads of the hashing engine look if the results are still used
+CANCEL_CHECK_INTERVAL = 0.1
+
+# Maximum number of hashes stored in the hash cache, the least recently used hashes are removed first
+HASH_CACHE_MAX_ENTRIES = 1_000_000
+# Hashes that weren't used for 90 days are removed from the hash cache
+HASH_CACHE_MAX_AGE = 90 * 86400
+
+# Available hash algorithms, the key is saved in the hash cache, so it must change if the hash changes
+HASH_ALGORITHMS = {"sha1": lambda: hashlib.sha1(usedforsecurity=False),
+                   "md5": lambda: hashlib.md5(usedforsecurity=False),
+                   "sha256": lambda: hashlib.sha256(usedforsecurity=False),
+                   # Reduced to 160 bits, the same size as sha1
+                   "blake2b-160": lambda: hashlib.blake2b(digest_size=20),
+                   "blake2s-160": lambda: hashlib.blake2s(digest_size=20)}
+if xxhash is not None:
+    HASH_ALGORITHMS["xxh64"] = xxhash.xxh64
+    HASH_ALGORITHMS["xxh3-128"] = xxhash.xxh3_128
+
+# Every thread reuses its own buffer for reading files
+thread_buffers = threading.local()
+
+# Start of the key of a group of hard links to the same file
+HARDLINK_GROUP_PREFIX = "hardlinks:"
+
+# The stages of the duplicated content detection, used for the time stats
+HASH_STAGES = {"size": "Grouping by size",
+               "partial": "Partial hash (start and end)",
+               "full": "Full hash"}
+
+
+# Creating the dict which stores the statistics of one stage
+def new_stage_stats() -> dict:
+    return {"time": 0.0, "bytes_read": 0, "files_in": 0, "files_out": 0, "cache_hits": 0}
+
+
+# Removing all groups that only contain one file, because these files can't have a duplicate
+def remove_unique_groups(groups: dict) -> dict:
+    return {group_key: group for group_key, group in groups.items() if len(group) > 1}
+
+
+# Counting the files in all groups
+def count_grouped_files(groups: dict) -> int:
+    return sum(len(group) for group in groups.values())
+
+
+# Getting the read buffer of the current thread, it is only created again if the size changes
+def get_buffer(buffer_size: int) -> memoryview:
+    buffer = getattr(thread_buffers, "buffer", None)
+    if buffer is None or len(buffer) != buffer_size:
+        buffer = memoryview(bytearray(buffer_size))
+        thread_buffers.buffer = buffer
+    return buffer
+
+
+# Loading an opened file into the hash function, without creating a new bytes object for every chunk.
+# Reads until the end of the file or until limit bytes are read, returns the number of bytes read
+def update_hash(computing_hash, opened_file, buffer_size: int, limit: int | None = None) -> int:
+    buffer = get_buffer(buffer_size)
+    bytes_read = 0
+
+    while limit is None or bytes_read < limit:
+        # Reading directly into the buffer
+        if limit is None or limit - bytes_read >= buffer_size:
+            chunk_size = opened_file.readinto(buffer)
+        else:
+            chunk_size = opened_file.readinto(buffer[:limit - bytes_read])
+
+        # True if eof = 1
+        if not chunk_size:
+            break
+        # Updating hash
+        computing_hash.update(buffer[:chunk_size])
+        bytes_read += chunk_size
+
+    return bytes_read
+
+
+# Hashing a whole file, returns the hash and the number of bytes read
+def hash_file(path: str, algorithm: str = FF_Files.DEFAULT_HASHING_ALGORITHM,
+              buffer_size: int = FF_Files.DEFAULT_HASHING_BUFFER_SIZE) -> tuple[str, int]:
+    # Initializing the hash method e.g. sha1
+    computing_hash = HASH_ALGORITHMS[algorithm]()
+
+    # Unbuffered, because the file is read into our own buffer
+    with open(path, "rb", buffering=0) as open_hash_file:
+        bytes_read = update_hash(computing_hash, open_hash_file, buffer_size)
+
+    # Getting hash in hex form
+    return computing_hash.hexdigest(), bytes_read
+
+
+# Hashing the first and the last PARTIAL_HASH_SIZE bytes of a file together with its length.
+# Returns the hash, the number of bytes read and if the whole file was read.
+# If the whole file was read, the hash is the same as the one from hash_file()
+def partial_hash_file(path: str, size: int, algorithm: str = FF_Files.DEFAULT_HASHING_ALGORITHM,
+                      buffer_size: int = FF_Files.DEFAULT_HASHING_BUFFER_SIZE) -> tuple[str, int, bool]:
+    # Small files are read completely
+    if size <= PARTIAL_HASH_SIZE * 2:
+        file_hash, bytes_read = hash_file(path, algorithm, buffer_size)
+        return file_hash, bytes_read, True
+
+    # Initializing the hash method e.g. sha1
+    computing_hash = HASH_ALGORITHMS[algorithm]()
+    # Adding the file length
+    computing_hash.update(str(size).encode())
+
+    with open(path, "rb", buffering=0) as open_hash_file:
+        # Start of the file
+        bytes_read = update_hash(computing_hash, open_hash_file, buffer_size, PARTIAL_HASH_SIZE)
+        # Jumping to the end of the file
+        open_hash_file.seek(-PARTIAL_HASH_SIZE, os.SEEK_END)
+        bytes_read += update_hash(computing_hash, open_hash_file, buffer_size, PARTIAL_HASH_SIZE)
+
+    return computing_hash.hexdigest(), bytes_read, False
+
+
+# Persistent cache for hashes, stored in an SQLite database in the library folder.
+# A hash is identified by the device, inode, size and modification time of a file,
+# so if a file is changed, moved to another device or replaced, the old hash isn't used anymore.
+# The connection can only be used in the thread that created the cache
+class HashCache:
+    def __init__(self, cache_file: str = FF_Files.HASH_CACHE_FILE):
+        # Hashes which were used or computed and still need to be saved
+        self.pending_hashes = []
+        self.used_hashes = []
+
+        self.connection = sqlite3.connect(cache_file, timeout=30)
+        # Allows reading while another File Find window is writing
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS hashes ("
+                                "device INTEGER, inode INTEGER, size INTEGER, mtime_ns INTEGER, "
+                                "algorithm TEXT, kind TEXT, digest TEXT, last_used REAL, "
+                                "PRIMARY KEY (device, inode, size, mtime_ns, algorithm, kind))")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used)")
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exception):
+        self.close()
+
+    # The key of a file in the database
+    @staticmethod
+    def file_key(file_stat: os.stat_result) -> tuple[int, int, int, int]:
+        return file_stat.st_dev, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns
+
+    # Getting a hash from the cache, kind is "full" for the hash of the whole file or e.g. "partial-65536"
+    def get(self, file_stat: os.stat_result, algorithm: str, kind: str) -> str | None:
+        key = self.file_key(file_stat) + (algorithm, kind)
+        result = self.connection.execute(
+            "SELECT digest FROM hashes WHERE device=? AND inode=? AND size=? AND mtime_ns=? AND algorithm=? AND kind=?",
+            key).fetchone()
+
+        if result is None:
+            return None
+
+        # Remembering that the hash was used, so it isn't removed
+        self.used_hashes.append(key)
+        return result[0]
+
+    # Adding a hash, it is saved with save()
+    def add(self, file_stat: os.stat_result, algorithm: str, kind: str, digest: str):
+        self.pending_hashes.append(self.file_key(file_stat) + (algorithm, kind, digest))
+
+    # Saving all added hashes and when hashes were used
+    def save(self):
+        now = time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (hash_entry + (now,) for hash_entry in self.pending_hashes))
+            self.connection.executemany(
+                "UPDATE hashes SET last_used=? "
+                "WHERE device=? AND inode=? AND size=? AND mtime_ns=? AND algorithm=? AND kind=?",
+                ((now,) + key for key in self.used_hashes))
+
+        # Debug
+        logging.debug(f"Saved {len(self.pending_hashes)} new hashes to the hash cache")
+
+        self.pending_hashes = []
+        self.used_hashes = []
+
+    # Removing old hashes and the least recently used hashes if there are too many
+    def evict(self):
+        with self.connection:
+            self.connection.execute("DELETE FROM hashes WHERE last_used < ?", (time() - HASH_CACHE_MAX_AGE,))
+            self.connection.execute(
+                "DELETE FROM hashes WHERE rowid IN "
+                "(SELECT rowid FROM hashes ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (HASH_CACHE_MAX_ENTRIES,))
+
+    # Saving, cleaning up and closing the database
+    def close(self):
+        try:
+            self.save()
+            self.evict()
+        finally:
+            self.connection.close()
+
+
+# Engine for hashing many files in parallel,
+# hashlib releases the GIL while hashing, so multiple threads can read and hash at the same time.
+# Hashing many small files is mostly spent in Python holding the GIL, so the jobs can also be run in a pool of
+# processes, the threads then only wait for the processes. The functions have to be picklable (module level)
+class HashingEngine:
+    def __init__(self, workers: int = FF_Files.DEFAULT_HASHING_THREADS, per_device_limit: int = DEFAULT_PER_DEVICE_LIMIT,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, processes: int = 0):
+        # At least one of everything
+        self.workers = max(1, workers)
+        self.per_device_limit = max(1, per_device_limit)
+        self.queue_size = max(1, queue_size)
+        # No process pool if 0
+        self.processes = max(0, processes)
+
+        # A semaphore for every device, so that every device is only read from by a limited number of threads
+        self.device_semaphores: dict[int, threading.Semaphore] = {}
+        self.device_semaphores_lock = threading.Lock()
+
+        logging.debug(f"Set up hashing engine with {self.workers} threads, {self.processes} processes, "
+                      f"{self.per_device_limit} threads per device and a queue size of {self.queue_size}")
+
+    # Getting the semaphore of a device and creating it if it doesn't exist
+    def device_semaphore(self, device: int) -> threading.Semaphore:
+        with self.device_semaphores_lock:
+            if device not in self.device_semaphores:
+                if is_rotational(device):
+                    logging.debug(f"Device {device} is a spinning disk, reading only one file at a time")
+                    self.device_semaphores[device] = threading.Semaphore(1)
+                else:
+                    self.device_semaphores[device] = threading.Semaphore(self.per_device_limit)
+            return self.device_semaphores[device]
+
+    # Running function(*arguments) for every job of (device, job_key, function, arguments) in parallel.
+    # Yields (job_key, result) in the order the jobs finish, if the function raised an error, the result is the error.
+    # If iterating over the jobs raises an error, it is raised after the results of the submitted jobs.
+    # Finished results are stored in a bounded queue, so hashing pauses if the results aren't used fast enough,
+    # if the results aren't used anymore (the generator is closed), no more jobs are started
+    def run(self, jobs):
+        results = Queue(maxsize=self.queue_size)
+        # Marks the end of the results, together with the error of the jobs or None
+        finished = object()
+        # Limiting the number of jobs submitted to the thread pool, so not all jobs are loaded into memory at once
+        submitted_jobs = threading.BoundedSemaphore(self.queue_size + self.workers)
+        # Set when the results aren't used anymore
+        cancelled = threading.Event()
+
+        # Waiting for space in the queue, but not if the results aren't used anymore
+        def put_result(result):
+            while not cancelled.is_set():
+                try:
+                    results.put(result, timeout=CANCEL_CHECK_INTERVAL)
+                    return
+                except Full:
+                    continue
+
+        def run_job(process_pool, device, job_key, function, arguments):
+            try:
+                if cancelled.is_set():
+                    return
+                try:
+                    with self.device_semaphore(device):
+                        if process_pool is None:
+                            result = function(*arguments)
+                        else:
+                            result = process_pool.submit(function, *arguments).result()
+                except Exception as error:
+                    result = error
+                put_result((job_key, result))
+            finally:
+                submitted_jobs.release()
+
+        # Submitting jobs in a separate thread, so results can already be used
+        def submit_jobs():
+            jobs_error = None
+            process_pool = ProcessPoolExecutor(max_workers=self.processes) if self.processes else None
+            try:
+                with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="FF_Hashing") as executor:
+                    for job in jobs:
+                        # Waiting for a free slot, but not if the results aren't used anymore
+                        while not submitted_jobs.acquire(timeout=CANCEL_CHECK_INTERVAL):
+                            if cancelled.is_set():
+                                break
+                        if cancelled.is_set():
+                            break
+                        executor.submit(run_job, process_pool, *job)
+                # Waited for all jobs to finish
+            except Exception as error:
+                logging.error(f"Could not submit all hashing jobs: {error}")
+                jobs_error = error
+            finally:
+                if process_pool is not None:
+                    process_pool.shutdown(cancel_futures=True)
+                put_result((finished, jobs_error))
+
+        threading.Thread(target=submit_jobs, name="FF_Hashing_Submitter", daemon=True).start()
+
+        try:
+            while (result := results.get())[0] is not finished:
+                yield result
+        finally:
+            cancelled.set()
+
+        if result[1] is not None:
+            raise result[1]
+
+
+# Testing if a device is a spinning disk, only possible on Linux
+def is_rotational(device: int) -> bool:
+    if platform != "linux":
+        return False
+
+    # Partitions don't have a queue folder, so also looking at the parent (the whole disk)
+    block_device = os.path.join("/sys", "dev", "block", f"{os.major(device)}:{os.minor(device)}")
+    for rotational_file in (os.path.join(block_device, "queue", "rotational"),
+                            os.path.join(block_device, "..", "queue", "rotational")):
+        try:
+            with open(rotational_file) as opened_rotational_file:
+                return opened_rotational_file.read().strip() == "1"
+        except OSError:
+            continue
+
+    return False
+
+
+# Hashing folders bottom-up like a Merkle tree: The hash of a folder is computed from the sorted names,
+# types and hashes of its content, so it doesn't depend on the order in which the content is listed.
+# Every folder and every file is only hashed once, even if folders are nested or files have multiple hard links.
+# Hashes of files are taken from file_digests or the hash cache if possible, the other files are hashed by the engine.
+# inode_paths contains the first path to every known file (device and inode) with multiple hard links.
+# Returns a dict with the hash of every folder and updates bytes_read and cache_hits of stage_stats
+def hash_folders(folders, engine: HashingEngine, hash_cache: HashCache | None, algorithm: str, buffer_size: int,
+                 file_digests: dict[str, str], stage_stats: dict,
+                 inode_paths: dict[tuple[int, int], str] | None = None) -> dict[str, str]:
+    # The content of every folder as a list of (name, type, path)
+    folder_content = {}
+    # Folders in the order they were listed, a folder is always listed before its sub folders
+    listed_folders = []
+    # Files that need to be hashed
+    hash_jobs = []
+    if inode_paths is None:
+        inode_paths = {}
+    # Hard links and the first path to their file, they get the same hash as the first path
+    hardlinks = {}
+    # Files that will be hashed
+    queued_paths = set()
+
+    # Listing parent folders first, so nested folders are only listed once
+    for folder in sorted(folders, key=len):
+        if folder in folder_content:
+            continue
+
+        folders_to_list = [folder]
+        while folders_to_list:
+            current_folder = folders_to_list.pop()
+            content = []
+            try:
+                with os.scandir(current_folder) as folder_entries:
+                    for entry in folder_entries:
+                        try:
+                            entry_stat = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+
+                        if stat.S_ISLNK(entry_stat.st_mode):
+                            content.append((entry.name, "link", entry.path))
+
+                        elif stat.S_ISDIR(entry_stat.st_mode):
+                            content.append((entry.name, "folder", entry.path))
+                            folders_to_list.append(entry.path)
+
+                        elif stat.S_ISREG(entry_stat.st_mode):
+                            content.append((entry.name, "file", entry.path))
+                            if entry.path in file_digests:
+                                continue
+
+                            # Files with multiple hard links are only hashed once
+                            if entry_stat.st_nlink > 1:
+                                inode = (entry_stat.st_dev, entry_stat.st_ino)
+                                first_path = inode_paths.get(inode)
+                                if first_path is not None and (first_path in file_digests or first_path in queued_paths):
+                                    hardlinks[entry.path] = first_path
+                                    continue
+                                inode_paths[inode] = entry.path
+
+                            # Looking if the hash is cached
+                            if hash_cache is not None:
+                                file_hash = hash_cache.get(entry_stat, algorithm, "full")
+                                if file_hash is not None:
+                                    stage_stats["cache_hits"] += 1
+                                    file_digests[entry.path] = file_hash
+                                    continue
+
+                            hash_jobs.append(
+                                (entry_stat.st_dev, (entry.path, entry_stat), hash_file, (entry.path, algorithm, buffer_size)))
+                            queued_paths.add(entry.path)
+            except OSError as error:
+                logging.error(f"Could not list {current_folder}: {error}")
+
+            folder_content[current_folder] = content
+            listed_folders.append(current_folder)
+
+    # Hashing all files at once
+    for (path, path_stat), result in engine.run(hash_jobs):
+        # File couldn't be read
+        if isinstance(result, Exception):
+            logging.error(f"Could not hash {path}: {result}")
+            continue
+
+        file_digests[path], bytes_read = result
+        stage_stats["bytes_read"] += bytes_read
+        if hash_cache is not None:
+            hash_cache.add(path_stat, algorithm, "full", file_digests[path])
+
+    if hash_cache is not None:
+        hash_cache.save()
+
+    # Hard links get the hash of the first path to the file
+    for hardlink, first_path in hardlinks.items():
+        if first_path in file_digests:
+            file_digests[hardlink] = file_digests[first_path]
+
+    # Hashing the folders, sub folders first
+    folder_digests = {}
+    for folder in reversed(listed_folders):
+        # Marking the hash as a folder hash, so a folder doesn't get the same hash as a file
+        computing_hash = HASH_ALGORITHMS[algorithm]()
+        computing_hash.update(b"folder")
+
+        for name, content_type, path in sorted(folder_content[folder]):
+            if content_type == "file":
+                content_hash = file_digests.get(path)
+            elif content_type == "folder":
+                content_hash = folder_digests.get(path)
+            else:
+                # Links are hashed by their target
+                try:
+                    content_hash = os.readlink(path)
+                except OSError:
+                    content_hash = None
+
+            # Content that couldn't be read is skipped
+            if content_hash is None:
+                continue
+
+            computing_hash.update(os.fsencode(name) + b"\0" + content_type.encode() + b"\0"
+                                  + os.fsencode(content_hash) + b"\0")
+
+        folder_digests[folder] = computing_hash.hexdigest()
+
+    return folder_digests
+
+
+# Finding files with the same content in three stages:
+# 1. Grouping by the exact size
+# 2. Hashing the start and the end of the file (together with the length)
+# 3. Hashing the whole file, only for files that still collide
+# After every stage, files that are alone in their group are dropped.
+# Hard links to the same file (inode) are only hashed once and are added to the group of the first hard link.
+# If the file has no copies, its hard links are returned in their own group with a key starting with
+# HARDLINK_GROUP_PREFIX, because they don't take up more space.
+# Stage 2 and 3 are run in parallel by the hashing engine, hashes of files are taken from the hash cache if possible.
+# Returns a dict with the hash as key and a list of all files with this hash, and the stats of every stage
+def group_by_content(paths, engine: HashingEngine = None, hash_cache: HashCache = None,
+                     algorithm: str = FF_Files.DEFAULT_HASHING_ALGORITHM,
+                     buffer_size: int = FF_Files.DEFAULT_HASHING_BUFFER_SIZE
+                     ) -> tuple[dict[str, list[str]], dict[str, dict]]:
+    stats = {stage: new_stage_stats() for stage in HASH_STAGES}
+
+    if engine is None:
+        engine = HashingEngine()
+
+    # Stage 1: Grouping by size
+    logging.debug("Grouping by size...")
+    stage_start = perf_counter()
+
+    size_groups = {}
+    # The stat of every path, used for the hash cache and to limit the number of threads reading from one device
+    path_stats = {}
+    # All paths of every file (device and inode), that has multiple hard links
+    inode_paths = {}
+    for path in paths:
+        stats["size"]["files_in"] += 1
+
+        try:
+            path_stat = os.lstat(path)
+        except OSError:
+            continue
+
+        # Links don't take up space, so they are skipped
+        if stat.S_ISLNK(path_stat.st_mode):
+            continue
+
+        elif stat.S_ISDIR(path_stat.st_mode):
+            # Skip empty folders
+            try:
+                if not os.listdir(path):
+                    continue
+            except OSError:
+                continue
+            group_key = ("folder", FF_Files.get_file_size(path))
+
+        elif stat.S_ISREG(path_stat.st_mode):
+            # Only the first hard link to a file is hashed
+            if path_stat.st_nlink > 1:
+                inode = (path_stat.st_dev, path_stat.st_ino)
+                if inode in inode_paths:
+                    inode_paths[inode].append(path)
+                    continue
+                inode_paths[inode] = [path]
+
+            group_key = ("file", path_stat.st_size)
+
+        # Sockets, devices, etc...
+        else:
+            continue
+
+        size_groups.setdefault(group_key, []).append(path)
+        path_stats[path] = path_stat
+
+    size_groups = remove_unique_groups(size_groups)
+    # Files with multiple hard links in the paths
+    hardlink_groups = remove_unique_groups(inode_paths)
+
+    stats["size"]["files_out"] = count_grouped_files(size_groups)
+    stats["size"]["time"] = perf_counter() - stage_start
+
+    # Stage 2: Hashing the start and the end of every file
+    logging.debug(f"Partial hashing {stats['size']['files_out']} files...")
+    stage_start = perf_counter()
+
+    partial_groups = {}
+    # Files, which were completely read in the partial stage, don't need to be hashed again
+    completely_hashed = set()
+    # Folders are directly passed to the full hash stage
+    folder_groups = {}
+
+    partial_jobs = []
+    for (path_type, size), group in size_groups.items():
+        if path_type == "folder":
+            folder_groups[size] = group
+            continue
+
+        # Small files are hashed completely
+        complete = size <= PARTIAL_HASH_SIZE * 2
+        for path in group:
+            stats["partial"]["files_in"] += 1
+
+            # Looking if the hash is cached
+            if hash_cache is not None:
+                partial_hash = hash_cache.get(path_stats[path], algorithm, "full" if complete else PARTIAL_HASH_KIND)
+                if partial_hash is not None:
+                    stats["partial"]["cache_hits"] += 1
+                    group_key = (size, partial_hash)
+                    partial_groups.setdefault(group_key, []).append(path)
+                    if complete:
+                        completely_hashed.add(group_key)
+                    continue
+
+            partial_jobs.append(
+                (path_stats[path].st_dev, (path, size), partial_hash_file, (path, size, algorithm, buffer_size)))
+
+    for (path, size), result in engine.run(partial_jobs):
+        # File couldn't be read
+        if isinstance(result, Exception):
+            logging.error(f"Could not hash {path}: {result}")
+            continue
+
+        partial_hash, bytes_read, complete = result
+        stats["partial"]["bytes_read"] += bytes_read
+
+        # Saving the hash
+        if hash_cache is not None:
+            hash_cache.add(path_stats[path], algorithm, "full" if complete else PARTIAL_HASH_KIND, partial_hash)
+
+        group_key = (size, partial_hash)
+        partial_groups.setdefault(group_key, []).append(path)
+        if complete:
+            completely_hashed.add(group_key)
+
+    partial_groups = remove_unique_groups(partial_groups)
+
+    if hash_cache is not None:
+        hash_cache.save()
+
+    stats["partial"]["files_out"] = count_grouped_files(partial_groups)
+    stats["partial"]["time"] = perf_counter() - stage_start
+
+    # Stage 3: Hashing the whole file
+    logging.debug("Hashing remaining files completely...")
+    stage_start = perf_counter()
+
+    content_groups = {}
+    # The hash of every file, reused for hashing folders
+    file_digests = {}
+    full_jobs = []
+    for group_key, group in partial_groups.items():
+        # The partial hash already covered the complete file
+        if group_key in completely_hashed:
+            stats["full"]["files_in"] += len(group)
+            content_groups[group_key[1]] = group
+            file_digests.update(dict.fromkeys(group, group_key[1]))
+            continue
+
+        for path in group:
+            stats["full"]["files_in"] += 1
+
+            # Looking if the hash is cached
+            if hash_cache is not None:
+                file_hash = hash_cache.get(path_stats[path], algorithm, "full")
+                if file_hash is not None:
+                    stats["full"]["cache_hits"] += 1
+                    content_groups.setdefault(file_hash, []).append(path)
+                    file_digests[path] = file_hash
+                    continue
+
+            full_jobs.append((path_stats[path].st_dev, path, hash_file, (path, algorithm, buffer_size)))
+
+    for path, result in engine.run(full_jobs):
+        # File couldn't be read
+        if isinstance(result, Exception):
+            logging.error(f"Could not hash {path}: {result}")
+            continue
+
+        content_hash, bytes_read = result
+        stats["full"]["bytes_read"] += bytes_read
+
+        # Saving the hash
+        if hash_cache is not None:
+            hash_cache.add(path_stats[path], algorithm, "full", content_hash)
+        content_groups.setdefault(content_hash, []).append(path)
+        file_digests[path] = content_hash
+
+    # Folders are hashed from the hashes of their content
+    folders = [path for group in folder_groups.values() for path in group]
+    stats["full"]["files_in"] += len(folders)
+    folder_digests = hash_folders(folders, engine, hash_cache, algorithm, buffer_size, file_digests, stats["full"],
+                                  {inode: inode_group[0] for inode, inode_group in inode_paths.items()})
+    for path in folders:
+        if path in folder_digests:
+            content_groups.setdefault(folder_digests[path], []).append(path)
+
+    content_groups = remove_unique_groups(content_groups)
+
+    if hash_cache is not None:
+        hash_cache.save()
+
+    stats["full"]["files_out"] = count_grouped_files(content_groups)
+    stats["full"]["time"] = perf_counter() - stage_start
+
+    # Adding the hard links to the group of the first hard link or to their own group
+    path_groups = {path: group for group in content_groups.values() for path in group}
+    for (device, inode), hardlink_group in hardlink_groups.items():
+        if hardlink_group[0] in path_groups:
+            path_groups[hardlink_group[0]].extend(hardlink_group[1:])
+        else:
+            content_groups[f"{HARDLINK_GROUP_PREFIX}{device}:{inode}"] = hardlink_group
+    logging.debug(f"Found {len(hardlink_groups)} files with multiple hard links")
+
+    # Sorting the members of every group and the groups by their first member,
+    # so the result doesn't depend on the order in which the files were hashed
+    content_groups = dict(sorted(((group_key, sorted(group)) for group_key, group in content_groups.items()),
+                                 key=lambda content_group: content_group[1]))
+
+    # Debug
+    for stage, stage_stats in stats.items():
+        logging.debug(f"{HASH_STAGES[stage]}: {stage_stats}")
+
+    return content_groups, stats
+
+
+# Generating a readable summary of the stats for the time stats
+def format_stage_stats(stats: dict[str, dict]) -> str:
+    stats_text = ""
+    for stage, stage_stats in stats.items():
+        stats_text += (f"{HASH_STAGES[stage]}: {round(stage_stats['time'], 3)}s, "
+                       f"{stage_stats['files_in']} -> {stage_stats['files_out']} files, "
+                       f"read {FF_Files.conv_file_size(stage_stats['bytes_read'])}, "
+                       f"{stage_stats['cache_hits']} hashes from cache\n")
+    return stats_text
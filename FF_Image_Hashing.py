@@ -0,0 +1,241 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the code for perceptual hashing of images, used for finding similar images
+
+# Imports
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import cos, pi, sqrt
+from multiprocessing import get_context
+from time import perf_counter
+
+# Projects Libraries
+import FF_Files
+
+# Size of a perceptual hash in bits
+HASH_BITS = 64
+# pHash is computed from a 32x32 image, of which only the 8x8 lowest frequencies are used
+PHASH_IMAGE_SIZE = 32
+PHASH_FREQUENCIES = 8
+# Name of the perceptual hashes in the hash cache
+HASH_CACHE_KIND = "perceptual"
+
+# Cosine table for the discrete cosine transform of pHash, only the lowest frequencies are needed
+DCT_TABLE = [[sqrt((1 if frequency == 0 else 2) / PHASH_IMAGE_SIZE)
+              * cos(pi * (2 * position + 1) * frequency / (2 * PHASH_IMAGE_SIZE))
+              for position in range(PHASH_IMAGE_SIZE)]
+             for frequency in range(PHASH_FREQUENCIES)]
+
+
+# Testing if a file is an image, using the "Image" file group
+def is_image(path: str) -> bool:
+    return os.path.splitext(path)[1][1:].lower() in FF_Files.FILE_FORMATS["Image"]
+
+
+# Decoding an image directly in a small size and returning the rows of gray values,
+# returns None if the image couldn't be read
+def load_gray_pixels(path: str, width: int, height: int) -> list[bytes] | None:
+    # Importing here, because this runs in a separate process
+    from PySide6.QtCore import QSize
+    from PySide6.QtGui import QImage, QImageReader
+
+    # Decoding with the scaled size, so e.g. JPEGs are not decoded in full resolution
+    image_reader = QImageReader(path)
+    image_reader.setScaledSize(QSize(width, height))
+    image = image_reader.read()
+
+    if image.isNull():
+        return None
+
+    # Converting to 8-bit gray values
+    image = image.convertToFormat(QImage.Format.Format_Grayscale8)
+    pixels = bytes(image.constBits())
+    bytes_per_line = image.bytesPerLine()
+
+    # Rows can be padded, so every row is sliced separately
+    return [pixels[row * bytes_per_line:row * bytes_per_line + width] for row in range(height)]
+
+
+# Average hash: Every bit is set, if the pixel of an 8x8 image is brighter than the average
+def average_hash(rows: list[bytes]) -> int:
+    pixels = b"".join(rows)
+    average = sum(pixels) / len(pixels)
+    return bits_to_int(pixel > average for pixel in pixels)
+
+
+# Difference hash: Every bit is set, if a pixel of a 9x8 image is brighter than its right neighbour
+def difference_hash(rows: list[bytes]) -> int:
+    return bits_to_int(row[column] > row[column + 1] for row in rows for column in range(len(row) - 1))
+
+
+# Perceptual hash: Every bit is set, if a low frequency of the 32x32 image is greater than the median of them
+def perceptual_hash(rows: list[bytes]) -> int:
+    # The discrete cosine transform is separable, so first all rows are transformed and then the columns,
+    # and only the needed frequencies are computed
+    row_frequencies = [[sum(cosine * pixel for cosine, pixel in zip(cosines, row)) for cosines in DCT_TABLE]
+                       for row in rows]
+    frequencies = [sum(cosine * row_frequency[column] for cosine, row_frequency in zip(cosines, row_frequencies))
+                   for cosines in DCT_TABLE
+                   for column in range(PHASH_FREQUENCIES)]
+
+    # The first frequency is the average brightness, so it isn't used for the median
+    median = sorted(frequencies[1:])[len(frequencies[1:]) // 2]
+    return bits_to_int(frequency > median for frequency in frequencies)
+
+
+# Converting a sequence of booleans to an int
+def bits_to_int(bits) -> int:
+    result = 0
+    for bit in bits:
+        result = (result << 1) | bit
+    return result
+
+
+# The available perceptual hashes and the size of the image they need
+PERCEPTUAL_HASHES = {"ahash": (average_hash, 8, 8),
+                     "dhash": (difference_hash, 9, 8),
+                     "phash": (perceptual_hash, PHASH_IMAGE_SIZE, PHASH_IMAGE_SIZE)}
+DEFAULT_PERCEPTUAL_HASH = "phash"
+
+
+# Computing the perceptual hash of an image, runs in a separate process.
+# Returns the path and the hash as hex or None if the image couldn't be read
+def hash_image(path_and_algorithm: tuple[str, str]) -> tuple[str, str | None]:
+    path, algorithm = path_and_algorithm
+    hash_function, width, height = PERCEPTUAL_HASHES[algorithm]
+
+    try:
+        rows = load_gray_pixels(path, width, height)
+    except OSError:
+        return path, None
+    if rows is None:
+        return path, None
+
+    return path, f"{hash_function(rows):016x}"
+
+
+# Number of bits two hashes can be different, for files to match with match_percentage
+def match_percentage_to_distance(match_percentage: int) -> int:
+    return round(HASH_BITS * (100 - match_percentage) / 100)
+
+
+# Tree for finding hashes with a small hamming distance (number of different bits),
+# every node stores its children by their distance to the node.
+# Because the hamming distance is a metric, only children with a distance in
+# [distance - max_distance, distance + max_distance] can contain a match
+class BKTree:
+    def __init__(self):
+        # A node is [hash, key, {distance: child node}]
+        self.root = None
+
+    # Adding a hash with a key (e.g. the path)
+    def add(self, image_hash: int, key):
+        node = [image_hash, key, {}]
+        if self.root is None:
+            self.root = node
+            return
+
+        current_node = self.root
+        while True:
+            distance = (image_hash ^ current_node[0]).bit_count()
+            child = current_node[2].get(distance)
+            if child is None:
+                current_node[2][distance] = node
+                return
+            current_node = child
+
+    # Finding the key of the hash closest to image_hash, with a distance of at most max_distance.
+    # Returns None if there is no such hash
+    def closest(self, image_hash: int, max_distance: int):
+        if self.root is None:
+            return None
+
+        best_match = None
+        nodes = [self.root]
+        while nodes:
+            node = nodes.pop()
+            distance = (image_hash ^ node[0]).bit_count()
+            # If the distance is the same, the smaller key is used, so the result doesn't depend on the tree
+            if distance <= max_distance and (best_match is None or (distance, node[1]) < best_match):
+                best_match = (distance, node[1])
+
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    nodes.append(child)
+
+        if best_match is None:
+            return None
+        return best_match[1]
+
+
+# Grouping similar images, images are decoded and hashed in a process pool,
+# hashes are loaded from the hash cache if possible.
+# Every image is added to the group of the most similar image that started a group,
+# if no image is similar enough, the image starts a new group.
+# Returns a dict with the path of the first image as key and a list of all images in the group
+def group_similar_images(paths, max_distance: int, hash_cache=None, algorithm: str = DEFAULT_PERCEPTUAL_HASH,
+                         workers: int | None = None) -> dict[str, list[str]]:
+    start_time = perf_counter()
+
+    image_hashes = {}
+    images_to_hash = []
+    for path in paths:
+        if not is_image(path) or not os.path.isfile(path):
+            continue
+
+        # Looking if the hash is cached
+        if hash_cache is not None:
+            try:
+                image_stat = os.stat(path)
+            except OSError:
+                continue
+            cached_hash = hash_cache.get(image_stat, algorithm, HASH_CACHE_KIND)
+            if cached_hash is not None:
+                image_hashes[path] = int(cached_hash, 16)
+                continue
+
+        images_to_hash.append(path)
+
+    # Debug
+    logging.debug(f"Hashing {len(images_to_hash)} images, {len(image_hashes)} hashes are cached")
+
+    # Decoding images in separate processes, so multiple CPU cores can be used,
+    # spawn is used, because forking a process with running Qt threads is not safe
+    if images_to_hash:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+            for path, image_hash in executor.map(hash_image, ((path, algorithm) for path in images_to_hash),
+                                                 chunksize=16):
+                if image_hash is None:
+                    logging.error(f"Could not read image {path}")
+                    continue
+
+                image_hashes[path] = int(image_hash, 16)
+                if hash_cache is not None:
+                    try:
+                        hash_cache.add(os.stat(path), algorithm, HASH_CACHE_KIND, image_hash)
+                    except OSError:
+                        pass
+
+    # Grouping by the hamming distance, sorted so the result doesn't depend on the order of the paths
+    bk_tree = BKTree()
+    image_groups = {}
+    for path in sorted(image_hashes):
+        closest_image = bk_tree.closest(image_hashes[path], max_distance)
+
+        if closest_image is None:
+            bk_tree.add(image_hashes[path], path)
+            image_groups[path] = [path]
+        else:
+            image_groups[closest_image].append(path)
+
+    # Debug
+    logging.debug(f"Grouped {len(image_hashes)} images in {perf_counter() - start_time}s")
+
+    return image_groups
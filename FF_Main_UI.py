@@ -25,9 +25,10 @@ from PySide6.QtWidgets import QWidget, QLabel, QPushButton, QRadioButton, QFileD
 # Projects Libraries
 import FF_Additional_UI
 import FF_Files
-import FF_About_UI
-import FF_Search
-import FF_Settings
+import FF_Settings_Store
+
+# The windows, which aren't needed at launch (FF_Search, FF_Compare, FF_Duplicated, FF_About_UI and FF_Settings),
+# are imported in the functions using them, so File Find starts faster
 
 
 # The class for the main window where filters can be selected
@@ -607,6 +608,7 @@ class MainWindow:
             # Print Input
             print_data()
             # Start Searching
+            import FF_Search
             FF_Search.Search(
                 data_name=self.edit_name.text(),
                 data_in_name=self.edit_name_contains.text(),
@@ -652,6 +654,7 @@ class MainWindow:
                                                              self.Root_Window)
 
             # Calling the function, which generate a shell command
+            import FF_Search
             shell_command = str(
                 FF_Search.GenerateTerminalCommand(self.edit_name.text(), self.edit_name_contains.text(),
                                                   self.edit_file_extension.text(), self.edit_size_max.text()))
@@ -879,8 +882,9 @@ class MainWindow:
             logging.info("Asking for location for import")
             import_path = QFileDialog.getOpenFileName(parent=self.Root_Window,
                                                       dir=FF_Files.USER_FOLDER,
-                                                      caption="Import Filer or Search",
-                                                      filter="File Find Filter or Search (*.FFFilter *.FFSearch)")[0]
+                                                      caption="Import Filer, Search or Report",
+                                                      filter="File Find Filter, Search or Duplicated Files Report "
+                                                             "(*.FFFilter *.FFSearch *.jsonl *.csv)")[0]
             # If User pressed cancel
             if import_path == "":
                 return
@@ -888,9 +892,16 @@ class MainWindow:
             import_path = os.path.normpath(import_path)
             # If opened file is a search
             if import_path.endswith(".FFSearch"):
+                import FF_Search
                 FF_Search.LoadSearch.open_file(import_path, self.Root_Window)
                 # Quit function
                 return
+            # If opened file is a report of duplicated files
+            elif import_path.endswith(".jsonl") or import_path.endswith(".csv"):
+                import FF_Duplicated
+                FF_Duplicated.LoadReport.open_file(import_path, self.Root_Window)
+                # Quit function
+                return
 
         # Opening file, throws error if no files was selected
         try:
@@ -1040,6 +1051,16 @@ class MainWindow:
         export_filter_action.setShortcut("Ctrl+S")
         file_menu.addAction(export_filter_action)
 
+        # Compare a saved search to the files as they are now
+        compare_to_now_action = QAction("&Compare Saved Search to Now...", self.Root_Window)
+
+        def open_compare_to_now():
+            import FF_Compare
+            FF_Compare.CompareToNow(self.Root_Window)
+
+        compare_to_now_action.triggered.connect(open_compare_to_now)
+        file_menu.addAction(compare_to_now_action)
+
         # Separator
         file_menu.addSeparator()
 
@@ -1053,6 +1074,18 @@ class MainWindow:
         cache_action.setShortcut("Ctrl+T")
         tools_menu.addAction(cache_action)
 
+        # Clear Hash Cache
+        hash_cache_action = QAction("&Clear Hash Cache", self.Root_Window)
+        hash_cache_action.triggered.connect(FF_Files.remove_hash_cache)
+        hash_cache_action.triggered.connect(
+            lambda: FF_Additional_UI.PopUps.show_info_messagebox("Cleared Hash Cache",
+                                                                 "Cleared the cache of file hashes successfully!",
+                                                                 self.Root_Window))
+        tools_menu.addAction(hash_cache_action)
+
+        # Profile next Search
+        FF_Additional_UI.add_profile_action(self.Root_Window, tools_menu)
+
         # Generate Terminal Command
         cmd_action = QAction("&Generate Terminal command", self.Root_Window)
         cmd_action.triggered.connect(shell_cmd)
@@ -1067,12 +1100,22 @@ class MainWindow:
 
         # About File Find
         about_action = QAction("&About File Find", self.Root_Window)
-        about_action.triggered.connect(lambda: FF_About_UI.AboutWindow(self.Root_Window))
+
+        def open_about():
+            import FF_About_UI
+            FF_About_UI.AboutWindow(self.Root_Window)
+
+        about_action.triggered.connect(open_about)
         help_menu.addAction(about_action)
 
         # Settings
         settings_action = QAction("&Settings", self.Root_Window)
-        settings_action.triggered.connect(lambda: FF_Settings.SettingsWindow(self.Root_Window))
+
+        def open_settings():
+            import FF_Settings
+            FF_Settings.SettingsWindow(self.Root_Window)
+
+        settings_action.triggered.connect(open_settings)
         settings_action.setShortcut("Ctrl+,")
         help_menu.addAction(settings_action)
 
@@ -1187,9 +1230,16 @@ class MainWindow:
 
         # Display the Icon if allowed
         menu_bar_icon.setContextMenu(menu_bar_icon_menu)
-        if FF_Settings.SettingsWindow.load_setting("display_menu_bar_icon"):
+        if FF_Settings_Store.SETTINGS.get_bool("display_menu_bar_icon"):
             menu_bar_icon.show()
 
+        # Showing or hiding the icon when the setting is changed
+        def display_menu_bar_icon_changed(setting_key, new_value):
+            if setting_key == "display_menu_bar_icon":
+                menu_bar_icon.setVisible(new_value)
+
+        FF_Additional_UI.get_settings_signals().changed.connect(display_menu_bar_icon_changed)
+
         return menu_bar_icon
 
     # Generic Label input
@@ -1201,6 +1251,7 @@ class MainWindow:
     # Updating Actives Searches Label
     @staticmethod
     def update_search_status_label(ui_building=False):
+        import FF_Search
         # Debug
         logging.debug(f"Updating search status label, active searches: {FF_Search.ACTIVE_SEARCH_THREADS}")
         # If there are no active searches
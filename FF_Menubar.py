@@ -7,28 +7,29 @@
 # http://www.gnu.org/licenses/gpl-3.0.html
 
 # Imports
-import hashlib
 import logging
 import os
 import subprocess
+import threading
 from json import dump, load
 import gc
 import shutil
 from subprocess import run
 from time import perf_counter, ctime
 from sys import platform
-from platform import mac_ver
 
 # PySide6 Gui Imports
-from PySide6.QtCore import QThreadPool
-from PySide6.QtGui import QAction, QColor, QKeySequence, QClipboard, QBrush
-from PySide6.QtWidgets import QFileDialog, QListWidget, QTreeWidget
+from PySide6.QtCore import QThreadPool, QObject, Signal, Qt, QPersistentModelIndex
+from PySide6.QtGui import QAction, QColor, QKeySequence, QClipboard, QBrush, QFont
+from PySide6.QtWidgets import QFileDialog, QListWidget, QTreeWidget, QProgressDialog
 
 # Projects Libraries
 import FF_Additional_UI
 import FF_Compare
 import FF_Duplicated
 import FF_Files
+import FF_Hashing
+import FF_Trash
 import FF_About_UI
 import FF_Settings
 
@@ -36,6 +37,10 @@ import FF_Settings
 # This file contains the code for the menu-bar in the search-results window,
 # the compare window and the duplicated files window
 
+# Cache files are read and written by the workers of several windows, only one of them changes them at a time
+cache_file_lock = threading.Lock()
+
+
 # Main class
 class MenuBar:
 
@@ -54,6 +59,8 @@ class MenuBar:
 
         # Creating a set for all marked files
         self.marked_files = set()
+        # Counts how often reloading filled the listbox again, which deletes its items
+        self.listbox_resets = 0
 
         # Menu-bar
         self.menu_bar = self.parent.menuBar()
@@ -77,6 +84,12 @@ class MenuBar:
             reload_action.triggered.connect(self.reload_files)
             reload_action.setShortcut("Ctrl+R")
             self.tools_menu.addAction(reload_action)
+        elif window == "duplicated":
+            # Export Report
+            export_report_action = QAction("&Export Report...", self.parent)
+            export_report_action.triggered.connect(save_search)
+            export_report_action.setShortcut("Ctrl+S")
+            self.file_menu.addAction(export_report_action)
 
         # Clear Cache
         cache_action = QAction("&Clear Cache", self.parent)
@@ -88,6 +101,18 @@ class MenuBar:
         cache_action.setShortcut("Ctrl+T")
         self.tools_menu.addAction(cache_action)
 
+        # Clear Hash Cache
+        hash_cache_action = QAction("&Clear Hash Cache", self.parent)
+        hash_cache_action.triggered.connect(FF_Files.remove_hash_cache)
+        hash_cache_action.triggered.connect(
+            lambda: FF_Additional_UI.PopUps.show_info_messagebox("Cleared Hash Cache",
+                                                                 "Cleared the cache of file hashes successfully!",
+                                                                 self.parent))
+        self.tools_menu.addAction(hash_cache_action)
+
+        # Profile next Search
+        FF_Additional_UI.add_profile_action(self.parent, self.tools_menu)
+
         # Separator
         self.tools_menu.addSeparator()
 
@@ -120,18 +145,18 @@ class MenuBar:
             self.tools_menu.addSeparator()
 
             # Select an app to open the selected file
-            delete_file_action = QAction("&Move selected file to trash", self.parent)
+            delete_file_action = QAction("&Move selected files to trash", self.parent)
             delete_file_action.triggered.connect(self.delete_file)
             delete_file_action.setShortcut("Ctrl+Backspace")
             self.tools_menu.addAction(delete_file_action)
 
             # Prompt the user to select a new location for the selected file
-            move_file_action = QAction("&Move or Rename selected file", self.parent)
+            move_file_action = QAction("&Move or Rename selected files", self.parent)
             move_file_action.triggered.connect(self.move_file)
             move_file_action.setShortcut("Ctrl+M")
             self.tools_menu.addAction(move_file_action)
 
-            mark_file_action = QAction("&Mark/Unmark file", self.parent)
+            mark_file_action = QAction("&Mark/Unmark selected files", self.parent)
             mark_file_action.triggered.connect(lambda: self.mark_file(FF_Files.GREEN_LIGHT_THEME_COLOR))
             mark_file_action.setShortcut("M")
             self.tools_menu.addAction(mark_file_action)
@@ -222,233 +247,220 @@ class MenuBar:
             self.file_menu.addAction(duplicated_action)
 
     # Options for files and folders
-    # Prompts a user to select a new location for the file
+    # Prompts a user to select a new location for the selected files
     def move_file(self):
         # Debug
         logging.info("Called Move file")
 
         try:
-            # Selecting the highlighted item of the listbox
-            selected_file = self.get_current_item()
+            # Selecting the highlighted items of the listbox
+            selected_items = self.get_selected_items()
+        except AttributeError:
+            return
+        selected_files = [self.get_item_path(item) for item in selected_items]
 
-            # Debug
-            logging.info(f"Selected file: {selected_file}, prompting for new location...")
+        # Debug
+        logging.info(f"Selected {len(selected_files)} files, prompting for new location...")
 
+        # A single file can be renamed
+        if len(selected_files) == 1:
             # Prompting the user for a new location
             new_location = QFileDialog.getSaveFileName(
                 self.parent,
-                caption=f"Rename / Move {os.path.basename(selected_file)}",
-                dir=selected_file
+                caption=f"Rename / Move {os.path.basename(selected_files[0])}",
+                dir=selected_files[0]
             )[0]
+        # Multiple files are moved into a folder
+        else:
+            new_location = QFileDialog.getExistingDirectory(
+                self.parent,
+                caption=f"Move {len(selected_files)} files to",
+                dir=os.path.dirname(selected_files[0]))
 
-            logging.info(f"New file location: {new_location}")
+        logging.info(f"New file location: {new_location}")
 
-            # If no file was selected
-            if new_location == "":
-                logging.info("User pressed Cancel")
-                return
-            else:
-                new_location = os.path.normpath(new_location)
+        # If no file was selected
+        if new_location == "":
+            logging.info("User pressed Cancel")
+            return
+        else:
+            new_location = os.path.normpath(new_location)
 
-            try:
+        def move(selected_file):
+            if len(selected_files) == 1:
                 shutil.move(selected_file, new_location)
-            except FileNotFoundError:
-                # Debug
-                logging.critical(f"File not Found: {selected_file}")
-
-                # If cmd wasn't successful display this error
-                FF_Additional_UI.PopUps.show_critical_messagebox(
-                    "Error!",
-                    f"File not found!\nTried to move:\n\n"
-                    f" {selected_file}\n\n"
-                    f"to:\n\n"
-                    f"{new_location}",
-                    self.parent
-                )
-
-            # If everything ran successful
             else:
-                # Debug
-                logging.debug(f"Moved {selected_file} to {new_location}")
-
-                if self.window == "compare" or self.window == "search":
-                    # Set the icon
-                    icon = FF_Additional_UI.UIIcon(
-                        os.path.join(FF_Files.ASSETS_FOLDER, "move_icon_small.png"),
-                        icon_set_func=self.get_listbox().item(self.get_listbox().currentRow()).setIcon,
-                        turn_auto=False)
-
-                    icon.turn_dark()
-
-                    # Change the color to red
-                    self.get_listbox().item(
-                        self.get_listbox().currentRow()).setBackground(QColor(FF_Files.RED_DARK_THEME_COLOR))
-                    # Change font color to white
-                    self.get_listbox().item(self.get_listbox().currentRow()).setForeground(QColor("white"))
-
-                    # Change font to italic
-                    font = self.get_listbox().item(self.get_listbox().currentRow()).font()
-                    font.setItalic(True)
-                    self.get_listbox().item(self.get_listbox().currentRow()).setFont(font)
-
-                # QTreeWidget needs special treatment
-                elif self.window == "duplicated":
-                    # Icon
-                    # Set the icon
-                    icon = FF_Additional_UI.UIIcon(
-                        os.path.join(FF_Files.ASSETS_FOLDER, "move_icon_small.png"),
-                        icon_set_func=lambda x: self.get_listbox().currentItem().setIcon(0, x),
-                        turn_auto=False)
-
-                    icon.turn_dark()
-
-                    # Change the color to red
-                    self.get_listbox().currentItem().setBackground(0, QColor(FF_Files.RED_DARK_THEME_COLOR))
-                    # Change font color to white
-                    self.get_listbox().currentItem().setForeground(0, QColor("white"))
-
-                    # Change font to italic
-                    font = self.get_listbox().currentItem().font(0)
-                    font.setItalic(True)
-                    self.get_listbox().currentItem().setFont(0, font)
-
-                # Removing file from cache
-                logging.info("Removing file from cache...")
-                self.remove_file_from_cache(selected_file)
-        except SystemExit:
-            # Triggered when no file is selected
-            FF_Additional_UI.PopUps.show_critical_messagebox("Error!", "Select a File!", self.parent)
+                shutil.move(selected_file, os.path.join(new_location, os.path.basename(selected_file)))
+
+        self.run_file_operation(
+            selected_items, move, f"Moving {len(selected_files)} files...", "Couldn't move",
+            os.path.join(FF_Files.ASSETS_FOLDER, "move_icon_small.png"), FF_Files.RED_DARK_THEME_COLOR)
 
-    # Moves a file to the trash
+    # Moves the selected files to the trash
     def delete_file(self):
-        selected_file = self.get_current_item()
+        try:
+            # Selecting the highlighted items of the listbox
+            selected_items = self.get_selected_items()
+        except AttributeError:
+            return
 
-        if platform == "darwin":
-            # the trash command is only available on macOS 14+
-            # The alternative, apple scripts, requires an extra authorization from the user
-            # Getting the current macOS major version
-            if int(mac_ver()[0].split(".")[0]) >= 14:
-                command = ["trash", selected_file]
-            else:
-                command = ["osascript", "-e",
-                           f"tell application \"Finder\" to delete POSIX file \"${selected_file}\""]
-        elif platform == "linux":
-            command = ["gio", "trash", selected_file]
-        elif platform == "win32" or platform == "cygwin":
-            command = ["echo",
-                       f"(new-object -comobject Shell.Application).Namespace(0).ParseName(\"{selected_file}\")"
-                       f".InvokeVerb(\"delete\")", "|", "powershell", "-command", "-"]
+        if len(selected_items) == 1:
+            question_text = self.get_item_path(selected_items[0])
         else:
-            command = None
-        # Moving the file to trash, after asking if necessary
-        if FF_Additional_UI.PopUps.show_delete_question(self.parent, selected_file):
+            question_text = f"{len(selected_items)} selected files"
+
+        # Moving the files to trash, after asking if necessary
+        if FF_Additional_UI.PopUps.show_delete_question(self.parent, question_text):
+            self.run_file_operation(
+                selected_items, FF_Trash.move_to_trash, f"Moving {len(selected_items)} files to trash...",
+                "Couldn't move to trash",
+                os.path.join(FF_Files.ASSETS_FOLDER, "trash_icon_small.png"), FF_Files.RED_LIGHT_THEME_COLOR)
+
+    # Runs an operation on every selected file in one worker thread with a progress bar,
+    # marks the files the operation succeeded for and removes them from the cache with a single update
+    def run_file_operation(self, selected_items, operation, progress_text, error_text, icon_path, color):
+        selected_files = [self.get_item_path(item) for item in selected_items]
+        # Indexes of the compare window stay valid while the model changes
+        if self.window == "compare":
+            selected_items = [QPersistentModelIndex(selected_item) for selected_item in selected_items]
+        listbox_resets = self.listbox_resets
 
-            try:
-                # Try to move the file to trash and add a date for uniqueness
-                subprocess.run(command, check=True)
+        # Progress bar, only shown if the operation takes longer than half a second
+        progress_dialog = QProgressDialog(progress_text, "Cancel", 0, len(selected_files), self.parent)
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(500)
 
-            except (subprocess.CalledProcessError, FileNotFoundError):
+        # The worker can't access the progress bar, so canceling is passed with an event
+        canceled = threading.Event()
+        progress_dialog.canceled.connect(canceled.set)
 
-                #  Error message
-                FF_Additional_UI.PopUps.show_critical_messagebox(
-                    "Error!", f"File not found: {selected_file}", self.parent)
+        # Events for threading
+        class Events(QObject):
+            progress = Signal(int)
+            finished = Signal(list, list)
 
-                # Debug
-                logging.error(f"File not found: {selected_file}")
+        # Every operation has its own events, the progress dialog keeps them alive until it is closed
+        file_operation_events = Events(progress_dialog)
+        file_operation_events.progress.connect(progress_dialog.setValue)
+
+        def finished(done_indexes, errors):
+            progress_dialog.reset()
 
-            # If everything ran successful
+            done_files = [selected_files[done_index] for done_index in done_indexes]
+
+            # Marking all files the operation succeeded for,
+            # if the listbox was reloaded in the meantime, its items are found again by their path
+            if self.listbox_resets == listbox_resets:
+                done_items = [selected_items[done_index] for done_index in done_indexes]
             else:
-                # Debug
-                logging.debug(f"Moved {selected_file} to trash")
-
-                if self.window == "compare" or self.window == "search":
-
-                    # Set the icon
-                    icon = FF_Additional_UI.UIIcon(
-                        os.path.join(FF_Files.ASSETS_FOLDER, "trash_icon_small.png"),
-                        icon_set_func=self.get_listbox().item(self.get_listbox().currentRow()).setIcon,
-                        turn_auto=False)
-
-                    icon.turn_dark()
-
-                    # Change the color to red
-                    self.get_listbox().item(
-                        self.get_listbox().currentRow()).setBackground(QColor(FF_Files.RED_DARK_THEME_COLOR))
-                    # Change font color to white
-                    self.get_listbox().item(self.get_listbox().currentRow()).setForeground(QColor("white"))
-
-                    # Change font to italic
-                    font = self.get_listbox().item(self.get_listbox().currentRow()).font()
-                    font.setItalic(True)
-                    self.get_listbox().item(self.get_listbox().currentRow()).setFont(font)
-
-                # QTreeWidget needs special treatment
-                elif self.window == "duplicated":
-                    # Icon
-                    # Set the icon
-                    icon = FF_Additional_UI.UIIcon(
-                        os.path.join(FF_Files.ASSETS_FOLDER, "trash_icon_small.png"),
-                        icon_set_func=lambda x: self.get_listbox().currentItem().setIcon(0, x),
-                        turn_auto=False)
-
-                    icon.turn_dark()
-
-                    # Change the color to red
-                    self.get_listbox().currentItem().setBackground(0, QColor(FF_Files.RED_LIGHT_THEME_COLOR))
-                    # Change font color to white
-                    self.get_listbox().currentItem().setForeground(0, QColor("white"))
-
-                    # Change font to italic
-                    font = self.get_listbox().currentItem().font(0)
-                    font.setItalic(True)
-                    self.get_listbox().currentItem().setFont(0, font)
-
-                # Removing file from cache
-                logging.info("Removing file from cache...")
-                self.remove_file_from_cache(selected_file)
-
-    # Marks a file
-    def mark_file(self, color):
-        selected_file = self.get_current_item()
-        # Testing if file is already marked
-        if selected_file in self.marked_files:
-            logging.info(f"Unmarking {self.get_current_item()}")
-            self.marked_files.remove(self.get_current_item())
-            # Unselecting the highlighted item of the listbox
-            if self.window == "compare" or self.window == "search":
+                done_items = self.find_list_items(done_files)
+            for done_item in done_items:
+                # Rows of the compare window can be removed in the meantime
+                if self.window != "compare" or done_item.isValid():
+                    self.set_item_style(done_item, icon_path, color, italic=True)
+
+            # Removing all files from the cache at once
+            if done_files:
+                logging.info("Removing files from cache...")
+                QThreadPool(self.parent).start(lambda: self.remove_files_from_cache(done_files))
 
-                # Change the color to the desired color
-                self.get_listbox().item(
-                    self.get_listbox().currentRow()).setBackground(QBrush())
+            # Error message
+            if errors:
+                FF_Additional_UI.PopUps.show_critical_messagebox(
+                    "Error!", f"{error_text}:\n\n" + "\n".join(errors[:20])
+                    + (f"\n\nand {len(errors) - 20} more" if len(errors) > 20 else ""), self.parent)
+
+        file_operation_events.finished.connect(finished)
+
+        # Running the operation for every file
+        def run_operation(events):
+            done_indexes = []
+            errors = []
+            for file_index, selected_file in enumerate(selected_files):
+                if canceled.is_set():
+                    break
+                try:
+                    operation(selected_file)
+                except (OSError, shutil.Error, subprocess.CalledProcessError) as error:
+                    # Debug
+                    logging.error(f"{error_text} {selected_file}: {error}")
+                    errors.append(selected_file)
+                else:
+                    done_indexes.append(file_index)
+                events.progress.emit(file_index + 1)
+
+            events.finished.emit(done_indexes, errors)
+
+        QThreadPool(self.parent).start(lambda: run_operation(file_operation_events))
 
-                # Change font color to white if necessary
-                QColor(color).lightness()
-                self.get_listbox().item(self.get_listbox().currentRow()).setForeground(QBrush())
+    # Marks the selected files
+    def mark_file(self, color):
+        try:
+            # Selecting the highlighted items of the listbox
+            selected_items = self.get_selected_items()
+        except AttributeError:
+            return
 
+        for selected_item in selected_items:
+            selected_file = self.get_item_path(selected_item)
+            # Testing if file is already marked
+            if selected_file in self.marked_files:
+                logging.info(f"Unmarking {selected_file}")
+                self.marked_files.remove(selected_file)
+                self.set_item_style(selected_item, None, None)
             else:
-                # Change the color to red
-                self.get_listbox().currentItem().setBackground(0, QColor(FF_Files.RED_DARK_THEME_COLOR))
-                # Change font color to white
-                self.get_listbox().currentItem().setForeground(0, QColor("white"))
+                logging.info(f"Marking {selected_file} {color}")
+                self.marked_files.add(selected_file)
+                self.set_item_style(selected_item, None, color)
+
+    # Changes the color, the icon and the font of an item in a QListWidget or QTreeWidget,
+    # no color resets the colors
+    def set_item_style(self, item, icon_path, color, italic=False):
+        # QTreeWidget needs special treatment, because the style is set per column,
+        # the compare window uses a model, so its items are indexes of the model
+        if self.window == "duplicated":
+            def set_role(role, value):
+                item.setData(0, role, value)
+
+            def get_font():
+                return item.font(0)
+        elif self.window == "compare":
+            def set_role(role, value):
+                item.model().setData(item, value, role)
+
+            def get_font():
+                font = item.data(Qt.ItemDataRole.FontRole)
+                return QFont() if font is None else QFont(font)
         else:
-            logging.info(f"Marking {self.get_current_item()} {color}")
-            self.marked_files.add(self.get_current_item())
-            # Selecting the highlighted item of the listbox
-            if self.window == "compare" or self.window == "search":
+            def set_role(role, value):
+                item.setData(role, value)
 
-                # Change the color to the desired color
-                self.get_listbox().item(
-                    self.get_listbox().currentRow()).setBackground(QColor(color))
+            def get_font():
+                return item.font()
 
-                # Change font color to white if necessary
-                QColor(color).lightness()
-                self.get_listbox().item(self.get_listbox().currentRow()).setForeground(QColor("white"))
+        # Set the icon
+        if icon_path is not None:
+            icon = FF_Additional_UI.UIIcon(
+                icon_path,
+                icon_set_func=lambda x: set_role(Qt.ItemDataRole.DecorationRole, x),
+                turn_auto=False)
 
-            else:
-                # Change the color to red
-                self.get_listbox().currentItem().setBackground(0, QColor(FF_Files.RED_DARK_THEME_COLOR))
-                # Change font color to white
-                self.get_listbox().currentItem().setForeground(0, QColor("white"))
+            icon.turn_dark()
+
+        if color is None:
+            set_role(Qt.ItemDataRole.BackgroundRole, QBrush())
+            set_role(Qt.ItemDataRole.ForegroundRole, QBrush())
+        else:
+            # Change the color to the desired color
+            set_role(Qt.ItemDataRole.BackgroundRole, QColor(color))
+            # Change font color to white
+            set_role(Qt.ItemDataRole.ForegroundRole, QColor("white"))
+
+        # Change font to italic, keeping the rest of the font of the item
+        if italic:
+            font = get_font()
+            font.setItalic(True)
+            set_role(Qt.ItemDataRole.FontRole, font)
 
     # Open a file with the default app
     def open_file(self):
@@ -649,46 +661,63 @@ class MenuBar:
             # structure
             hash_list = {"md5": "", "sha1": "", "sha256": ""}
             # Buffer size for hashes
-            buffer_size = 65536
+            buffer_size = FF_Settings.SettingsWindow.load_setting("hashing_buffer_size")
             # Saving times
             saved_time = perf_counter()
 
+            # Loading hashes of the unchanged file from the hash cache
+            hash_file_stat = os.stat(hash_file)
+            hash_cache = FF_Hashing.HashCache()
+            for hash_str in hash_list:
+                hash_list[hash_str] = hash_cache.get(hash_file_stat, hash_str, "full") or ""
+
+            # Hashes which couldn't be computed, with the error
+            hash_errors = {}
+
             # Function for all hash types
-            def calc_hash(hash_str: str, hash_func: hashlib):
+            def calc_hash(hash_str: str):
                 logging.debug(f"Computing {hash_str} Hash...")
-                with open(hash_file, "rb") as open_hash_file:
-                    # Initializing the hash method e.g. sha1
-                    computing_hash = hash_func(usedforsecurity=False)
-                    while True:
-                        # reading data = BUF_SIZE from the
-                        # file and saving it in a variable
-                        data = open_hash_file.read(buffer_size)
-
-                        # True if eof = 1
-                        if not data:
-                            break
-                        # Updating hash
-                        computing_hash.update(data)
-
-                    # Hashes all the input data passed
-                    hash_list[hash_str] = computing_hash.hexdigest()
+                try:
+                    hash_list[hash_str] = FF_Hashing.hash_file(hash_file, hash_str, buffer_size)[0]
+                except OSError as hash_error:
+                    # Debug
+                    logging.error(f"Couldn't compute the {hash_str} hash of {hash_file}: {hash_error}")
+                    hash_errors[hash_str] = hash_error
 
             # Defining threads
             hash_thread_pool = QThreadPool(self.parent)
 
             # sha1 Hash
-            hash_thread_pool.start(lambda: calc_hash("sha1", hashlib.sha1))
+            if not hash_list["sha1"]:
+                hash_thread_pool.start(lambda: calc_hash("sha1"))
 
             # md5 Hash
-            hash_thread_pool.start(lambda: calc_hash("md5", hashlib.md5))
+            if not hash_list["md5"]:
+                hash_thread_pool.start(lambda: calc_hash("md5"))
 
             # sha256 Hash
-            hash_thread_pool.start(lambda: calc_hash("sha256", hashlib.sha256))
+            if not hash_list["sha256"]:
+                hash_thread_pool.start(lambda: calc_hash("sha256"))
 
             # Waiting for hashes
             logging.debug("Waiting for Hashes to complete...")
 
             hash_thread_pool.waitForDone()
+
+            # Saving the hashes to the hash cache, hashes which couldn't be computed are empty
+            for hash_str, computed_hash in hash_list.items():
+                if computed_hash:
+                    hash_cache.add(hash_file_stat, hash_str, "full", computed_hash)
+            hash_cache.close()
+
+            # Showing the error instead of empty hashes
+            if hash_errors:
+                FF_Additional_UI.PopUps.show_critical_messagebox(
+                    title="Hashing Error!",
+                    text=f"Couldn't compute the hashes of {hash_file}:\n\n" + "\n".join(
+                        f"{hash_str}: {hash_error}" for hash_str, hash_error in hash_errors.items()),
+                    parent=self.parent)
+                return
             sha1_hash = hash_list["sha1"]
             logging.debug(f"{sha1_hash=}")
 
@@ -738,29 +767,41 @@ class MenuBar:
         clipboard = QClipboard()
         clipboard.setText(self.get_current_item().replace(" ", r"\ "))
 
-    # Remove moved file from cache
-    def remove_file_from_cache(self, file):
-        with open(FF_Files.path_to_cache_file(self.search_path)) as search_file:
-            cached_files = load(search_file)
-
-        cached_files["found_path_set"].remove(file)
-
-        with open(FF_Files.path_to_cache_file(self.search_path), "w") as search_file:
-            dump(cached_files, search_file)
-
-        # If there is a cache file from a higher directory
-        if self.cache_file_path != FF_Files.path_to_cache_file(self.search_path):
-            with open(self.cache_file_path) as upper_search_file:
-                cached_files = load(upper_search_file)
+    # Remove moved files from cache, every cache file is only read and written once
+    def remove_files_from_cache(self, files):
+        removed_files = set(files)
+
+        cache_files = {self.cache_file_path}
+        # The compare window has no search path
+        if self.search_path is not None:
+            cache_files.add(FF_Files.path_to_cache_file(self.search_path))
+        for cache_file in cache_files:
+            # Another worker could write the cache file between reading and writing it
+            with cache_file_lock:
+                try:
+                    with open(cache_file) as search_file:
+                        cached_files = load(search_file)
+                except FileNotFoundError:
+                    # Cache was deleted in the meantime
+                    logging.warning(f"Cache file not found: {cache_file}")
+                    continue
 
-            cached_files["found_path_set"].remove(file)
+                cached_files["found_path_set"] = [
+                    cached_file for cached_file in cached_files["found_path_set"] if cached_file not in removed_files]
 
-            with open(self.cache_file_path, "w") as upper_search_file:
-                dump(cached_files, upper_search_file)
+                with open(cache_file, "w") as search_file:
+                    dump(cached_files, search_file)
 
-        del cached_files
+            del cached_files
         # Debug
-        logging.info("Removed file from cache")
+        logging.info(f"Removed {len(removed_files)} files from cache")
+
+    # Getting the items of the search window with these paths, after reloading filled the listbox again
+    def find_list_items(self, paths) -> list:
+        list_items = {}
+        for row in range(self.listbox.count()):
+            list_items.setdefault(self.listbox.item(row).text(), self.listbox.item(row))
+        return [list_items[path] for path in paths if path in list_items]
 
     # Getting the listbox because there are two in the compare window
     def get_listbox(self):
@@ -775,7 +816,11 @@ class MenuBar:
     def get_current_item(self):
         try:
             if self.window == "compare":
-                return self.parent.focusWidget().currentItem().text()
+                # The compare window uses a model instead of items
+                current_index = self.parent.focusWidget().currentIndex()
+                if not current_index.isValid():
+                    raise AttributeError("No index is highlighted")
+                return current_index.data()
             elif self.window == "duplicated":
                 self.listbox: QTreeWidget
                 return self.listbox.currentItem().text(0)
@@ -787,6 +832,33 @@ class MenuBar:
             FF_Additional_UI.PopUps.show_critical_messagebox("Error!", "Select a File!", self.parent)
             raise AttributeError("User selected no file")
 
+    # Getting the selected items of the listbox, or the highlighted item if no item is selected,
+    # raises AttributeError if there is no item
+    def get_selected_items(self) -> list:
+        # Shows an error if no file is highlighted
+        self.get_current_item()
+
+        if self.window == "compare":
+            selected_items = self.get_listbox().selectionModel().selectedIndexes()
+            current_item = self.get_listbox().currentIndex()
+        else:
+            selected_items = self.get_listbox().selectedItems()
+            current_item = self.get_listbox().currentItem()
+
+        if not selected_items:
+            selected_items = [current_item]
+        return selected_items
+
+    # Getting the path of an item, which is in the first column of the duplicated window
+    # and the data of an index in the compare window
+    def get_item_path(self, item) -> str:
+        if self.window == "duplicated":
+            return item.text(0)
+        elif self.window == "compare":
+            return item.data()
+        else:
+            return item.text()
+
     # When an item is double-clicked
     def double_clicking_item(self):
         # Loading Setting
@@ -807,76 +879,65 @@ class MenuBar:
 
     # Reloads File, check all collected files, if they still exist
     def reload_files(self):
-        try:
-            logging.info("Reload...")
-            time_before_reload = perf_counter()
-            removed_list = []
-            # Creating a copy so that the list doesn't run out of index
-            matched_list_without_deleted_files = self.matched_list.copy()
-
-            for matched_file in self.matched_list:
-                if os.path.exists(matched_file):
-                    continue
-                else:
-                    # Remove file from widget if it doesn't exist
-                    self.get_listbox().takeItem(matched_list_without_deleted_files.index(matched_file))
-                    matched_list_without_deleted_files.remove(matched_file)
-                    # Adding file to removed_list to later remove it from cache
-                    removed_list.append(matched_file)
+        logging.info("Reload...")
+        time_before_reload = perf_counter()
+        # Taking the list now, so the worker doesn't see changes made while reloading
+        matched_list = self.matched_list.copy()
+
+        # Events for threading
+        class Events(QObject):
+            finished = Signal(list, set)
+
+        self.reload_events = Events()
+
+        # Testing all files in a worker and removing deleted files from the cache
+        def find_deleted_files(events):
+            removed_set = FF_Files.find_deleted_files(matched_list)
+            # Rebuilding the list in one pass, instead of removing every file separately
+            matched_list_without_deleted_files = [
+                matched_file for matched_file in matched_list if matched_file not in removed_set]
+
+            # Removing all deleted files from cache
+            if removed_set:
+                self.remove_files_from_cache(removed_set)
+
+            events.finished.emit(matched_list_without_deleted_files, removed_set)
+
+            # Run garbage collection
+            gc.collect()
+
+        # Updating the UI with one reset of the listbox
+        def update_ui(matched_list_without_deleted_files, removed_set):
+            if removed_set:
+                listbox = self.get_listbox()
+                listbox.setUpdatesEnabled(False)
+                listbox.clear()
+                self.listbox_resets += 1
+                listbox.addItems(matched_list_without_deleted_files)
+
+                # Marking the marked files again
+                self.marked_files.difference_update(removed_set)
+                for row, matched_file in enumerate(matched_list_without_deleted_files):
+                    if matched_file in self.marked_files:
+                        self.set_item_style(listbox.item(row), None, FF_Files.GREEN_LIGHT_THEME_COLOR)
+                listbox.setUpdatesEnabled(True)
+
+                # Update internal list, in place, so that the search window uses the same list
+                self.matched_list[:] = matched_list_without_deleted_files
+
+            # UI
+            self.file_count_text.setText(f"Files found: {len(self.matched_list)}")
 
             # Debug
-            logging.info(f"Reloaded found Files and removed {len(removed_list)} in"
+            logging.info(f"Reloaded found Files and removed {len(removed_set)} in"
                          f" {round(perf_counter() - time_before_reload, 3)} sec.")
             FF_Additional_UI.PopUps.show_info_messagebox(
                 "Reloaded!",
-                f"Reloaded found Files and removed {len(removed_list)}"
+                f"Reloaded found Files and removed {len(removed_set)}"
                 f" in {round(perf_counter() - time_before_reload, 3)} sec.",
                 self.parent)
-            # UI
-            self.file_count_text.setText(f"Files found: {len(self.matched_list)}")
-
-            # Update internal list
-            self.matched_list = matched_list_without_deleted_files.copy()
 
-            def modify_cache():
-                # Loading cache to update it
-                with open(self.cache_file_path) as search_file:
-                    cached_file: dict[list, dict, dict] = load(search_file)
+        self.reload_events.finished.connect(update_ui)
 
-                # Testing if the cache file from the specified directory was used as to also update the used cache
-                if self.cache_file_path != FF_Files.path_to_cache_file(self.search_path):
-
-                    different_cache_file = True
-                    # Loading cache to update it
-                    with open(FF_Files.path_to_cache_file(self.search_path)) as upper_search_file:
-                        cached_home_file: dict[list, dict, dict] = load(upper_search_file)
-                else:
-                    different_cache_file = False
-
-                # Removing all deleted files from cache
-                for removed_file in removed_list:
-                    try:
-                        cached_file["found_path_set"].remove(removed_file)
-                        if different_cache_file:
-                            cached_home_file["found_path_set"].remove(removed_file)
-                    except (KeyError, ValueError):
-                        # File was already removed from cache
-                        pass
-
-                with open(FF_Files.path_to_cache_file(self.search_path), "w") as search_file:
-                    dump(cached_file, search_file)
-
-                # Loading the cache file from the higher directory
-                if different_cache_file:
-                    with open(self.cache_file_path, "w") as upper_search_file:
-                        dump(cached_home_file, upper_search_file)
-
-                # Run garbage collection
-                gc.collect()
-
-            QThreadPool(self.parent).start(modify_cache)
-
-        except FileNotFoundError:
-            FF_Additional_UI.PopUps.show_info_messagebox("Cache File not Found!",
-                                                         "Cache File was deleted, couldn't Update Cache!",
-                                                         self.parent)
+        reload_events = self.reload_events
+        QThreadPool(self.parent).start(lambda: find_deleted_files(reload_events))
@@ -0,0 +1,148 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the code for profiling the next search, finding of duplicated files or comparing of searches
+#
+# If profiling was requested (Tools > Profile next Search or --profile on the command line), the next job runs with
+# cProfile and tracemalloc. A .prof file, which can be opened with pstats or snakeviz, and a report with the
+# slowest functions and the top allocations are saved in PROFILES_FOLDER, so they can be attached to issues.
+# cProfile only profiles the thread of the job, threads started by the job (like when hashing) aren't included.
+# Profiled searches don't use the search daemon, which runs in another process
+
+# Imports
+import cProfile
+import io
+import logging
+import os
+import platform
+import pstats
+import threading
+import tracemalloc
+from time import strftime, perf_counter
+
+# Projects Libraries
+import FF_Files
+
+# Folder for the profiles
+PROFILES_FOLDER = os.path.join(FF_Files.FF_LIB_FOLDER, "Profiles")
+# Number of functions and allocations in the report
+REPORT_LENGTH = 30
+# Number of frames saved for every allocation
+TRACEMALLOC_FRAMES = 10
+
+# If the next job should be profiled
+PROFILE_NEXT_JOB = False
+PROFILE_LOCK = threading.Lock()
+
+
+# Requesting or cancelling profiling of the next job
+def request_profile(enabled: bool = True):
+    global PROFILE_NEXT_JOB
+    with PROFILE_LOCK:
+        PROFILE_NEXT_JOB = enabled
+
+
+def is_profile_requested() -> bool:
+    return PROFILE_NEXT_JOB
+
+
+# Testing if the job, which is started now should be profiled, only one job is profiled per request
+def take_profile_request() -> bool:
+    global PROFILE_NEXT_JOB
+    with PROFILE_LOCK:
+        requested = PROFILE_NEXT_JOB
+        PROFILE_NEXT_JOB = False
+    return requested
+
+
+# Returning the function, so it is profiled when called
+def profiled(name: str, function):
+    def profiled_function(*args, **kwargs):
+        return profile(name, function, *args, **kwargs)[0]
+
+    return profiled_function
+
+
+# Returning the function, so it is profiled when called, if profiling was requested.
+# Has to be called when the job is started, not in its thread
+def profiled_if_requested(name: str, function):
+    if not take_profile_request():
+        return function
+    return profiled(name, function)
+
+
+# Running a function with cProfile and tracemalloc.
+# Returns the result of the function and the paths of the .prof file and the report
+def profile(name: str, function, *args, **kwargs) -> tuple:
+    os.makedirs(PROFILES_FOLDER, exist_ok=True)
+    profile_base = os.path.join(PROFILES_FOLDER, f"{name}_{strftime('%Y-%m-%d_%H-%M-%S')}")
+    profile_file = f"{profile_base}.prof"
+    report_file = f"{profile_base}.txt"
+
+    # Debug
+    logging.info(f"Profiling {name}...")
+
+    # tracemalloc may already be running, like with python -X tracemalloc, then it isn't stopped afterwards
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    else:
+        tracemalloc.clear_traces()
+    tracemalloc.reset_peak()
+
+    profiler = cProfile.Profile()
+    time_start = perf_counter()
+    try:
+        result = profiler.runcall(function, *args, **kwargs)
+    finally:
+        time_needed = perf_counter() - time_start
+        snapshot = tracemalloc.take_snapshot()
+        memory_current, memory_peak = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+
+        profiler.dump_stats(profile_file)
+        write_report(report_file, name, profiler, snapshot, time_needed, memory_current, memory_peak)
+
+        # Debug
+        logging.info(f"Saved profile of {name} to {profile_file} and {report_file}")
+
+    return result, profile_file, report_file
+
+
+# Writing the slowest functions and the top allocations as text
+def write_report(report_file: str, name: str, profiler: cProfile.Profile, snapshot: tracemalloc.Snapshot,
+                 time_needed: float, memory_current: int, memory_peak: int):
+    # Allocations of File Find and the standard library, not of tracemalloc itself
+    snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                       tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")))
+
+    functions = io.StringIO()
+    pstats.Stats(profiler, stream=functions).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_LENGTH)
+
+    with open(report_file, "w") as report:
+        report.write(f"File Find Profile: {name}\n"
+                     f"File Find version: {FF_Files.VERSION_SHORT}[{FF_Files.VERSION}]\n"
+                     f"Platform: {platform.platform()}, Python {platform.python_version()}\n"
+                     f"Created: {strftime('%Y-%m-%d %H:%M:%S')}\n"
+                     f"Time needed: {round(time_needed, 3)}s\n"
+                     f"Memory at the end: {FF_Files.conv_file_size(memory_current)}, "
+                     f"peak: {FF_Files.conv_file_size(memory_peak)}\n\n")
+
+        report.write(f"Top {REPORT_LENGTH} allocations still in memory at the end, by line:\n")
+        for statistic in snapshot.statistics("lineno")[:REPORT_LENGTH]:
+            report.write(f"{statistic}\n")
+
+        report.write(f"\nTop {REPORT_LENGTH // 3} allocations still in memory at the end, with traceback:\n")
+        for statistic in snapshot.statistics("traceback")[:REPORT_LENGTH // 3]:
+            report.write(f"{FF_Files.conv_file_size(statistic.size)} in {statistic.count} blocks\n")
+            for line in statistic.traceback.format():
+                report.write(f"    {line}\n")
+
+        report.write(f"\nSlowest {REPORT_LENGTH} functions (cumulative):\n")
+        report.write(functions.getvalue())
@@ -0,0 +1,739 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the search engine without any user-interface,
+# so it can be used by the main window, the command line and the benchmarks
+
+# Imports
+import logging
+import os
+import time
+from fnmatch import fnmatch
+from json import dump, load
+from sys import platform
+from time import perf_counter, mktime
+from unicodedata import normalize
+
+# Projects Libraries
+import FF_Files
+import FF_Search_Stats
+
+# Options of the "Search for" and "Sort by" filters
+SEARCH_FOR_OPTIONS = ("Files and Folders", "only Files", "only Folders")
+SORT_OPTIONS = ("None (fastest)", "File Size", "File Name", "Date Modified", "Date Created", "Path")
+# Units of the file size filter
+SIZE_UNIT_FACTORS = {"No Limit": 1, "Bytes": 1, "KB": 1000, "MB": 1000000, "GB": 1000000000}
+# Files created by the operating system, which are never found
+DUMP_FILES = (".ds_store", ".localized", "desktop.ini", "thumbs.db")
+# First day of the date filters in the main window
+DEFAULT_DATE_FROM = "2000-01-01"
+
+
+# Raised if a search can't be started, kind says which filter is wrong,
+# title and message are the texts shown to the user
+class SearchError(Exception):
+    def __init__(self, kind: str, title: str, message: str):
+        super().__init__(message)
+        self.kind = kind
+        self.title = title
+        self.message = message
+
+
+# Sorting algorithms
+class Sort:
+
+    # Sort by Size
+    @staticmethod
+    def size(file):
+        return FF_Files.get_file_size(file)
+
+    # Sort by Name
+    @staticmethod
+    def name(file):
+        try:
+            return os.path.basename(file)
+        except FileNotFoundError:
+            return -1
+
+    # Sort by Date Modified
+    @staticmethod
+    def m_date(file):
+        try:
+            return os.path.getmtime(file)
+        except FileNotFoundError:
+            return -1
+
+    # Sort by Date Created on macOS
+    @staticmethod
+    def c_date_mac(file):
+        try:
+            # Using os.stat because os.path.getctime returns a wrong date
+            return os.stat(file).st_birthtime
+        except FileNotFoundError:
+            return -1
+
+    # Sort by Date Created on Windows
+    @staticmethod
+    def c_date_win(file):
+        try:
+            return os.path.getctime(file)
+        except FileNotFoundError:
+            return -1
+
+
+# Converting the file size filter into bytes, returns None if no size is set
+def convert_file_size(size_min: str, size_max: str, size_min_unit: str, size_max_unit: str) -> tuple | None:
+    if size_min_unit == "No Limit" and size_max_unit == "No Limit":
+        return None
+
+    try:
+        # Replacing No Limit with fixed values
+        if size_min_unit == "No Limit":
+            size_min = 0
+        if size_max_unit == "No Limit":
+            # Using 1 Petabyte as the upper limit
+            size_max = 1e15
+
+        # Adjust units
+        size_min = float(size_min) * SIZE_UNIT_FACTORS[size_min_unit]
+        size_max = float(size_max) * SIZE_UNIT_FACTORS[size_max_unit]
+
+    except (ValueError, KeyError):
+        raise SearchError("size", "SIZE ERROR!",
+                          "Size Error!\n\nFile size min is larger than file size max or one of them is invalid!")
+
+    return size_min, size_max
+
+
+# Converting an ISO date (2024-01-26) into unix time at the start of the day,
+# the last day of a range is expanded by one day, because if the range is 1.Jan.2024 - 1.Jan.2024 no file would be found
+def convert_date(iso_date: str, expand_days: int = 0) -> float:
+    year, month, day = iso_date.split("-")
+    # Fill in hours, minutes and second with 0 because we don't have them
+    return mktime((int(year), int(month), int(day) + expand_days, 0, 0, 0, 0, 0, 0))
+
+
+# Converting a date range into unix times, an empty end means today, returns None if the range is the default range
+def convert_date_range(date_from: str, date_to: str) -> tuple[float, float] | None:
+    today = time.strftime("%Y-%m-%d")
+    if date_to in ("", "DEFAULT_DATE"):
+        date_to = today
+    if date_from in ("", DEFAULT_DATE_FROM) and date_to == today:
+        return None
+
+    try:
+        return convert_date(date_from or DEFAULT_DATE_FROM), convert_date(date_to, expand_days=1)
+    except ValueError:
+        raise SearchError("date", "DATE ERROR!", f"Date Error!\n\n{date_from} - {date_to} is not a valid date range!")
+
+
+# Everything a search is filtered by, dates are unix times and sizes are in bytes,
+# None means the filter isn't used
+class SearchQuery:
+    def __init__(self, directory: str, name: str = "", name_contains: str = "", file_extension: str = "",
+                 file_types: list[str] | None = None, file_contains: str = "",
+                 c_date: tuple[float, float] | None = None, m_date: tuple[float, float] | None = None,
+                 size: tuple[float, float] | None = None, hidden_files: bool = False,
+                 search_for: str = "Files and Folders", sort_by: str = "None (fastest)", reverse_sort: bool = False,
+                 excluded_files: list[str] | None = None, new_cache_file: bool = False):
+        self.directory = directory
+        self.name = name
+        self.name_contains = name_contains
+        # The "." and any star are removed, because they are added when filtering
+        self.file_extension = file_extension.lstrip(".*")
+        self.file_types = list(FF_Files.FILE_FORMATS.keys()) if file_types is None else file_types
+        self.file_contains = file_contains
+        self.c_date = c_date
+        self.m_date = m_date
+        self.size = size
+        self.hidden_files = hidden_files
+        self.search_for = search_for
+        self.sort_by = sort_by
+        self.reverse_sort = reverse_sort
+        self.excluded_files = [] if excluded_files is None else excluded_files
+        self.new_cache_file = new_cache_file
+
+    # Testing if the filters can be used together, raises SearchError if not
+    def validate(self):
+        # Testing if file ending, file groups or name contains are used together with name,
+        # because if they do no file will be found
+        # Also testing if wildcard syntax is used in name,
+        # because wildcard is supported and so no error should appear
+        if (((self.name != "" and self.name_contains != "") or
+             (self.name != "" and self.file_extension != "") or
+             (self.name != "" and self.file_types != list(FF_Files.FILE_FORMATS.keys())))
+                and
+                (not (("[" in self.name) or ("?" in self.name) or ("*" in self.name)))):
+            raise SearchError(
+                "name", "NAME ERROR!",
+                "Name Error!\n\nFile name can't be used together with file type, name contains or file ending")
+
+        # Directory not valid
+        if not os.path.isdir(self.directory):
+            raise SearchError("directory", "Directory Error!",
+                              "Directory Error!\n\nGiven directory is not a valid folder!")
+
+        # File Size max must be larger than File Size min
+        if self.size is not None and not self.size[0] < self.size[1]:
+            raise SearchError(
+                "size", "SIZE ERROR!",
+                "Size Error!\n\nFile size min is larger than file size max or one of them is invalid!")
+
+        # First Date must be earlier than second Date
+        if (self.c_date is not None and self.c_date[0] >= self.c_date[1]) or \
+                (self.m_date is not None and self.m_date[0] >= self.m_date[1]):
+            raise SearchError("date", "DATE ERROR!",
+                              "Date Error!\n\n"
+                              "First date must be earlier than second date!\n\n"
+                              "e.g.:\nvalid: 15.Feb.2022 - 17.Feb.2023\n"
+                              "invalid: 17.Feb.2023 - 15.Feb.2022")
+
+        # Search in System Files disabled, but Search path is in library Folder
+        if not self.hidden_files and ("/Library" in self.directory or self.directory.startswith("/System")):
+            raise SearchError("system_files", "System Files Error!",
+                              "System Files Error!\n\nActivate Search in System Files!\n"
+                              "Search in system files disabled"
+                              " but search directory is in library folder!")
+
+        # If file_types is an empty list (no files would be found)
+        if not self.file_types:
+            raise SearchError("file_types", "File Types Error!",
+                              "File Types Error!\n\nSelect a file type!\n"
+                              "No files would be found, because no file type "
+                              "category is selected.")
+
+        # If the search scope is an excluded file
+        for excluded_file in self.excluded_files:
+            if self.directory.startswith(excluded_file):
+                raise SearchError(
+                    "excluded", "Directory Error!",
+                    "Directory Error!\n\n"
+                    "The directory you searched in is in an excluded folder.\n\n"
+                    "You can edit the excluded folders in the File Find Settings. \n(File Find > Preferences...)")
+
+    # The filters as a dictionary, which can be saved with JSON
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+    # Creating a query from the dictionary of as_dict(), like the filters in the header of a saved search.
+    # JSON stores the ranges as lists. Raises TypeError if the dictionary has unknown keys
+    @staticmethod
+    def from_dict(filters: dict) -> "SearchQuery":
+        filters = dict(filters)
+        for range_filter in ("c_date", "m_date", "size"):
+            if filters.get(range_filter) is not None:
+                filters[range_filter] = tuple(filters[range_filter])
+        return SearchQuery(**filters)
+
+
+# The result of a search
+class SearchResult:
+    def __init__(self, found_path_list: list[str], timings: dict[str, float], cache_file: str, query: SearchQuery,
+                 stats: dict | None = None):
+        self.found_path_list = found_path_list
+        # Seconds needed for scanning, indexing, sorting and in total
+        self.timings = timings
+        # The cache file the search was based on
+        self.cache_file = cache_file
+        self.query = query
+        # The stats of every stage, see FF_Search_Stats
+        self.stats = stats
+
+
+# The Search Engine.
+# progress is called with the name of every stage (like "scanning" or "indexing_name") when it starts,
+# run() returns the sorted results, iter_results() yields the results unsorted while they are filtered
+class SearchEngine:
+    def __init__(self, query: SearchQuery, progress=None):
+        self.query = query
+        self.progress = progress
+
+        self.found_path_set = set()
+        self.type_dict = {}
+        self.used_cache = False
+        self.cache_file = None
+        self.cache_file_c_date = 0
+
+        # Wall time, CPU time, entries, stat calls and bytes read of every stage
+        self.stats = FF_Search_Stats.SearchStats()
+
+    # Telling the caller which stage started
+    def report(self, stage: str):
+        if self.progress is not None:
+            self.progress(stage)
+
+    # Scanning as the first stage of the stats
+    def measured_scan(self):
+        with self.stats.stage("scanning", 0) as stage:
+            self.scan()
+            stage["entries_out"] = len(self.found_path_set)
+            stage["cache"] = "hit" if self.used_cache else "miss"
+
+    # Caching as the last stage of the stats
+    def measured_write_cache(self):
+        with self.stats.stage("caching", len(self.found_path_set)):
+            self.write_cache()
+
+    # Searching and sorting all results
+    def run(self) -> SearchResult:
+        # Saving time before scanning
+        time_before_start = perf_counter()
+
+        self.measured_scan()
+
+        # Saves time
+        time_after_searching = perf_counter() - time_before_start
+
+        # Debug
+        logging.info("Starting Indexing...")
+        # Update the status
+        self.report("indexing")
+
+        # Applies filters one after the other, keeping the files that match
+        found_path_list = list(self.found_path_set)
+        for stage, stage_filter in self.get_filters():
+            self.report(stage)
+            if stage_filter is not None:
+                with self.stats.stage(stage, len(found_path_list)) as stage_stats:
+                    found_path_list = [found_file for found_file in found_path_list if stage_filter(found_file)]
+                    stage_stats["entries_out"] = len(found_path_list)
+
+        # Prints out files found
+        logging.info(f"Found {len(found_path_list)} Files and Folders")
+
+        # Saving time
+        time_after_indexing = perf_counter() - (time_after_searching + time_before_start)
+
+        with self.stats.stage("sorting", len(found_path_list)) as stage_stats:
+            found_path_list = self.sort(found_path_list)
+            stage_stats["entries_out"] = len(found_path_list)
+        self.measured_write_cache()
+
+        # Calculating time
+        time_after_sorting = perf_counter() - (time_after_indexing + time_after_searching + time_before_start)
+        time_total = perf_counter() - time_before_start
+
+        # Cleaning Memory
+        self.found_path_set = set()
+        self.type_dict = {}
+
+        # Debug
+        logging.info("Finished Searching!")
+
+        return SearchResult(found_path_list,
+                            {"time_total": time_total,
+                             "time_searching": time_after_searching,
+                             "time_indexing": time_after_indexing,
+                             "time_sorting": time_after_sorting},
+                            self.cache_file, self.query, self.stats.as_dict())
+
+    # Yielding every result as soon as it passed all filters, the results aren't sorted.
+    # Every file goes through all filters before the next one is tested,
+    # so all filters are one stage in the stats, which includes the time the caller needs for every result
+    def iter_results(self):
+        self.measured_scan()
+
+        # Debug
+        logging.info("Starting Indexing...")
+        self.report("indexing")
+
+        found_files = iter(self.found_path_set)
+        for _stage, stage_filter in self.get_filters():
+            if stage_filter is not None:
+                found_files = filter(stage_filter, found_files)
+
+        with self.stats.stage("indexing", len(self.found_path_set)) as stage_stats:
+            stage_stats["entries_out"] = 0
+            for found_file in found_files:
+                stage_stats["entries_out"] += 1
+                yield found_file
+
+        self.measured_write_cache()
+
+        # Cleaning Memory
+        self.found_path_set = set()
+        self.type_dict = {}
+
+    # Filtering paths that weren't found by scanning, like files added since a search was saved,
+    # type_dict has the type ("file" or "folder") of every path
+    def filter_paths(self, paths: list[str], type_dict: dict[str, str]) -> list[str]:
+        self.type_dict = type_dict
+        for _stage, stage_filter in self.get_filters():
+            if stage_filter is not None:
+                paths = [path for path in paths if stage_filter(path)]
+        self.type_dict = {}
+        return paths
+
+    # The folders a scan looked at, every folder of type_dict in the directory of the search,
+    # without system folders (unless they were searched) and excluded folders, like the results
+    def get_searched_folders(self, type_dict: dict[str, str]) -> list[str]:
+        folder_prefix = os.path.join(self.query.directory, "")
+        searched_folders = [self.query.directory] + [
+            path for path, path_type in type_dict.items() if path_type == "folder" and path.startswith(folder_prefix)]
+
+        for stage, stage_filter in self.get_filters():
+            if stage in ("indexing_system_files", "indexing_excluded") and stage_filter is not None:
+                searched_folders = [folder for folder in searched_folders if stage_filter(folder)]
+        return searched_folders
+
+    # Finding all files in the directory, from the cache or with os.walk
+    def scan(self):
+        search_from = self.query.directory
+
+        # Testing Cache
+        FF_Files.cache_test(is_launching=False)
+
+        # Debug
+        logging.info("Starting Scanning...")
+        # Update the status
+        self.report("scanning")
+
+        '''Checking, if a Cache File exists in any fitting directory'''
+        for cache_file in os.listdir(FF_Files.CACHED_SEARCHES_FOLDER):
+            # Looks if there is a cache file for a higher directory
+            if search_from.replace(os.sep, "-").startswith(cache_file.removesuffix(".FFCache")):
+                # Date created from separate file
+                with open(os.path.join(FF_Files.CACHE_METADATA_FOLDER, cache_file)) as time_file:
+                    cache_file_c_date = load(time_file)["c_time"]
+
+                # Looks if it is newer
+                if cache_file_c_date > self.cache_file_c_date:
+                    self.cache_file_c_date = cache_file_c_date
+                    self.cache_file = os.path.join(FF_Files.CACHED_SEARCHES_FOLDER, cache_file)
+
+        # If there is a fitting cache file or user requested new cache file to be created
+        if self.cache_file is not None and not self.query.new_cache_file:
+            # Debug
+            logging.info(f"Scanning using cached data from {self.cache_file}"
+                         f" created at {time.ctime(self.cache_file_c_date)}")
+
+            self.used_cache = True
+            # Load cache
+            with open(self.cache_file) as search_results:
+                load_input = load(search_results)
+                self.stats.bytes_read += search_results.buffer.raw.tell()
+
+            self.found_path_set = set(load_input["found_path_set"])
+            self.type_dict = load_input["type_dict"]
+
+            # If the found cache file is form the same directory as which was searched
+            if self.cache_file == FF_Files.path_to_cache_file(search_from):
+                # Debug
+                logging.debug("Cache file from the same directory as search")
+
+            # If it's a cache file from an upper dir
+            else:
+                # Debug
+                logging.debug("Cache file from an higher directory, sorting out unnecessary files")
+
+                keep_time = perf_counter()
+
+                # Remove irrelevant paths
+                for found_item in self.found_path_set.copy():
+                    if not found_item.startswith(search_from):
+                        self.found_path_set.remove(found_item)
+                        del self.type_dict[found_item]
+
+                # Remove the path itself
+                self.found_path_set.remove(search_from)
+                del self.type_dict[search_from]
+
+                logging.debug(f"Sorting out unnecessary files took {perf_counter() - keep_time} sec.")
+
+        # If there is no newer cache file
+        else:
+            self.used_cache = False
+
+            # Going through every file and every folder using the os.walk() method
+            # Saving every file to found_path_set and the type (file or folder) to type_dict
+            for (roots, dirs, files) in os.walk(search_from):
+                for file in files:
+                    # Saving types to the dictionaries
+                    self.type_dict[os.path.join(roots, file)] = "file"
+                    # Saving the path to a set for fast access
+                    self.found_path_set.add(os.path.join(roots, file))
+
+                for directory in dirs:
+                    # Saving types to the dictionaries
+                    self.type_dict[os.path.join(roots, directory)] = "folder"
+                    # Saving the path to a set for fast access
+                    self.found_path_set.add(os.path.join(roots, directory))
+
+    # The filters in the order they are applied, as the name of the stage and a function,
+    # which returns True if a file matches, the function is None if the filter isn't used
+    def get_filters(self) -> list:
+        query = self.query
+        type_dict = self.type_dict
+        stats = self.stats
+
+        # Lower Arguments to remove case sensitivity
+        name = query.name.lower()
+        name_contains = query.name_contains.lower()
+        file_extension = query.file_extension.lower()
+
+        '''
+        There are multiple possibilities in unicode on how to display some characters (for example ä, ü, ö).
+        A decomposed form NFD (normal form D) ä = a + ¨
+        and a composed one NFC (normal form C) ä = ä
+        On macos the filesystem returns the names for files created locally as NFD while everyone else does NFC.
+        It is possible to place NFC characters in macOS file names. But not for a normal user.
+
+        If you have problems on macOS with composed/decomposed unicode character remove the four lines of code below.
+        '''
+
+        # Normalising arguments (see above)
+        if platform == "darwin":
+            name = normalize("NFD", name)
+            name_contains = normalize("NFD", name_contains)
+            file_extension = normalize("NFD", file_extension)
+
+        filters = []
+
+        # Name
+        if name != "":
+            filters.append(("indexing_name", lambda file: fnmatch(os.path.basename(file).lower(), name)))
+        else:
+            filters.append(("indexing_name", None))
+
+        # Name contains
+        if name_contains != "":
+            filters.append(("indexing_name_contains", lambda file: name_contains in os.path.basename(file).lower()))
+        else:
+            filters.append(("indexing_name_contains", None))
+
+        # Filetype
+        if file_extension != "":
+            filters.append(("indexing_file_extension", lambda file: file.lower().endswith(f".{file_extension}")))
+        else:
+            filters.append(("indexing_file_extension", None))
+
+        # Search in System Files
+        if not query.hidden_files:
+            filters.append(("indexing_system_files",
+                            lambda file: not ("/Library" in file or file.startswith("/System"))))
+        else:
+            filters.append(("indexing_system_files", None))
+
+        # Exclude or Include Folders or Files
+        if query.search_for == "only Files":
+            filters.append(("indexing_files_folders", lambda file: type_dict[file] == "file"))
+        elif query.search_for == "only Folders":
+            filters.append(("indexing_files_folders", lambda file: type_dict[file] == "folder"))
+        else:
+            filters.append(("indexing_files_folders", None))
+
+        # File groups, needing two tuples because of "other",
+        # when it's activated all files, which are not in a disallowed group are kept,
+        # else all files, which are in an allowed group, because "other" is everything else, which isn't in a group
+        if set(query.file_types) != set(FF_Files.FILE_FORMATS.keys()):
+            allowed_endings = set()
+            disallowed_endings = set()
+            for file_group, file_endings in FF_Files.FILE_FORMATS.items():
+                if file_group in query.file_types:
+                    allowed_endings.update(file_endings)
+                else:
+                    disallowed_endings.update(file_endings)
+
+            if "*" in allowed_endings:
+                disallowed_endings = tuple(f".{file_ending}" for file_ending in disallowed_endings)
+                filters.append(("indexing_file_groups", lambda file: not file.lower().endswith(disallowed_endings)))
+            else:
+                allowed_endings = tuple(f".{file_ending}" for file_ending in allowed_endings)
+                filters.append(("indexing_file_groups", lambda file: file.lower().endswith(allowed_endings)))
+        else:
+            filters.append(("indexing_file_groups", None))
+
+        # Filter some unnecessary System Files
+        filters.append(("indexing_dump_files", lambda file: os.path.basename(file).lower() not in DUMP_FILES))
+
+        # Excluded Files, only if one of them is in the search scope
+        excluded_files = tuple(excluded_file for excluded_file in query.excluded_files
+                               if excluded_file.startswith(query.directory))
+        if excluded_files:
+            filters.append(("indexing_excluded", lambda file: not file.startswith(excluded_files)))
+        else:
+            filters.append(("indexing_excluded", None))
+
+        # Date Created
+        # On Windows and Linux
+        # (On Linux this currently returns the modification date,
+        # because it's impossible to access with pure python)
+        if query.c_date is not None and platform in ("win32", "cygwin", "linux", "darwin"):
+            c_date_from, c_date_to = query.c_date
+
+            def c_date_filter(file):
+                stats.stat_calls += 1
+                try:
+                    # On Mac using os.stat because os.path.getctime returns a wrong date
+                    if platform == "darwin":
+                        file_c_time = os.stat(file).st_birthtime
+                    else:
+                        file_c_time = os.path.getctime(file)
+                except FileNotFoundError:
+                    return False
+                return c_date_from <= file_c_time <= c_date_to
+
+            filters.append(("indexing_c_date", c_date_filter))
+        else:
+            # If platform is unknown
+            if query.c_date is not None:
+                logging.error(f"While trying to filter by date created, unrecognised platform: {platform}")
+            filters.append(("indexing_c_date", None))
+
+        # Date Modified
+        if query.m_date is not None:
+            m_date_from, m_date_to = query.m_date
+
+            def m_date_filter(file):
+                stats.stat_calls += 1
+                try:
+                    file_m_time = os.path.getmtime(file)
+                except OSError:
+                    return False
+                return m_date_from <= file_m_time <= m_date_to
+
+            filters.append(("indexing_m_date", m_date_filter))
+        else:
+            filters.append(("indexing_m_date", None))
+
+        # File Size
+        if query.size is not None:
+            size_min, size_max = query.size
+
+            # Folders are counted as one stat call, although every file in them is tested
+            def size_filter(file):
+                stats.stat_calls += 1
+                return size_max >= FF_Files.get_file_size(file) >= size_min
+
+            filters.append(("indexing_file_size", size_filter))
+        else:
+            filters.append(("indexing_file_size", None))
+
+        # File contains
+        if query.file_contains != "":
+            file_contains = query.file_contains
+
+            def file_contains_filter(file):
+                try:
+                    # Opening every file in read mode
+                    with open(file) as opened_content_file:
+                        try:
+                            for line in opened_content_file:
+                                if file_contains in line:
+                                    break
+                            else:
+                                return False
+                        finally:
+                            # Bytes read from the file, including what was buffered after the line
+                            stats.bytes_read += opened_content_file.buffer.raw.tell()
+                except (UnicodeDecodeError, OSError):
+                    return False
+                stats.stat_calls += 1
+                return not os.path.isdir(file)
+
+            filters.append(("indexing_file_content", file_contains_filter))
+        else:
+            filters.append(("indexing_file_content", None))
+
+        return filters
+
+    # Sorting the results
+    def sort(self, found_path_list: list[str]) -> list[str]:
+        sort_by = self.query.sort_by
+        reverse_sort = self.query.reverse_sort
+
+        if sort_by == "File Name":
+            logging.info("Sorting list by name...")
+            self.report("sorting_name")
+            found_path_list.sort(key=Sort.name, reverse=reverse_sort)
+
+        elif sort_by == "File Size":
+            logging.info("Sorting list by size...")
+            self.report("sorting_size")
+            self.stats.stat_calls += len(found_path_list)
+            found_path_list.sort(key=Sort.size, reverse=not reverse_sort)
+
+        elif sort_by == "Date Created":
+            logging.info(f"Sorting list by creation date on {platform}...")
+            self.report("sorting_c_date")
+            self.stats.stat_calls += len(found_path_list)
+
+            # On Windows and Linux
+            # (On Linux this currently returns the modification date,
+            # because it's impossible to access with pure python)
+            if platform == "win32" or platform == 'cygwin' or platform == "linux":
+                found_path_list.sort(key=Sort.c_date_win, reverse=not reverse_sort)
+
+            # On Mac
+            if platform == "darwin":
+                found_path_list.sort(key=Sort.c_date_mac, reverse=not reverse_sort)
+
+        elif sort_by == "Date Modified":
+            logging.info("Sorting list by modification date...")
+            self.report("sorting_m_date")
+            self.stats.stat_calls += len(found_path_list)
+            found_path_list.sort(key=Sort.m_date, reverse=not reverse_sort)
+
+        elif sort_by == "Path":
+            logging.info("Sorting list by path...")
+            self.report("sorting_path")
+            found_path_list.sort(key=lambda sort_file: sort_file.lower(), reverse=reverse_sort)
+
+        else:
+            logging.info("Skipping Sorting")
+            if reverse_sort:
+                logging.debug("Reversing Results...")
+                self.report("sorting_reversed")
+                found_path_list.reverse()
+
+        return found_path_list
+
+    # Caching the scanned files with json,
+    # if the cache file doesn't exist or isn't from the exact directory
+    def write_cache(self):
+        search_from = self.query.directory
+
+        if self.used_cache and self.cache_file == FF_Files.path_to_cache_file(search_from):
+            logging.info("Cache file already exist, skipping caching...")
+            return
+
+        # Debug and status
+        logging.info("Caching Search Results...")
+        self.report("caching")
+
+        # Creating file
+        with open(FF_Files.path_to_cache_file(search_from), "w") as result_file:
+            # Dumping with json
+            dump({
+                "found_path_set": list(self.found_path_set),
+                "type_dict": self.type_dict}, result_file)
+
+        # Saving the cache creation time in a separate file for faster access
+        with open(FF_Files.path_to_cache_file(search_from, True), "w") as time_write_file:
+            if self.used_cache:
+                # Determining the number of parent directories by counting the default separators in the path
+                # and then adding this value to the c_Time so the more specified cache gets used rather than
+                # the broader cache which was created at the same time. Dividing by 10 so to only add fractions of
+                # a seconds to the c_time as to not get ranked over newer caches.
+                # Doing this so the already specialized cache gets used preferably
+                c_time_adjust = search_from.count(os.sep) / 10
+                logging.debug(f"Cache time {self.cache_file_c_date} + adjuster: {c_time_adjust} "
+                              f"= {self.cache_file_c_date + c_time_adjust}")
+
+                # Used old cache, use old time
+                dump({"c_time": self.cache_file_c_date + c_time_adjust,
+                      "cache_version": FF_Files.FF_CACHE_VERSION,
+                      "original_cache_file": self.cache_file}, time_write_file)
+
+            else:
+                logging.debug("Created brand new cache..")
+                # New cache created
+                dump({"c_time": time.time(),
+                      "cache_version": FF_Files.FF_CACHE_VERSION,
+                      "original_cache_file": FF_Files.path_to_cache_file(search_from)}, time_write_file)
+                self.cache_file = FF_Files.path_to_cache_file(search_from)
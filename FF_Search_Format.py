@@ -0,0 +1,318 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the code for reading and writing saved searches (.FFSearch) in version 3
+#
+# A saved search starts with SEARCH_MAGIC and a line with a JSON header (root, filters, counts, timings).
+# After that the found paths, sorted so two searches can be compared block by block (see FF_Compare_Engine),
+# the position every path had in the search (which can be sorted by size or date)
+# and the modification times of their folders are stored in blocks,
+# every block starts with its kind, its number of entries and its size and is compressed with zlib.
+# Paths are front-coded: only the length of the prefix shared with the previous path of the block and the rest
+# are stored, so a block can be decoded without the blocks before it.
+# Older versions were a single JSON object, they are still read by FF_Search.LoadSearch
+
+# Imports
+import os
+import zlib
+from json import dumps, loads
+
+# Projects Libraries
+import FF_Files
+
+# First line of a saved search in version 3, older versions start with "{"
+SEARCH_MAGIC = b"FFSearch\n"
+# Number of entries in a block
+BLOCK_ENTRIES = 4096
+# Kinds of blocks
+PATHS_BLOCK = b"P"
+ORDER_BLOCK = b"O"
+FOLDER_MTIMES_BLOCK = b"D"
+
+# Flags of a path entry
+FOLDER_FLAG = 1
+MARKED_FLAG = 2
+# The entry has a size and a modification time
+SIZE_FLAG = 4
+# The entry has a device and an inode
+INODE_FLAG = 8
+
+
+# Testing if a saved search is in version 3
+def is_search_format(save_file: str) -> bool:
+    with open(save_file, "rb") as search_file:
+        return search_file.read(len(SEARCH_MAGIC)) == SEARCH_MAGIC
+
+
+# Appending a number as varint, 7 bits per byte and the highest bit is set if more bytes follow
+def write_varint(buffer: bytearray, number: int):
+    while number > 0x7f:
+        buffer.append((number & 0x7f) | 0x80)
+        number >>= 7
+    buffer.append(number)
+
+
+# Reading a varint at position, returns the number and the position after it
+def read_varint(data: bytes, position: int) -> tuple[int, int]:
+    number = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        number |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return number, position
+        shift += 7
+
+
+# Modification times can be negative, so they are zigzag encoded (0, -1, 1, -2 -> 0, 1, 2, 3)
+def zigzag_encode(number: int) -> int:
+    return number * 2 if number >= 0 else -number * 2 - 1
+
+
+def zigzag_decode(number: int) -> int:
+    return number // 2 if not number & 1 else -(number + 1) // 2
+
+
+# Length of the prefix two byte strings share, computed with ints so the bytes aren't compared one by one
+def shared_prefix_length(first: bytes, second: bytes) -> int:
+    length = min(len(first), len(second))
+    difference = int.from_bytes(first[:length], "big") ^ int.from_bytes(second[:length], "big")
+    if difference == 0:
+        return length
+    return length - (difference.bit_length() + 7) // 8
+
+
+# Paths are stored as UTF-8, file names which aren't valid UTF-8 are kept with surrogateescape
+def encode_path(path: str) -> bytes:
+    return path.encode("utf-8", "surrogateescape")
+
+
+def decode_path(path: bytes) -> str:
+    return path.decode("utf-8", "surrogateescape")
+
+
+# Writing a compressed block
+def write_block(search_file, kind: bytes, entry_count: int, buffer: bytearray):
+    compressed_block = zlib.compress(buffer)
+    search_file.write(kind + entry_count.to_bytes(4, "big") + len(compressed_block).to_bytes(4, "big"))
+    search_file.write(compressed_block)
+
+
+# Writing a saved search, snapshot_metadata is a list like from FF_Files.get_snapshot_metadata(),
+# type_dict has the types of the search ("file" or "folder"), paths without a type are folders if they have no size
+def write_search(save_file: str, root: str, matched_list: list[str], snapshot_metadata: list,
+                 marked_files, folder_mtimes: dict[str, int], created: float, filters=None, timings=None,
+                 type_dict: dict[str, str] | None = None):
+    marked_files = set(marked_files)
+
+    header = {"VERSION": FF_Files.FF_SEARCH_VERSION,
+              "root": root,
+              "filters": filters,
+              "counts": {"matched": len(matched_list),
+                         "marked": len(marked_files),
+                         "folders": len(folder_mtimes)},
+              "timings": timings,
+              "created": created,
+              # Saves before weren't sorted
+              "sorted": True}
+
+    # Sorting the paths, the metadata is in the same order as the paths
+    sorted_indexes = sorted(range(len(matched_list)), key=matched_list.__getitem__)
+
+    with open(save_file, "wb") as search_file:
+        search_file.write(SEARCH_MAGIC)
+        search_file.write(dumps(header).encode() + b"\n")
+
+        # Found paths with their type and metadata
+        for block_start in range(0, len(matched_list), BLOCK_ENTRIES):
+            buffer = bytearray()
+            previous_path = b""
+            block_indexes = sorted_indexes[block_start:block_start + BLOCK_ENTRIES]
+            block_paths = [matched_list[path_index] for path_index in block_indexes]
+            block_metadata = [snapshot_metadata[path_index] for path_index in block_indexes]
+
+            for path, path_metadata in zip(block_paths, block_metadata):
+                encoded_path = encode_path(path)
+                prefix_length = shared_prefix_length(previous_path, encoded_path)
+                write_varint(buffer, prefix_length)
+                write_varint(buffer, len(encoded_path) - prefix_length)
+                buffer += encoded_path[prefix_length:]
+                previous_path = encoded_path
+
+                flags = 0
+                if path in marked_files:
+                    flags |= MARKED_FLAG
+                # Links to folders are folders in the type_dict, like when searching,
+                # folders have no size and modification time in the metadata
+                if type_dict is not None and path in type_dict:
+                    if type_dict[path] == "folder":
+                        flags |= FOLDER_FLAG
+                elif path_metadata is not None and path_metadata[0] is None:
+                    flags |= FOLDER_FLAG
+                if path_metadata is not None:
+                    flags |= INODE_FLAG
+                    if path_metadata[0] is not None:
+                        flags |= SIZE_FLAG
+                buffer.append(flags)
+
+                if flags & SIZE_FLAG:
+                    write_varint(buffer, path_metadata[0])
+                    write_varint(buffer, zigzag_encode(path_metadata[1]))
+                if flags & INODE_FLAG:
+                    write_varint(buffer, path_metadata[2])
+                    write_varint(buffer, path_metadata[3])
+
+            write_block(search_file, PATHS_BLOCK, len(block_paths), buffer)
+
+        # Position of every sorted path in the search, only if the search wasn't sorted by path
+        if sorted_indexes != list(range(len(matched_list))):
+            for block_start in range(0, len(sorted_indexes), BLOCK_ENTRIES):
+                buffer = bytearray()
+                block_indexes = sorted_indexes[block_start:block_start + BLOCK_ENTRIES]
+                for path_index in block_indexes:
+                    write_varint(buffer, path_index)
+                write_block(search_file, ORDER_BLOCK, len(block_indexes), buffer)
+
+        # Modification times of the folders
+        folders = sorted(folder_mtimes)
+        for block_start in range(0, len(folders), BLOCK_ENTRIES):
+            buffer = bytearray()
+            previous_path = b""
+            block_folders = folders[block_start:block_start + BLOCK_ENTRIES]
+
+            for folder in block_folders:
+                encoded_path = encode_path(folder)
+                prefix_length = shared_prefix_length(previous_path, encoded_path)
+                write_varint(buffer, prefix_length)
+                write_varint(buffer, len(encoded_path) - prefix_length)
+                buffer += encoded_path[prefix_length:]
+                previous_path = encoded_path
+                write_varint(buffer, zigzag_encode(folder_mtimes[folder]))
+
+            write_block(search_file, FOLDER_MTIMES_BLOCK, len(block_folders), buffer)
+
+
+# Reading the header of a saved search, without reading any paths
+def read_search_header(save_file: str) -> dict:
+    with open(save_file, "rb") as search_file:
+        search_file.read(len(SEARCH_MAGIC))
+        return loads(search_file.readline())
+
+
+# Reading the blocks of a kind one after the other, yields the number of entries and the decompressed data
+def iter_blocks(save_file: str, kind: bytes):
+    with open(save_file, "rb") as search_file:
+        # Skipping the magic and the header
+        search_file.read(len(SEARCH_MAGIC))
+        search_file.readline()
+
+        while True:
+            block_header = search_file.read(9)
+            if len(block_header) < 9:
+                return
+            block_size = int.from_bytes(block_header[5:9], "big")
+            # Blocks of another kind are skipped without decompressing them
+            if block_header[:1] != kind:
+                search_file.seek(block_size, os.SEEK_CUR)
+                continue
+            yield int.from_bytes(block_header[1:5], "big"), zlib.decompress(search_file.read(block_size))
+
+
+# Reading the found paths lazily, yields the path, the flags and the metadata (or None) of every entry
+def iter_search_entries(save_file: str):
+    for entry_count, data in iter_blocks(save_file, PATHS_BLOCK):
+        position = 0
+        previous_path = b""
+        for _entry in range(entry_count):
+            prefix_length, position = read_varint(data, position)
+            suffix_length, position = read_varint(data, position)
+            encoded_path = previous_path[:prefix_length] + data[position:position + suffix_length]
+            position += suffix_length
+            previous_path = encoded_path
+
+            flags = data[position]
+            position += 1
+            size = mtime = device = inode = None
+            if flags & SIZE_FLAG:
+                size, position = read_varint(data, position)
+                mtime, position = read_varint(data, position)
+                mtime = zigzag_decode(mtime)
+            if flags & INODE_FLAG:
+                device, position = read_varint(data, position)
+                inode, position = read_varint(data, position)
+                path_metadata = [size, mtime, device, inode]
+            else:
+                path_metadata = None
+
+            yield decode_path(encoded_path), flags, path_metadata
+
+
+# Reading the position every path had in the search, in the order the paths are stored.
+# Empty if the search was sorted by path or was saved before the positions were stored
+def read_search_order(save_file: str) -> list[int]:
+    search_order = []
+    for entry_count, data in iter_blocks(save_file, ORDER_BLOCK):
+        position = 0
+        for _entry in range(entry_count):
+            path_index, position = read_varint(data, position)
+            search_order.append(path_index)
+    return search_order
+
+
+# Reading the modification times of the folders
+def read_folder_mtimes(save_file: str) -> dict[str, int]:
+    folder_mtimes = {}
+    for entry_count, data in iter_blocks(save_file, FOLDER_MTIMES_BLOCK):
+        position = 0
+        previous_path = b""
+        for _entry in range(entry_count):
+            prefix_length, position = read_varint(data, position)
+            suffix_length, position = read_varint(data, position)
+            encoded_path = previous_path[:prefix_length] + data[position:position + suffix_length]
+            position += suffix_length
+            previous_path = encoded_path
+
+            mtime, position = read_varint(data, position)
+            folder_mtimes[decode_path(encoded_path)] = zigzag_decode(mtime)
+    return folder_mtimes
+
+
+# Reading a saved search completely in the order of the search, returns the same keys as the older versions had,
+# and a type_dict with the stored types, so no path has to be tested
+def read_search(save_file: str) -> dict:
+    header = read_search_header(save_file)
+
+    search_entries = list(iter_search_entries(save_file))
+    # The paths are stored sorted, restoring the order of the search (like sorted by size)
+    search_order = read_search_order(save_file)
+    if search_order:
+        ordered_entries = [None] * len(search_entries)
+        for search_entry, path_index in zip(search_entries, search_order):
+            ordered_entries[path_index] = search_entry
+        search_entries = ordered_entries
+
+    matched_list = []
+    marked_files = []
+    metadata = []
+    type_dict = {}
+    for path, flags, path_metadata in search_entries:
+        matched_list.append(path)
+        metadata.append(path_metadata)
+        type_dict[path] = "folder" if flags & FOLDER_FLAG else "file"
+        if flags & MARKED_FLAG:
+            marked_files.append(path)
+
+    return {"VERSION": header["VERSION"],
+            "header": header,
+            "matched_list": matched_list,
+            "marked_files": marked_files,
+            "metadata": metadata,
+            "type_dict": type_dict,
+            "folder_mtimes": read_folder_mtimes(save_file),
+            "created": header["created"]}
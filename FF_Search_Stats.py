@@ -0,0 +1,123 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the per-stage instrumentation of searches
+#
+# Every stage of a search (scanning, every used filter, sorting, caching and building the UI) is saved as a dict with
+# its wall time, its CPU time, the number of entries before and after it, the number of stat calls, the bytes read
+# and if the cache was used. The stats are plain dicts, so they can be sent by the daemon and saved in searches.
+# They can be exported as JSON or in the Chrome trace format, which can be opened in chrome://tracing or Perfetto
+
+# Imports
+import os
+from contextlib import contextmanager
+from json import dump
+from time import perf_counter, thread_time, time
+
+# Version of the exported stats
+FF_SEARCH_STATS_VERSION = 1
+# Files ending with this are exported in the Chrome trace format, every other file as JSON
+CHROME_TRACE_SUFFIX = ".trace.json"
+
+
+# Collecting the stats of every stage of one search.
+# Filters add to stat_calls and bytes_read, the difference while a stage runs is saved to the stage
+class SearchStats:
+    def __init__(self):
+        self.stages = []
+        self.created = time()
+        self.time_start = perf_counter()
+        self.stat_calls = 0
+        self.bytes_read = 0
+
+    # Measuring a stage, yields the dict of the stage, so entries_out and cache can be set while running
+    @contextmanager
+    def stage(self, name: str, entries_in: int | None = None):
+        stage = new_stage(name, perf_counter() - self.time_start, entries_in)
+        stat_calls_before = self.stat_calls
+        bytes_read_before = self.bytes_read
+        wall_start = perf_counter()
+        cpu_start = thread_time()
+        try:
+            yield stage
+        finally:
+            stage["wall"] = perf_counter() - wall_start
+            stage["cpu"] = thread_time() - cpu_start
+            stage["stat_calls"] += self.stat_calls - stat_calls_before
+            stage["bytes_read"] += self.bytes_read - bytes_read_before
+            self.stages.append(stage)
+
+    def as_dict(self) -> dict:
+        return {"VERSION": FF_SEARCH_STATS_VERSION,
+                "created": self.created,
+                "stages": self.stages}
+
+
+# A stage, start is the number of seconds after the search started
+def new_stage(name: str, start: float, entries_in: int | None = None) -> dict:
+    return {"name": name,
+            "start": start,
+            "wall": 0.0,
+            "cpu": 0.0,
+            "entries_in": entries_in,
+            "entries_out": None,
+            "stat_calls": 0,
+            "bytes_read": 0,
+            "cache": None}
+
+
+# Adding a stage that was measured somewhere else, like building the UI, after the other stages
+def add_stage(stats: dict, name: str, wall: float, cpu: float = 0.0, entries_in: int | None = None,
+              entries_out: int | None = None):
+    if stats["stages"]:
+        start = stats["stages"][-1]["start"] + stats["stages"][-1]["wall"]
+    else:
+        start = 0.0
+    stage = new_stage(name, start, entries_in)
+    stage.update(wall=wall, cpu=cpu, entries_out=entries_out)
+    stats["stages"].append(stage)
+
+
+# The stats as a table for the time stats and the command line
+def format_stats(stats: dict) -> str:
+    lines = [f"{'Stage':<24} {'Wall':>9} {'CPU':>9} {'In':>9} {'Out':>9} {'stat()':>8} {'Read':>10} Cache"]
+    for stage in stats["stages"]:
+        lines.append(f"{stage['name']:<24} "
+                     f"{round(stage['wall'] * 1000, 1):>7}ms "
+                     f"{round(stage['cpu'] * 1000, 1):>7}ms "
+                     f"{'' if stage['entries_in'] is None else stage['entries_in']:>9} "
+                     f"{'' if stage['entries_out'] is None else stage['entries_out']:>9} "
+                     f"{stage['stat_calls']:>8} "
+                     f"{stage['bytes_read']:>10} "
+                     f"{stage['cache'] or ''}")
+    return "\n".join(lines)
+
+
+# Converting the stats to the Chrome trace format, every stage is a complete event ("X") in microseconds
+def to_chrome_trace(stats: dict) -> dict:
+    return {"traceEvents": [{"name": stage["name"],
+                             "cat": "search",
+                             "ph": "X",
+                             "ts": stage["start"] * 1000000,
+                             "dur": stage["wall"] * 1000000,
+                             "pid": os.getpid(),
+                             "tid": 0,
+                             "args": {key: value for key, value in stage.items()
+                                      if key not in ("name", "start", "wall")}}
+                            for stage in stats["stages"]],
+            "displayTimeUnit": "ms",
+            "otherData": {"VERSION": stats["VERSION"], "created": stats["created"]}}
+
+
+# Exporting the stats, as a Chrome trace if the file ends with CHROME_TRACE_SUFFIX else as JSON
+def export_stats(stats: dict, export_file: str):
+    with open(export_file, "w") as stats_file:
+        if export_file.endswith(CHROME_TRACE_SUFFIX):
+            dump(to_chrome_trace(stats), stats_file)
+        else:
+            dump(stats, stats_file, indent=2)
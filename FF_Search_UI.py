@@ -11,13 +11,13 @@
 # Imports
 import logging
 import os
-from json import dump, load
+from json import load
 from time import perf_counter, ctime, time
 
 # PySide6 Gui Imports
-from PySide6.QtCore import QSize, Qt, QTimer
+from PySide6.QtCore import QObject, QSize, Qt, QThreadPool, QTimer, Signal
 from PySide6.QtGui import QFont, QIcon
-from PySide6.QtWidgets import QMainWindow, QLabel, QPushButton, QFileDialog, \
+from PySide6.QtWidgets import QAbstractItemView, QMainWindow, QLabel, QPushButton, QFileDialog, \
     QListWidget, QMenu, QWidget, QGridLayout, QHBoxLayout, QScrollArea
 
 # Projects Libraries
@@ -27,15 +27,20 @@ import FF_Duplicated
 import FF_Files
 import FF_Main_UI
 import FF_Menubar
+import FF_Search_Engine
+import FF_Search_Format
+import FF_Search_Stats
 
 
 class SearchWindow:
-    def __init__(self, time_dict, matched_list, search_path, cache_file_path, parent):
+    def __init__(self, time_dict, matched_list, search_path, cache_file_path, parent, filters=None):
         # Debug
         logging.info("Setting up Search UI...")
 
         # Setting search_path and matched_list to a local variable
         self.search_path = search_path
+        # Filters of the search, only known for new searches and searches saved since version 3
+        self.filters = filters
         self.matched_list = matched_list.copy()
         del matched_list
 
@@ -98,6 +103,8 @@ class SearchWindow:
         self.result_area = QScrollArea(self.Search_Results_Window)
         # List widget for displaying all found files
         self.result_listbox = QListWidget(self.Search_Results_Window)
+        # Multiple files can be selected with Shift or Ctrl/Cmd
+        self.result_listbox.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         # Place
         self.Search_Results_Layout.addWidget(self.result_area, 1, 0, 9, 6)
         # Place the Listbox in the area
@@ -118,6 +125,12 @@ class SearchWindow:
 
             search_opened_time = ctime(self.search_opened_time)
 
+            # Stats of every stage, searches saved before they existed have none
+            if time_dict.get("stats"):
+                stage_stats = f"Stages:\n{FF_Search_Stats.format_stats(time_dict['stats'])}\n\n\n"
+            else:
+                stage_stats = ""
+
             # Displaying infobox with time info
             FF_Additional_UI.PopUps.show_info_messagebox(
                 "Time Stats",
@@ -128,12 +141,45 @@ class SearchWindow:
                 f"Creating UI: {round(time_dict['time_building'], 3)}s\n"
                 "---------\n"
                 f"Total: {round(time_dict['time_total'] + time_dict['time_building'], 3)}s\n\n\n"
-                ""
+                f"{stage_stats}"
                 "Timestamps:\n"
                 f"Cache (basis for search results) created:\n{cache_created_time}\n"
                 f"Search opened:\n{search_opened_time}",
                 self.Search_Results_Window, large=True)
 
+        # Export the stats of every stage as JSON or as a Chrome trace
+        def export_stats():
+            if not time_dict.get("stats"):
+                FF_Additional_UI.PopUps.show_critical_messagebox(
+                    "No Stats!", "This search has no stats, because it was saved with an older version.",
+                    self.Search_Results_Window)
+                return
+
+            export_dialog = QFileDialog.getSaveFileName(
+                self.Search_Results_Window, "Export Search Stats", FF_Files.USER_FOLDER,
+                f"JSON (*.json);;Chrome Trace (*{FF_Search_Stats.CHROME_TRACE_SUFFIX})")
+            # Debug
+            logging.debug(f"Asked for storage place of stats. Got: {export_dialog}")
+
+            if export_dialog[0] == "":
+                return
+
+            export_file = os.path.normpath(export_dialog[0])
+            # If the suffix wasn't added, add it
+            if "Chrome" in export_dialog[1] and not export_file.endswith(FF_Search_Stats.CHROME_TRACE_SUFFIX):
+                export_file = export_file.removesuffix(".json") + FF_Search_Stats.CHROME_TRACE_SUFFIX
+            elif not export_file.endswith(".json"):
+                export_file += ".json"
+
+            try:
+                FF_Search_Stats.export_stats(time_dict["stats"], export_file)
+            except OSError as export_error:
+                # Debug
+                logging.error(f"Couldn't export the stats to {export_file}: {export_error}")
+                FF_Additional_UI.PopUps.show_critical_messagebox(
+                    "Export Error!", f"Couldn't export the stats to:\n{export_file}\n\n{export_error}",
+                    self.Search_Results_Window)
+
         # Save Search
         def save_search():
             save_dialog = QFileDialog.getSaveFileName(self.Search_Results_Window, "Export File Find Search",
@@ -160,11 +206,70 @@ class SearchWindow:
                     for save_file in self.matched_list:
                         export_file.write(save_file + "\n")
             elif save_file.endswith(".FFSearch") and not os.path.exists(save_file):
-                with open(save_file, "w") as export_file:
-                    dump(
-                        {"VERSION": FF_Files.FF_SEARCH_VERSION,
-                         "matched_list": self.matched_list,
-                         "marked_files": menu_bar.marked_files}, export_file)
+                # Copies, because files can be removed from the results or (un)marked while saving
+                saved_list = self.matched_list.copy()
+                marked_files = menu_bar.marked_files.copy()
+                # Loaded searches have the saved search as search path, the folder searched in is in the filters
+                root = self.filters["directory"] if self.filters else self.search_path
+
+                class SaveSignals(QObject):
+                    finished = Signal()
+                    failed = Signal(str)
+
+                save_signals = SaveSignals()
+                save_signals.finished.connect(lambda: FF_Additional_UI.PopUps.show_info_messagebox(
+                    "Search saved", f"Saved {len(saved_list)} files to:\n{save_file}", self.Search_Results_Window))
+                save_signals.failed.connect(lambda save_error: FF_Additional_UI.PopUps.show_critical_messagebox(
+                    "Save Error!", f"Couldn't save the search to:\n{save_file}\n\n{save_error}",
+                    self.Search_Results_Window))
+
+                # Every file and folder is read from disk, so this runs in a separate thread
+                def write_search():
+                    try:
+                        # Size, modification time and inode, so searches can be compared as snapshots
+                        snapshot_time = time()
+                        snapshot_metadata = FF_Files.get_snapshot_metadata(saved_list)
+
+                        # The types of the search and the folders it looked at, from its cache,
+                        # so they don't have to be tested or listed again
+                        try:
+                            with open(cache_file_path) as cache_file:
+                                type_dict = load(cache_file)["type_dict"]
+                        except (OSError, ValueError, KeyError) as cache_error:
+                            # Debug
+                            logging.warning(f"Couldn't read the types of the search from the cache: {cache_error}")
+                            type_dict = {}
+                        searched_folders = []
+                        if self.filters:
+                            searched_folders = FF_Search_Engine.SearchEngine(
+                                FF_Search_Engine.SearchQuery.from_dict(self.filters)).get_searched_folders(type_dict)
+
+                        FF_Search_Format.write_search(
+                            save_file,
+                            root=root,
+                            matched_list=saved_list,
+                            snapshot_metadata=snapshot_metadata,
+                            marked_files=marked_files,
+                            # Modification times of the folders the search looked at,
+                            # to only list changed folders when comparing to now
+                            folder_mtimes=FF_Files.get_folder_mtimes(saved_list, snapshot_metadata, searched_folders),
+                            created=snapshot_time,
+                            filters=self.filters,
+                            type_dict=type_dict,
+                            timings={time_name: time_dict[time_name] for time_name in
+                                     ("time_searching", "time_indexing", "time_sorting", "time_building", "time_total",
+                                      "stats")
+                                     if time_name in time_dict})
+                    except OSError as save_error:
+                        # Debug
+                        logging.error(f"Couldn't save the search to {save_file}: {save_error}")
+                        save_signals.failed.emit(str(save_error))
+                    else:
+                        # Debug
+                        logging.info(f"Saved the search to {save_file}")
+                        save_signals.finished.emit()
+
+                QThreadPool(self.Search_Results_Window).start(write_search)
 
         # Building Menu-bar
         menu_bar = FF_Menubar.MenuBar(
@@ -236,6 +341,9 @@ class SearchWindow:
         # Save Action
         options_menu_save_action = options_menu.addAction("&Save Search")
         options_menu_save_action.triggered.connect(save_search)
+        # Export Stats Action
+        options_menu_export_stats_action = options_menu.addAction("&Export Search Stats...")
+        options_menu_export_stats_action.triggered.connect(export_stats)
         # Separator
         options_menu.addSeparator()
         # Compare Action
@@ -350,6 +458,10 @@ class SearchWindow:
             time_dict["time_building"] = perf_counter() - time_dict['time_before_building']
 
             time_dict["time_total"] = time_dict["time_total"] + time_dict["time_building"]
+            # Adding building the UI as the last stage, searches which were loaded already have it
+            if time_dict.get("stats") and time_dict["stats"]["stages"][-1]["name"] != "building_ui":
+                FF_Search_Stats.add_stage(time_dict["stats"], "building_ui", time_dict["time_building"],
+                                          entries_in=len(self.matched_list), entries_out=len(self.matched_list))
 
             # Debug
             logging.info("\nSeconds needed:\n"
@@ -18,13 +18,14 @@ import sys
 # PySide6 Gui Imports
 from PySide6.QtGui import QFont, Qt
 from PySide6.QtWidgets import QMainWindow, QLabel, QPushButton, QListWidget, QFileDialog, QComboBox, \
-    QMessageBox, QCheckBox, QWidget, QGridLayout, QSizePolicy, QSpacerItem, QLineEdit
+    QMessageBox, QCheckBox, QWidget, QGridLayout, QSizePolicy, QSpacerItem, QLineEdit, QSpinBox
 
 # Projects Libraries
 import FF_Additional_UI
 import FF_Files
-import FF_Main_UI
+import FF_Hashing
 import FF_Menubar
+import FF_Settings_Store
 
 
 # The class for the help window
@@ -72,7 +73,7 @@ class SettingsWindow:
         self.Central_Widget.setLayout(self.Settings_Layout)
 
         # # Spacer for prettier ui
-        self.Settings_Layout.addItem(QSpacerItem(10, 30, hData=QSizePolicy.Policy.Maximum), 8, 0)
+        self.Settings_Layout.addItem(QSpacerItem(10, 30, hData=QSizePolicy.Policy.Maximum), 10, 0)
 
         # Excluded Files
         # Define the Label
@@ -80,7 +81,7 @@ class SettingsWindow:
         # Change Font
         exclude_label.setFont(QFont(FF_Files.DEFAULT_FONT, FF_Files.SMALLER_FONT_SIZE))
         # Display the Label
-        self.Settings_Layout.addWidget(exclude_label, 9, 0)
+        self.Settings_Layout.addWidget(exclude_label, 11, 0)
 
         def generate_button(text, command, width: int | None = 30):
             button = QPushButton(self.Settings_Window)
@@ -95,7 +96,7 @@ class SettingsWindow:
         # Resize the List-widget
         excluded_listbox.resize(200, 130)
         # Place
-        self.Settings_Layout.addWidget(excluded_listbox, 9, 1, 11, 3)
+        self.Settings_Layout.addWidget(excluded_listbox, 11, 1, 11, 3)
 
         # Load values
         for file in self.load_setting("excluded_files"):
@@ -142,14 +143,14 @@ class SettingsWindow:
                 remove_button.setDisabled(False)
 
         remove_button = generate_button("-", remove_file)
-        self.Settings_Layout.addWidget(remove_button, 11, 0, Qt.AlignmentFlag.AlignRight)
+        self.Settings_Layout.addWidget(remove_button, 13, 0, Qt.AlignmentFlag.AlignRight)
 
         # Disable button if there are no files
         if excluded_listbox.count() == 0:
             remove_button.setDisabled(True)
 
         add_button = generate_button("+", add_file)
-        self.Settings_Layout.addWidget(add_button, 12, 0, Qt.AlignmentFlag.AlignRight)
+        self.Settings_Layout.addWidget(add_button, 14, 0, Qt.AlignmentFlag.AlignRight)
 
         # Ask before deleting
         # Define the Label
@@ -166,19 +167,11 @@ class SettingsWindow:
 
         # Open Event
         def ask_delete_change():
-            # Saving the Settings and replacing the old settings with the new one
-            with open(os.path.join(FF_Files.FF_LIB_FOLDER, "Settings")) as read_file:
-                # Loading Settings
-                settings = load(read_file)
-
-            # Changing Settings
-            settings["popup"]["delete_question"] = ask_delete_checkbox.isChecked()
+            # Changing the popup setting
+            FF_Settings_Store.SETTINGS.set_popup("delete_question", ask_delete_checkbox.isChecked())
 
             logging.info(f"Changed PopUp Settings Delete Question:"
                          f" Ask before deleting {ask_delete_checkbox.isChecked()}")
-            # Dumping new Settings
-            with open(os.path.join(FF_Files.FF_LIB_FOLDER, "Settings"), "w") as write_file:
-                dump(settings, write_file)
 
         # Connecting the checkbox to the function above
         ask_delete_checkbox.toggled.connect(ask_delete_change)
@@ -202,8 +195,7 @@ class SettingsWindow:
         self.Settings_Layout.addWidget(filter_preset_label, 1, 0)
 
         # Input label for displaying file name
-        with open(os.path.join(FF_Files.FF_LIB_FOLDER, "Settings")) as settings_load_file:
-            filter_preset_name = load(settings_load_file)["filter_preset_name"]
+        filter_preset_name = self.load_setting("filter_preset_name")
 
         filter_line_edit = QLineEdit(self.Settings_Window)
         filter_line_edit.setText(filter_preset_name)
@@ -388,13 +380,7 @@ class SettingsWindow:
 
         # Open Event
         def menu_bar_icon_change():
-            # showing/hiding the icon
-            if menu_bar_icon_checkbox.isChecked():
-                FF_Main_UI.menu_bar_icon.show()
-            else:
-                FF_Main_UI.menu_bar_icon.hide()
-
-            # Update the setting
+            # Update the setting, the main window shows or hides the icon when it is changed
             self.update_setting("display_menu_bar_icon", menu_bar_icon_checkbox.isChecked())
 
         # Connecting the checkbox to the function above
@@ -409,39 +395,84 @@ class SettingsWindow:
         # Display
         self.Settings_Layout.addWidget(menu_bar_icon_checkbox, 6, 1)
 
+        # Hashing threads
+        # Define the Label
+        hashing_threads_label = QLabel("Threads for hashing files:", parent=self.Settings_Window)
+        # Change Font
+        hashing_threads_label.setFont(QFont(FF_Files.DEFAULT_FONT, FF_Files.SMALLER_FONT_SIZE))
+        # Display the Label
+        self.Settings_Layout.addWidget(hashing_threads_label, 7, 0)
+
+        # Spinbox
+        hashing_threads_spinbox = QSpinBox(self.Settings_Window)
+        hashing_threads_spinbox.setRange(1, 64)
+        hashing_threads_spinbox.setValue(self.load_setting("hashing_threads"))
+        hashing_threads_spinbox.setFixedWidth(80)
+        # When changed, update settings
+        hashing_threads_spinbox.valueChanged.connect(
+            lambda: self.update_setting(setting_key="hashing_threads", new_value=hashing_threads_spinbox.value()))
+
+        # Display
+        self.Settings_Layout.addWidget(hashing_threads_spinbox, 7, 1)
+
+        # Hash algorithm
+        # Define the Label
+        hashing_algorithm_label = QLabel("Hash algorithm for duplicated files:", parent=self.Settings_Window)
+        # Change Font
+        hashing_algorithm_label.setFont(QFont(FF_Files.DEFAULT_FONT, FF_Files.SMALLER_FONT_SIZE))
+        # Display the Label
+        self.Settings_Layout.addWidget(hashing_algorithm_label, 8, 0)
+
+        # Drop Down Menu
+        # Defining
+        combobox_hashing_algorithm = QComboBox(self.Settings_Window)
+        # Adding Options, xxHash is only available if installed
+        combobox_hashing_algorithm.addItems(list(FF_Hashing.HASH_ALGORITHMS))
+        combobox_hashing_algorithm.setCurrentText(self.load_setting("hashing_algorithm"))
+        # When changed, update settings
+        combobox_hashing_algorithm.currentTextChanged.connect(
+            lambda: self.update_setting(setting_key="hashing_algorithm",
+                                        new_value=combobox_hashing_algorithm.currentText()))
+
+        # Display
+        self.Settings_Layout.addWidget(combobox_hashing_algorithm, 8, 1)
+
+        # Buffer size for hashing
+        # Define the Label
+        hashing_buffer_label = QLabel("Buffer size for hashing files (KB):", parent=self.Settings_Window)
+        # Change Font
+        hashing_buffer_label.setFont(QFont(FF_Files.DEFAULT_FONT, FF_Files.SMALLER_FONT_SIZE))
+        # Display the Label
+        self.Settings_Layout.addWidget(hashing_buffer_label, 9, 0)
+
+        # Spinbox, the setting is saved in bytes
+        hashing_buffer_spinbox = QSpinBox(self.Settings_Window)
+        hashing_buffer_spinbox.setRange(4, 16384)
+        hashing_buffer_spinbox.setValue(self.load_setting("hashing_buffer_size") // 1024)
+        hashing_buffer_spinbox.setFixedWidth(80)
+        # When changed, update settings
+        hashing_buffer_spinbox.valueChanged.connect(
+            lambda: self.update_setting(setting_key="hashing_buffer_size",
+                                        new_value=hashing_buffer_spinbox.value() * 1024))
+
+        # Display
+        self.Settings_Layout.addWidget(hashing_buffer_spinbox, 9, 1)
+
         # Menu-bar
         FF_Menubar.MenuBar(self.Settings_Window, "settings", None, )
 
         # Debug
         logging.info("Finished Setting up Help UI\n")
 
-    # Updating settings when they are changed
+    # Updating settings when they are changed, they are saved by the settings store shortly after
     @staticmethod
     def update_setting(setting_key, new_value):
-        # loading the settings
-        with open(os.path.join(FF_Files.FF_LIB_FOLDER, "Settings")) as read_file:
-            # Loading Settings
-            settings = load(read_file)
-
-        # Changing Settings
-        settings[setting_key] = new_value
-
-        # Dumping new Settings
-        with open(os.path.join(FF_Files.FF_LIB_FOLDER, "Settings"), "w") as write_file:
-            dump(settings, write_file)
-
-        # Debug
-        logging.info(f"Changed {setting_key} setting to : {new_value}")
+        FF_Settings_Store.SETTINGS.set(setting_key, new_value)
 
     # Loading the value of setting, can be used everywhere
     @staticmethod
     def load_setting(setting_key):
-        # Loading Settings
-        with open(os.path.join(FF_Files.FF_LIB_FOLDER, "Settings")) as read_file:
-            # Loading Settings with JSON
-            setting_value = load(read_file)[setting_key]
-
-        return setting_value
+        return FF_Settings_Store.SETTINGS.get(setting_key)
 
 
 settings_window_global = None
@@ -0,0 +1,219 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the settings store, which keeps the Settings file in memory for the whole process
+#
+# The Settings file is loaded once and read again only if its modification time changed, like when another
+# File Find process or the user edited it. Changes are written after WRITE_DELAY seconds without further changes,
+# to a temporary file which then replaces the Settings file, so it is never half written.
+# Listeners are called with the key and the new value of every changed setting, FF_Settings turns them into Qt signals
+
+# Imports
+import atexit
+import logging
+import os
+import tempfile
+import threading
+from copy import deepcopy
+from json import load, dump, JSONDecodeError
+from time import monotonic
+
+# Projects Libraries
+import FF_Files
+
+# Seconds without changes before they are written
+WRITE_DELAY = 0.5
+# Seconds between testing if the Settings file was changed by someone else
+CHECK_INTERVAL = 1.0
+
+
+class SettingsStore:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.settings = None
+        # Modification time and size of the Settings file when it was loaded or written
+        self.file_state = None
+        self.last_check = 0.0
+        # Keys changed since the last write, they are kept if the file is changed by someone else meanwhile
+        self.changed_keys = set()
+        self.write_timer = None
+        self.listeners = []
+
+    # The Settings file, in the library folder at the time it is used
+    @staticmethod
+    def get_settings_file() -> str:
+        return os.path.join(FF_Files.FF_LIB_FOLDER, "Settings")
+
+    def get_file_state(self):
+        try:
+            file_stat = os.stat(self.get_settings_file())
+        except OSError:
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+    # Loading the Settings file, returns the keys whose values changed
+    def load(self) -> list[str]:
+        with self.lock:
+            try:
+                with open(self.get_settings_file()) as settings_file:
+                    loaded_settings = load(settings_file)
+                if not isinstance(loaded_settings, dict):
+                    raise ValueError("The Settings file doesn't contain a JSON object")
+            except (OSError, JSONDecodeError, UnicodeDecodeError, ValueError) as settings_error:
+                # Debug
+                logging.error(f"Couldn't load the settings, using the default settings: {settings_error}")
+                loaded_settings = deepcopy(FF_Files.DEFAULT_SETTINGS)
+
+            # Changes not written yet are kept
+            for key in self.changed_keys:
+                loaded_settings[key] = self.settings[key]
+
+            old_settings = self.settings or {}
+            self.settings = loaded_settings
+            self.file_state = self.get_file_state()
+            self.last_check = monotonic()
+
+            return [key for key, value in loaded_settings.items() if old_settings.get(key) != value]
+
+    # Loading the settings if they weren't loaded yet or were changed by someone else
+    def reload_if_changed(self):
+        with self.lock:
+            if self.settings is None:
+                self.load()
+                return
+            if monotonic() - self.last_check < CHECK_INTERVAL:
+                return
+            self.last_check = monotonic()
+            if self.get_file_state() == self.file_state:
+                return
+
+            # Debug
+            logging.info("The Settings file was changed, loading it again...")
+            changed_keys = self.load()
+
+        for key in changed_keys:
+            self.notify(key)
+
+    # Getting the value of a setting, lists and dicts are copied, so changing them doesn't change the setting.
+    # If the setting is missing, the default value is used
+    def get(self, key: str):
+        self.reload_if_changed()
+        with self.lock:
+            try:
+                value = self.settings[key]
+            except KeyError:
+                value = FF_Files.DEFAULT_SETTINGS[key]
+        if isinstance(value, (list, dict)):
+            return deepcopy(value)
+        return value
+
+    # Getting a setting with a type, values with another type are replaced with the default value
+    def get_typed(self, key: str, value_type: type):
+        value = self.get(key)
+        # bool is a subclass of int, so it isn't accepted as int
+        if not isinstance(value, value_type) or (value_type is int and isinstance(value, bool)):
+            # Debug
+            logging.error(f"Setting {key} should be {value_type.__name__}, not {value!r}, using the default value")
+            value = deepcopy(FF_Files.DEFAULT_SETTINGS[key])
+        return value
+
+    def get_bool(self, key: str) -> bool:
+        return self.get_typed(key, bool)
+
+    def get_int(self, key: str) -> int:
+        return self.get_typed(key, int)
+
+    def get_str(self, key: str) -> str:
+        return self.get_typed(key, str)
+
+    def get_list(self, key: str) -> list:
+        return self.get_typed(key, list)
+
+    def get_dict(self, key: str) -> dict:
+        return self.get_typed(key, dict)
+
+    # Changing a setting, it is written after WRITE_DELAY seconds
+    def set(self, key: str, value):
+        self.reload_if_changed()
+        with self.lock:
+            if key in self.settings and self.settings[key] == value:
+                return
+            self.settings[key] = deepcopy(value)
+            self.changed_keys.add(key)
+            self.schedule_write()
+
+        # Debug
+        logging.info(f"Changed {key} setting to : {value}")
+        self.notify(key)
+
+    # Changing one popup setting, which are stored together
+    def set_popup(self, popup_key: str, value):
+        popups = self.get_dict("popup")
+        popups[popup_key] = value
+        self.set("popup", popups)
+
+    # Starting the timer for writing again, so multiple changes are written once
+    def schedule_write(self):
+        with self.lock:
+            if self.write_timer is not None:
+                self.write_timer.cancel()
+            self.write_timer = threading.Timer(WRITE_DELAY, self.flush)
+            self.write_timer.daemon = True
+            self.write_timer.start()
+
+    # Writing the changes now, to a temporary file which replaces the Settings file
+    def flush(self):
+        with self.lock:
+            if self.write_timer is not None:
+                self.write_timer.cancel()
+                self.write_timer = None
+            if not self.changed_keys:
+                return
+
+            settings_file = self.get_settings_file()
+            try:
+                file_descriptor, temporary_file = tempfile.mkstemp(dir=os.path.dirname(settings_file),
+                                                                   prefix=".Settings.")
+                try:
+                    with os.fdopen(file_descriptor, "w") as write_file:
+                        dump(self.settings, write_file)
+                        write_file.flush()
+                        os.fsync(write_file.fileno())
+                    os.replace(temporary_file, settings_file)
+                except BaseException:
+                    os.remove(temporary_file)
+                    raise
+            except OSError as write_error:
+                # Debug
+                logging.error(f"Couldn't save the settings: {write_error}")
+                return
+
+            self.changed_keys.clear()
+            self.file_state = self.get_file_state()
+
+    def add_listener(self, listener):
+        with self.lock:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self.lock:
+            self.listeners.remove(listener)
+
+    # Calling the listeners with the new value
+    def notify(self, key: str):
+        with self.lock:
+            listeners = list(self.listeners)
+            value = self.settings.get(key)
+        for listener in listeners:
+            listener(key, deepcopy(value))
+
+
+# The store of the process
+SETTINGS = SettingsStore()
+# Writing changes that are still waiting when File Find exits
+atexit.register(SETTINGS.flush)
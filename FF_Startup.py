@@ -0,0 +1,74 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the startup timing report
+#
+# File-Find.py marks when every step of launching finished, measured from when this file was imported.
+# After the first paint and the work deferred until then, the report is logged and saved as STARTUP_REPORT_NAME
+# in the library folder, with the modules of File Find, which were loaded before the window was painted
+
+# Imports
+import logging
+import os
+import platform
+import sys
+import threading
+from json import dump
+from time import perf_counter, time
+
+# Time this file was imported, which is the first thing File-Find.py does,
+# nothing of File Find is imported here, so importing it is measured too
+LAUNCH_TIME = perf_counter()
+# Name of the report in the library folder
+STARTUP_REPORT_NAME = "Startup Report.json"
+# Every step as its name and the seconds after LAUNCH_TIME it finished
+STARTUP_TIMES: list[tuple[str, float]] = []
+STARTUP_LOCK = threading.Lock()
+# The modules of File Find, which were loaded at the first paint
+MODULES_AT_FIRST_PAINT: list[str] = []
+
+
+# Saving that a step finished
+def mark(step: str):
+    with STARTUP_LOCK:
+        STARTUP_TIMES.append((step, perf_counter() - LAUNCH_TIME))
+
+
+# Saving which modules of File Find were loaded, called at the first paint
+def mark_modules():
+    MODULES_AT_FIRST_PAINT[:] = sorted(module for module in sys.modules if module.startswith("FF_"))
+
+
+# Logging the report and saving it in the library folder
+def write_report():
+    # Projects Libraries, imported here so LAUNCH_TIME is taken before them
+    import FF_Files
+
+    with STARTUP_LOCK:
+        steps = []
+        step_start = 0.0
+        for step, step_end in STARTUP_TIMES:
+            steps.append({"step": step, "duration": step_end - step_start, "finished": step_end})
+            step_start = step_end
+
+    # Debug
+    step_lines = [f"{step['step']:<24} {round(step['duration'], 4):>8}s (at {round(step['finished'], 4)}s)"
+                  for step in steps]
+    logging.info("Startup times:\n" + "\n".join(step_lines))
+    logging.info(f"Modules loaded at the first paint: {', '.join(MODULES_AT_FIRST_PAINT)}")
+
+    try:
+        with open(os.path.join(FF_Files.FF_LIB_FOLDER, STARTUP_REPORT_NAME), "w") as report_file:
+            dump({"created": time(),
+                  "file_find_version": f"{FF_Files.VERSION_SHORT}[{FF_Files.VERSION}]",
+                  "platform": platform.platform(),
+                  "python": platform.python_version(),
+                  "steps": steps,
+                  "modules_at_first_paint": MODULES_AT_FIRST_PAINT}, report_file, indent=2)
+    except OSError as report_error:
+        logging.error(f"Couldn't save the startup report: {report_error}")
@@ -0,0 +1,126 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the code for moving files to the trash
+
+# Imports
+import logging
+import os
+import stat
+import subprocess
+from platform import mac_ver
+from sys import platform
+from time import strftime
+from urllib.parse import quote
+
+# Projects Libraries
+import FF_Files
+
+
+# Moving a file to the trash, raises OSError or subprocess.CalledProcessError if that's not possible
+def move_to_trash(path: str):
+    # On Linux the trash is used directly, so no process has to be started for every file
+    if platform == "linux":
+        move_to_freedesktop_trash(path)
+    else:
+        subprocess.run(get_trash_command(path), check=True)
+
+    # Debug
+    logging.debug(f"Moved {path} to trash")
+
+
+# The command to move a file to the trash on macOS and Windows
+def get_trash_command(path: str) -> list[str]:
+    if platform == "darwin":
+        # the trash command is only available on macOS 14+
+        # The alternative, apple scripts, requires an extra authorization from the user
+        # Getting the current macOS major version
+        if int(mac_ver()[0].split(".")[0]) >= 14:
+            return ["trash", path]
+        else:
+            return ["osascript", "-e", f"tell application \"Finder\" to delete POSIX file \"{path}\""]
+    elif platform == "win32" or platform == "cygwin":
+        return ["echo",
+                f"(new-object -comobject Shell.Application).Namespace(0).ParseName(\"{path}\")"
+                f".InvokeVerb(\"delete\")", "|", "powershell", "-command", "-"]
+    else:
+        raise OSError(f"Moving files to trash is not supported on {platform}")
+
+
+# Moving a file to the trash like described in the FreeDesktop.org Trash specification,
+# which is used by GNOME, KDE and most other desktops on Linux
+def move_to_freedesktop_trash(path: str):
+    path = os.path.abspath(path)
+    trash_folder, info_path = get_freedesktop_trash(path)
+
+    # Creating the folders of the trash
+    os.makedirs(os.path.join(trash_folder, "files"), mode=0o700, exist_ok=True)
+    os.makedirs(os.path.join(trash_folder, "info"), mode=0o700, exist_ok=True)
+
+    # Finding a unique name, the info file is created exclusively, so two files can't get the same name
+    base_name = os.path.basename(path)
+    trash_name = base_name
+    number = 1
+    while True:
+        info_file = os.path.join(trash_folder, "info", f"{trash_name}.trashinfo")
+        try:
+            info_descriptor = os.open(info_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+        except FileExistsError:
+            number += 1
+            trash_name = f"{base_name}.{number}"
+            continue
+        break
+
+    # Writing where the file was and when it was deleted, so it can be restored
+    with os.fdopen(info_descriptor, "w") as info:
+        info.write("[Trash Info]\n"
+                   f"Path={quote(info_path)}\n"
+                   f"DeletionDate={strftime('%Y-%m-%dT%H:%M:%S')}\n")
+
+    # Moving the file, which only renames it, because the trash is on the same device
+    try:
+        os.rename(path, os.path.join(trash_folder, "files", trash_name))
+    except OSError:
+        os.remove(info_file)
+        raise
+
+
+# Getting the trash for a file and the path that is stored in the info file.
+# Files on the device of the home folder are moved to the home trash,
+# files on other devices to the trash at the top of their device, because moving between devices would copy them
+def get_freedesktop_trash(path: str) -> tuple[str, str]:
+    home_trash = os.path.join(
+        os.environ.get("XDG_DATA_HOME") or os.path.join(FF_Files.USER_FOLDER, ".local", "share"), "Trash")
+    file_device = os.lstat(path).st_dev
+
+    # Testing the device of the home trash or of the first folder of it that exists
+    home_trash_parent = home_trash
+    while not os.path.exists(home_trash_parent):
+        home_trash_parent = os.path.dirname(home_trash_parent)
+    if os.stat(home_trash_parent).st_dev == file_device:
+        return home_trash, path
+
+    # Finding the mount point of the file
+    top_folder = os.path.dirname(path)
+    while not os.path.ismount(top_folder):
+        top_folder = os.path.dirname(top_folder)
+
+    # A trash created by an administrator, it must have the sticky bit set and can't be a link
+    admin_trash = os.path.join(top_folder, ".Trash")
+    try:
+        admin_trash_stat = os.lstat(admin_trash)
+    except OSError:
+        admin_trash_stat = None
+    if (admin_trash_stat is not None and stat.S_ISDIR(admin_trash_stat.st_mode)
+            and admin_trash_stat.st_mode & stat.S_ISVTX):
+        trash_folder = os.path.join(admin_trash, str(os.getuid()))
+    else:
+        trash_folder = os.path.join(top_folder, f".Trash-{os.getuid()}")
+
+    # In trashes at the top of a device, the path is stored relative to the top
+    return trash_folder, os.path.relpath(path, top_folder)
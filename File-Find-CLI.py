@@ -0,0 +1,350 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# Command line source file, execute this for searching without the user-interface:
+# python3 File-Find-CLI.py [directory] [filters] [--null|--jsonl] [--stats] [--export-stats FILE] [--profile]
+# It doesn't import PySide6, so it can be used in scripts, cron jobs and pipelines.
+# If the search daemon is running (python3 File-Find-CLI.py --start-daemon), searches are sent to it
+
+# Imports
+import argparse
+import logging
+import os
+import sys
+from json import dumps, load
+from time import perf_counter
+
+# Projects Libraries
+import FF_Daemon
+import FF_Files
+import FF_Profiling
+import FF_Search_Engine
+import FF_Settings_Store
+import FF_Search_Stats
+
+# Names of the "Search for" and "Sort by" options on the command line
+SEARCH_FOR_NAMES = {"all": "Files and Folders", "files": "only Files", "folders": "only Folders"}
+SORT_NAMES = {"none": "None (fastest)", "size": "File Size", "name": "File Name",
+              "modified": "Date Modified", "created": "Date Created", "path": "Path"}
+# Units a file size can end with
+SIZE_UNIT_NAMES = {"b": "Bytes", "kb": "KB", "mb": "MB", "gb": "GB"}
+
+
+# Creating the argument parser, every filter of the main window has an option
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="File-Find-CLI",
+        description="Search files with the filters of File Find and write the results to stdout. "
+                    "Options override the filters of a preset.")
+
+    parser.add_argument("directory", nargs="?", default=None,
+                        help="folder to search in (default: directory of the preset or the current folder)")
+    parser.add_argument("--filter", metavar="PRESET", help="load filters from a .FFFilter preset")
+
+    # Basic
+    parser.add_argument("--name", help="exact file name, supports wildcards like *.txt")
+    parser.add_argument("--name-contains", help="file name contains")
+    parser.add_argument("--types", nargs="+", choices=list(FF_Files.FILE_FORMATS.keys()), metavar="TYPE",
+                        help=f"file types to search for: {', '.join(FF_Files.FILE_FORMATS.keys())}")
+
+    # Properties
+    parser.add_argument("--contains", help="file content contains")
+    parser.add_argument("--created-from", metavar="YYYY-MM-DD", help="created on or after this day")
+    parser.add_argument("--created-to", metavar="YYYY-MM-DD", help="created on or before this day")
+    parser.add_argument("--modified-from", metavar="YYYY-MM-DD", help="modified on or after this day")
+    parser.add_argument("--modified-to", metavar="YYYY-MM-DD", help="modified on or before this day")
+    parser.add_argument("--size-min", metavar="SIZE", help="minimum file size, like 10MB (units: B, KB, MB, GB)")
+    parser.add_argument("--size-max", metavar="SIZE", help="maximum file size, like 1.5GB")
+
+    # Advanced
+    parser.add_argument("--extension", help="file extension, like txt")
+    parser.add_argument("--system-files", action="store_true", default=None,
+                        help="also search in system files (/Library and /System)")
+    parser.add_argument("--search-for", choices=SEARCH_FOR_NAMES.keys(), help="search for files, folders or both")
+
+    # Sorting
+    parser.add_argument("--sort", choices=SORT_NAMES.keys(),
+                        help="sort the results, the results are only written when the search finished")
+    parser.add_argument("--reverse", action="store_true", default=None, help="reverse the results")
+
+    # Cache
+    parser.add_argument("--new-cache", action="store_true", help="scan again instead of using the cache")
+
+    # Daemon
+    daemon = parser.add_mutually_exclusive_group()
+    daemon.add_argument("--no-daemon", action="store_true", help="search locally, even if the daemon is running")
+    daemon.add_argument("--start-daemon", action="store_true",
+                        help="run the search daemon, which keeps searched folders in memory, until it is stopped")
+    daemon.add_argument("--stop-daemon", action="store_true", help="stop the running search daemon")
+    daemon.add_argument("--daemon-status", action="store_true", help="show the folders the daemon keeps in memory")
+
+    # Output
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("-0", "--null", action="store_true", help="separate paths with NUL instead of newlines")
+    output.add_argument("--jsonl", action="store_true", help="write one JSON object per result")
+    parser.add_argument("--stats", action="store_true",
+                        help="write the time, entries, stat calls and bytes read of every stage to stderr")
+    parser.add_argument("--export-stats", metavar="FILE",
+                        help=f"export the stats of every stage as JSON, or as a Chrome trace "
+                             f"if FILE ends with {FF_Search_Stats.CHROME_TRACE_SUFFIX}")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile the search with cProfile and tracemalloc and save the profile and a report "
+                             f"in {FF_Profiling.PROFILES_FOLDER}, the search is never sent to the daemon")
+    parser.add_argument("-v", "--verbose", action="store_true", help="write debug messages to stderr")
+
+    return parser
+
+
+# Splitting a size like 10MB into its number and unit
+def split_file_size(size: str) -> tuple[str, str]:
+    size = size.strip()
+    number = size.rstrip("bBkKmMgG")
+    unit = size[len(number):].lower() or "b"
+    if unit not in SIZE_UNIT_NAMES:
+        raise FF_Search_Engine.SearchError("size", "SIZE ERROR!", f"Size Error!\n\n{size} has an unknown unit!")
+    return number.strip(), SIZE_UNIT_NAMES[unit]
+
+
+# Loading the filters of a .FFFilter preset with the same keys as the main window exports
+def load_preset(preset_path: str) -> dict:
+    with open(preset_path, "rb") as preset_file:
+        preset = load(preset_file)
+
+    # Debug
+    logging.info(f"Importing filters with version: {preset['VERSION']},"
+                 f" while local version: {FF_Files.FF_FILTER_VERSION}...")
+
+    return {"directory": preset["directory"].replace("USER_FOLDER", FF_Files.USER_FOLDER),
+            "name": preset["name"],
+            "name_contains": preset["name_contains"],
+            "file_types": preset["file_types"],
+            "file_contains": preset["file_contains"],
+            "c_date": (preset["dates"]["c_date_from"], preset["dates"]["c_date_to"]),
+            "m_date": (preset["dates"]["m_date_from"], preset["dates"]["m_date_to"]),
+            "size": (preset["size"]["min"], preset["size"]["max"],
+                     preset["size_unit"]["min"], preset["size_unit"]["max"]),
+            "file_extension": preset["file_extension"],
+            "hidden_files": preset["hidden_files"],
+            "search_for": FF_Search_Engine.SEARCH_FOR_OPTIONS[preset["files_folders"]],
+            "sort_by": FF_Search_Engine.SORT_OPTIONS[preset["sorting"]],
+            "reverse_sort": preset["reverse_sorting"]}
+
+
+# Creating the query from the preset and the options
+def create_query(arguments: argparse.Namespace) -> FF_Search_Engine.SearchQuery:
+    # Filters of the preset or the defaults of the main window
+    if arguments.filter is not None:
+        filters = load_preset(arguments.filter)
+    else:
+        filters = {"directory": os.getcwd(), "name": "", "name_contains": "", "file_types": None,
+                   "file_contains": "", "c_date": ("", ""), "m_date": ("", ""),
+                   "size": ("", "", "No Limit", "No Limit"), "file_extension": "", "hidden_files": False,
+                   "search_for": "Files and Folders", "sort_by": "None (fastest)", "reverse_sort": False}
+
+    # Options override the preset
+    if arguments.directory is not None:
+        filters["directory"] = arguments.directory
+    for option, filter_name in (("name", "name"), ("name_contains", "name_contains"), ("types", "file_types"),
+                                ("contains", "file_contains"), ("extension", "file_extension"),
+                                ("system_files", "hidden_files"), ("reverse", "reverse_sort")):
+        if getattr(arguments, option) is not None:
+            filters[filter_name] = getattr(arguments, option)
+    if arguments.search_for is not None:
+        filters["search_for"] = SEARCH_FOR_NAMES[arguments.search_for]
+    if arguments.sort is not None:
+        filters["sort_by"] = SORT_NAMES[arguments.sort]
+
+    # Dates
+    c_date_from, c_date_to = filters["c_date"]
+    m_date_from, m_date_to = filters["m_date"]
+    c_date = FF_Search_Engine.convert_date_range(arguments.created_from or c_date_from,
+                                                 arguments.created_to or c_date_to)
+    m_date = FF_Search_Engine.convert_date_range(arguments.modified_from or m_date_from,
+                                                 arguments.modified_to or m_date_to)
+
+    # File size
+    size_min, size_max, size_min_unit, size_max_unit = filters["size"]
+    if arguments.size_min is not None:
+        size_min, size_min_unit = split_file_size(arguments.size_min)
+    if arguments.size_max is not None:
+        size_max, size_max_unit = split_file_size(arguments.size_max)
+
+    # Loading excluded files
+    excluded_files = FF_Settings_Store.SETTINGS.get_list("excluded_files")
+
+    return FF_Search_Engine.SearchQuery(
+        directory=os.path.abspath(filters["directory"]),
+        name=filters["name"],
+        name_contains=filters["name_contains"],
+        file_extension=filters["file_extension"],
+        file_types=filters["file_types"],
+        file_contains=filters["file_contains"],
+        c_date=c_date,
+        m_date=m_date,
+        size=FF_Search_Engine.convert_file_size(size_min, size_max, size_min_unit, size_max_unit),
+        hidden_files=filters["hidden_files"],
+        search_for=filters["search_for"],
+        sort_by=filters["sort_by"],
+        reverse_sort=filters["reverse_sort"],
+        excluded_files=excluded_files,
+        new_cache_file=arguments.new_cache)
+
+
+# Writing the results with their types to stdout as bytes, so file names which aren't valid UTF-8 are written unchanged
+def write_results(results, output_format: str) -> int:
+    output = sys.stdout.buffer
+    result_count = 0
+
+    for result, result_type in results:
+        if output_format == "jsonl":
+            output.write(dumps({"path": result, "type": result_type}).encode() + b"\n")
+        elif output_format == "null":
+            output.write(os.fsencode(result) + b"\0")
+        else:
+            output.write(os.fsencode(result) + b"\n")
+        result_count += 1
+
+    output.flush()
+    return result_count
+
+
+# Writing the stats of every stage, the total includes starting and writing the results
+def write_stats(stats: dict | None, time_total: float, result_count: int, cache_file):
+    if stats:
+        print(FF_Search_Stats.format_stats(stats), file=sys.stderr)
+    print(f"Total: {round(time_total, 4)}s", file=sys.stderr)
+    print(f"Found {result_count} files and folders, cache: {cache_file}", file=sys.stderr)
+
+
+def main() -> int:
+    arguments = create_parser().parse_args()
+
+    # Setup Logging, only warnings are written, because stdout is used for the results
+    logging.basicConfig(level=logging.DEBUG if arguments.verbose else logging.WARNING,
+                        format="File Find [%(pathname)s] at %(asctime)s, %(levelname)s: %(message)s",
+                        stream=sys.stderr)
+
+    # File Operation, creates the same cache and settings as the main window
+    FF_Files.setup()
+
+    # Controlling the daemon
+    if arguments.start_daemon:
+        logging.getLogger().setLevel(logging.DEBUG if arguments.verbose else logging.INFO)
+        try:
+            FF_Daemon.SearchDaemon().run()
+        except KeyboardInterrupt:
+            pass
+        return 0
+    elif arguments.stop_daemon or arguments.daemon_status:
+        try:
+            status = FF_Daemon.send_command("stop" if arguments.stop_daemon else "status")
+        except FF_Daemon.DaemonUnavailable:
+            print("File-Find-CLI: The daemon isn't running", file=sys.stderr)
+            return 1
+        for index in status.get("indexes", []):
+            print(f"{index['root']}: {index['entries']} entries, {FF_Files.conv_file_size(index['memory'])}, "
+                  f"idle for {round(index['idle'])}s")
+        for loading_root in status.get("loading", []):
+            print(f"{loading_root}: loading...")
+        return 0
+
+    # Testing the filters
+    try:
+        query = create_query(arguments)
+        query.validate()
+    except FF_Search_Engine.SearchError as search_error:
+        # The message is written on one line
+        print(f"File-Find-CLI: {' '.join(search_error.message.split())}", file=sys.stderr)
+        return 2
+    except (OSError, ValueError, KeyError, IndexError) as preset_error:
+        print(f"File-Find-CLI: Can't load preset {arguments.filter}: {preset_error}", file=sys.stderr)
+        return 2
+
+    if arguments.profile:
+        exit_code, profile_file, report_file = FF_Profiling.profile("cli_search", search, arguments, query)
+        print(f"File-Find-CLI: Saved profile to {profile_file} and report to {report_file}", file=sys.stderr)
+        return exit_code
+
+    return search(arguments, query)
+
+
+# Searching and writing the results, returns the exit code
+def search(arguments: argparse.Namespace, query: FF_Search_Engine.SearchQuery) -> int:
+    time_start = perf_counter()
+
+    if arguments.jsonl:
+        output_format = "jsonl"
+    elif arguments.null:
+        output_format = "null"
+    else:
+        output_format = "newline"
+
+    # Results are written while they are found, if they don't need to be sorted
+    needs_sorting = query.sort_by != "None (fastest)" or query.reverse_sort
+
+    try:
+        # Sending the search to the daemon
+        if not arguments.no_daemon and not arguments.profile and FF_Daemon.is_running():
+            daemon_answer = {}
+
+            def daemon_results():
+                daemon_answer.update((yield from FF_Daemon.iter_search(query, sort=needs_sorting)))
+
+            result_count = write_results(daemon_results(), output_format)
+            cache_file = daemon_answer.get("cache_file")
+            stats = daemon_answer.get("stats")
+
+        elif not needs_sorting:
+            engine = FF_Search_Engine.SearchEngine(query)
+            result_count = write_results(((result, engine.type_dict[result]) for result in engine.iter_results()),
+                                         output_format)
+            cache_file = engine.cache_file
+            stats = engine.stats.as_dict()
+
+        else:
+            search_result = FF_Search_Engine.SearchEngine(query).run()
+            cache_file = search_result.cache_file
+            stats = search_result.stats
+            # The types are removed from the engine after running, so they are loaded from the cache
+            if output_format == "jsonl":
+                with open(cache_file) as opened_cache_file:
+                    type_dict = load(opened_cache_file)["type_dict"]
+            else:
+                type_dict = {}
+            result_count = write_results(((result, type_dict.get(result)) for result in search_result.found_path_list),
+                                         output_format)
+
+    # If the daemon couldn't search, like if the folder was deleted
+    except FF_Search_Engine.SearchError as search_error:
+        print(f"File-Find-CLI: {' '.join(search_error.message.split())}", file=sys.stderr)
+        return 2
+    # If the daemon stopped while searching
+    except FF_Daemon.DaemonUnavailable:
+        print("File-Find-CLI: The daemon stopped while searching", file=sys.stderr)
+        return 1
+
+    # If the output was closed, for example by head
+    except BrokenPipeError:
+        # Python would write another error when flushing stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+    if arguments.stats:
+        write_stats(stats, perf_counter() - time_start, result_count, cache_file)
+    if arguments.export_stats and stats:
+        try:
+            FF_Search_Stats.export_stats(stats, arguments.export_stats)
+        except OSError as export_error:
+            print(f"File-Find-CLI: Can't export stats to {arguments.export_stats}: {export_error}", file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,12 +11,17 @@
 # Imports
 import logging
 import gc
+import multiprocessing
 import os
 import sys
+import threading
 from sys import platform
 
+# Imported first, so the time needed for importing everything else is measured
+import FF_Startup
+
 # PySide6 Gui Imports
-from PySide6.QtCore import QEvent
+from PySide6.QtCore import QEvent, QObject, QTimer
 from PySide6.QtGui import QFileOpenEvent, QIcon
 from PySide6.QtWidgets import QApplication
 
@@ -24,9 +29,11 @@ from PySide6.QtWidgets import QApplication
 import FF_Files
 import FF_Additional_UI
 import FF_Main_UI
-import FF_Search
 
 if __name__ == "__main__":
+    # Needed for the processes decoding images, when File Find is built
+    multiprocessing.freeze_support()
+
     # Setup Logging
     logging.basicConfig(level=logging.DEBUG,
                         format="File Find [%(pathname)s] at %(asctime)s, %(levelname)s: %(message)s",
@@ -59,6 +66,8 @@ if __name__ == "__main__":
                 if path.endswith(".FFSearch"):
                     # Debug
                     logging.info(f"Opening {path}...")
+                    # Only the main window and what it needs is imported at launch, searching is imported when used
+                    import FF_Search
                     FF_Search.LoadSearch.open_file(path, None)
 
                 # Filter preset
@@ -78,20 +87,52 @@ if __name__ == "__main__":
 
             return super().event(event)
 
+    # Waiting for the main window to be painted the first time, then running what was deferred
+    class FirstPaintFilter(QObject):
+        def eventFilter(self, watched, event: QEvent) -> bool:
+            if event.type() == QEvent.Type.Paint:
+                watched.removeEventFilter(self)
+                # Running after the paint event was handled
+                QTimer.singleShot(0, after_first_paint)
+            return False
+
+    # Work, which isn't needed to show the main window
+    def after_first_paint():
+        FF_Startup.mark("first_paint")
+        FF_Startup.mark_modules()
+
+        # Testing the cache in the background, searches wait for it, because cache_test() holds a lock
+        def deferred_cache_test():
+            FF_Files.cache_test(is_launching=True)
+            FF_Startup.mark("cache_test")
+            FF_Startup.write_report()
+
+        threading.Thread(target=deferred_cache_test, daemon=True).start()
+
+        # Loading the completions of the directory entry
+        main_window.edit_directory.complete_path(FF_Files.SELECTED_DIR, check=False)
+
+
+    FF_Startup.mark("imports")
 
     app = CreateApp([])
+    FF_Startup.mark("qapplication")
 
     FF_Additional_UI.UIIcon(path=None, input_app=app)
 
     # Turning of automatic garbage collection because it makes the app crash
     gc.disable()
 
-    # File Operation
+    # File Operation, testing the cache is deferred until the main window was painted.
+    # Setting up can't be deferred, because the main window needs the updated settings and the icons in the assets
     FF_Files.setup()
-    FF_Files.cache_test(is_launching=True)
+    FF_Startup.mark("setup")
 
     # Launches the Main Window
     main_window = FF_Main_UI.MainWindow()
+    first_paint_filter = FirstPaintFilter()
+    main_window.Root_Window.installEventFilter(first_paint_filter)
+    FF_Startup.mark("main_window")
 
     app.setQuitOnLastWindowClosed(False)
 
@@ -0,0 +1,451 @@
+# This benchmark script is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This is a script used to benchmark parts of File Find and is not meant to be imported
+
+# Imports
+import os
+import platform
+import random
+import sys
+import shutil
+import tempfile
+from json import dump
+from time import perf_counter, time, strftime
+
+# Projects Libraries
+import FF_Compare_Engine
+import FF_Files
+import FF_Grouping
+import FF_Hashing
+import FF_Search_Engine
+import FF_Search_Format
+import FF_Settings_Store
+
+# Number of threads the hashing engine is benchmarked with
+HASHING_WORKERS = (1, 4, 16)
+# Number of processes the hashing engine is benchmarked with, 0 is hashing in the threads
+HASHING_PROCESSES = (0, 4)
+# Buffer sizes the hash algorithms are benchmarked with
+ALGORITHM_BUFFER_SIZES = (16384, 65536, 1048576)
+
+# Version of the results written by the tree benchmark
+BENCHMARK_RESULTS_VERSION = 1
+# Synthetic trees for the tree benchmark, entries are files and folders.
+# fan_out is the number of sub folders of every folder, depth the number of folder levels,
+# sizes is "empty", "uniform" (up to 64 KB) or "lognormal" (around 4 KB, up to 64 MB),
+# duplicate_ratio is the part of the files, which have the same content as another file,
+# names is "words" (like report_42.pdf), "numbered" (like file_42.pdf) or "similar" (like report_notes_v2.pdf)
+SCENARIOS = {"small": {"entries": 10_000, "fan_out": 8, "depth": 3, "sizes": "lognormal",
+                       "duplicate_ratio": 0.1, "names": "words", "seed": 1},
+             "large": {"entries": 1_000_000, "fan_out": 12, "depth": 4, "sizes": "lognormal",
+                       "duplicate_ratio": 0.05, "names": "words", "seed": 1},
+             "huge": {"entries": 5_000_000, "fan_out": 16, "depth": 4, "sizes": "empty",
+                      "duplicate_ratio": 0, "names": "numbered", "seed": 1}}
+# Words and extensions of the synthetic file names
+NAME_WORDS = ("report", "photo", "invoice", "backup", "notes", "draft", "summary", "music", "video", "data",
+              "project", "scan", "holiday", "budget", "letter", "thesis")
+NAME_EXTENSIONS = ("txt", "pdf", "png", "jpg", "mp3", "mp4", "zip", "py", "docx", "csv", "heic", "md")
+# Every file starts with this many random bytes, the rest is left empty (sparse), so creating files is fast
+CONTENT_HEADER_SIZE = 64
+# How often every search is run, the first run is cold and the fastest of the other runs is warm
+SEARCH_REPEATS = 3
+# Grouping by similar names compares every name with the index, so only this many files are grouped
+NAME_GROUPING_LIMIT = 10_000
+
+
+# Creating files for the duplicated files benchmark,
+# every file has exactly one duplicate, so every file has to be hashed completely
+def create_hashing_files(folder: str, file_count: int, file_size: int) -> list[str]:
+    paths = []
+    for file_number in range(file_count // 2):
+        content = os.urandom(file_size)
+        for copy in ("a", "b"):
+            path = os.path.join(folder, f"{file_number}_{copy}")
+            with open(path, "wb") as benchmark_file:
+                benchmark_file.write(content)
+            paths.append(path)
+    return paths
+
+
+# Benchmarking finding duplicated files by content with different numbers of threads
+def benchmark_hashing(file_count: int = 200, file_size: int = 4 * 1024 * 1024):
+    folder = tempfile.mkdtemp(prefix="FF_Benchmark_")
+    try:
+        paths = create_hashing_files(folder, file_count, file_size)
+        print(f"Hashing {file_count} files with {FF_Files.conv_file_size(file_count * file_size)} "
+              f"(files are probably in the page cache)")
+        print(f"{'Threads':>8} {'Processes':>10} {'Time':>10} {'Speed':>14}")
+
+        for workers in HASHING_WORKERS:
+            for processes in HASHING_PROCESSES:
+                engine = FF_Hashing.HashingEngine(workers=workers, processes=processes)
+
+                start = perf_counter()
+                _content_groups, stats = FF_Hashing.group_by_content(paths, engine)
+                time_needed = perf_counter() - start
+
+                bytes_read = sum(stage_stats["bytes_read"] for stage_stats in stats.values())
+                print(f"{workers:>8} {processes:>10} {round(time_needed, 3):>9}s "
+                      f"{round(bytes_read / time_needed / 1e6, 1):>9} MB/s")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+# Benchmarking every available hash algorithm with different buffer sizes by hashing one file,
+# the file is read once before, so that it is in the page cache and only the hashing is measured
+def benchmark_algorithms(file_size: int = 256 * 1024 * 1024):
+    folder = tempfile.mkdtemp(prefix="FF_Benchmark_")
+    try:
+        path = os.path.join(folder, "algorithm_benchmark")
+        with open(path, "wb") as benchmark_file:
+            # Writing in chunks, so the whole file doesn't have to be in memory
+            for _chunk in range(file_size // (1024 * 1024)):
+                benchmark_file.write(os.urandom(1024 * 1024))
+        FF_Hashing.hash_file(path)
+
+        print(f"Hashing one file with {FF_Files.conv_file_size(file_size)}, speed in GB/s")
+        print(f"{'Algorithm':>12}" + "".join(f"{FF_Files.conv_file_size(buffer_size):>12}"
+                                             for buffer_size in ALGORITHM_BUFFER_SIZES))
+
+        for algorithm in FF_Hashing.HASH_ALGORITHMS:
+            speeds = []
+            for buffer_size in ALGORITHM_BUFFER_SIZES:
+                start = perf_counter()
+                FF_Hashing.hash_file(path, algorithm, buffer_size)
+                speeds.append(file_size / (perf_counter() - start) / 1e9)
+            print(f"{algorithm:>12}" + "".join(f"{round(speed, 2):>12}" for speed in speeds))
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+# Creating a synthetic tree, the same scenario always creates the same tree.
+# Returns the files and the number of files, folders and bytes
+def create_tree(folder: str, entries: int, fan_out: int, depth: int, sizes: str, duplicate_ratio: float,
+                names: str, seed: int) -> tuple[list[str], dict]:
+    rng = random.Random(seed)
+
+    # Creating the folders level by level, at most a tenth of the entries are folders
+    folders = [folder]
+    level = [folder]
+    max_folders = max(1, entries // 10)
+    for _depth in range(depth):
+        next_level = []
+        for parent in level:
+            for sub_folder_number in range(fan_out):
+                if len(folders) > max_folders:
+                    break
+                sub_folder = os.path.join(parent, f"{rng.choice(NAME_WORDS)}_{sub_folder_number}")
+                os.mkdir(sub_folder)
+                folders.append(sub_folder)
+                next_level.append(sub_folder)
+        level = next_level
+
+    # Creating the files, distributed over all folders
+    paths = []
+    # Size and first bytes of unique files, duplicates copy them
+    unique_contents = []
+    total_size = 0
+    file_count = entries - (len(folders) - 1)
+    for file_number in range(file_count):
+        parent = folders[file_number % len(folders)]
+
+        # Name
+        extension = rng.choice(NAME_EXTENSIONS)
+        if names == "numbered":
+            name = f"file_{file_number}.{extension}"
+        elif names == "similar":
+            name = f"{rng.choice(NAME_WORDS)}_{rng.choice(NAME_WORDS)}_v{rng.randrange(5)}_{file_number}.{extension}"
+        else:
+            name = f"{rng.choice(NAME_WORDS)}_{file_number}.{extension}"
+        path = os.path.join(parent, name)
+
+        # Size and content
+        if unique_contents and rng.random() < duplicate_ratio:
+            size, header = rng.choice(unique_contents)
+        else:
+            if sizes == "uniform":
+                size = rng.randrange(64 * 1024)
+            elif sizes == "lognormal":
+                size = min(int(rng.lognormvariate(8.3, 2)), 64 * 1024 * 1024)
+            else:
+                size = 0
+            header = rng.randbytes(min(size, CONTENT_HEADER_SIZE))
+            unique_contents.append((size, header))
+
+        with open(path, "wb") as tree_file:
+            tree_file.write(header)
+            if size > len(header):
+                tree_file.truncate(size)
+        paths.append(path)
+        total_size += size
+
+    return paths, {"files": file_count, "folders": len(folders) - 1, "bytes": total_size}
+
+
+# Using a separate library folder, so the cache of File Find isn't changed
+def setup_library(folder: str):
+    FF_Files.FF_LIB_FOLDER = folder
+    FF_Files.CACHED_SEARCHES_FOLDER = os.path.join(folder, "Cached Searches")
+    FF_Files.CACHE_METADATA_FOLDER = os.path.join(folder, "Cache Metadata")
+    os.makedirs(FF_Files.CACHED_SEARCHES_FOLDER, exist_ok=True)
+    os.makedirs(FF_Files.CACHE_METADATA_FOLDER, exist_ok=True)
+    # Caches are never deleted while benchmarking
+    with open(os.path.join(folder, "Settings"), "w") as settings_file:
+        dump({**FF_Files.DEFAULT_SETTINGS, "cache": "Never"}, settings_file)
+    FF_Settings_Store.SETTINGS.load()
+
+
+# Representative searches, from only comparing names to reading the metadata of every file
+def get_benchmark_queries(root: str) -> dict[str, FF_Search_Engine.SearchQuery]:
+    return {"all": FF_Search_Engine.SearchQuery(root),
+            "name_contains": FF_Search_Engine.SearchQuery(root, name_contains="report"),
+            "name_wildcard": FF_Search_Engine.SearchQuery(root, name="*_1*.pdf"),
+            "file_types": FF_Search_Engine.SearchQuery(root, file_types=["Image"]),
+            "only_folders": FF_Search_Engine.SearchQuery(root, search_for="only Folders"),
+            "file_size": FF_Search_Engine.SearchQuery(root, size=(1000, 1000000)),
+            "date_modified": FF_Search_Engine.SearchQuery(root, m_date=(0, time() + 86400)),
+            "sort_by_size": FF_Search_Engine.SearchQuery(root, sort_by="File Size"),
+            "sort_by_path": FF_Search_Engine.SearchQuery(root, sort_by="Path")}
+
+
+# Running every search without cache (scanning with os.walk) and with the cache created by the first run
+def benchmark_search(root: str) -> list[dict]:
+    results = []
+    for cache_mode in ("uncached", "cached"):
+        for query_name, query in get_benchmark_queries(root).items():
+            query.new_cache_file = cache_mode == "uncached"
+
+            times = []
+            for _repeat in range(SEARCH_REPEATS):
+                start = perf_counter()
+                search_result = FF_Search_Engine.SearchEngine(query).run()
+                times.append((perf_counter() - start, search_result.timings))
+
+            warm_time, warm_timings = min(times[1:], key=lambda run: run[0])
+            results.append({"benchmark": "search", "query": query_name, "cache": cache_mode,
+                            "results": len(search_result.found_path_list),
+                            "cold": times[0][0], "warm": warm_time, "warm_timings": warm_timings})
+            print(f"{'search':>10} {query_name:>15} {cache_mode:>9} "
+                  f"cold: {round(times[0][0], 3):>8}s warm: {round(warm_time, 3):>8}s "
+                  f"({len(search_result.found_path_list)} results)")
+    return results
+
+
+# Removing files from the page cache, so they have to be read from the disk again.
+# They are written to the disk first, because changed pages aren't removed.
+# Returns False if that isn't possible on this system
+def drop_from_page_cache(paths: list[str]) -> bool:
+    if not hasattr(os, "posix_fadvise"):
+        return False
+
+    for path in paths:
+        try:
+            file_descriptor = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(file_descriptor)
+            os.posix_fadvise(file_descriptor, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(file_descriptor)
+    return True
+
+
+# Finding duplicated files by content, similar sizes and similar names like FindDuplicated does
+def benchmark_duplicated(paths: list[str]) -> list[dict]:
+    results = []
+
+    # Content, the first run reads the files from the disk, the second gets them from the page cache,
+    # the third fills the hash cache and the last one gets the hashes from it.
+    # The files were just created, so they are removed from the page cache first,
+    # if that isn't possible (posix_fadvise is missing on macOS and Windows), the first run is called "first"
+    first_run_name = "cold" if drop_from_page_cache(paths) else "first"
+    hash_cache = FF_Hashing.HashCache(os.path.join(FF_Files.FF_LIB_FOLDER, "Hash Cache.sqlite"))
+    for run_name, run_hash_cache in ((first_run_name, None), ("warm", None), ("fill cache", hash_cache),
+                                     ("cached", hash_cache)):
+        start = perf_counter()
+        content_groups, stats = FF_Hashing.group_by_content(paths, FF_Hashing.HashingEngine(), run_hash_cache)
+        time_needed = perf_counter() - start
+        results.append({"benchmark": "duplicated", "criteria": "content", "run": run_name, "time": time_needed,
+                        "groups": len(content_groups), "stats": stats})
+        print(f"{'duplicated':>10} {'content':>15} {run_name:>9} {round(time_needed, 3):>8}s "
+              f"({len(content_groups)} groups)")
+
+    # Size
+    start = perf_counter()
+    file_sizes = {path: FF_Files.get_file_size(path) for path in paths}
+    size_groups = FF_Grouping.group_by_similar_size(file_sizes, 0.9)
+    time_needed = perf_counter() - start
+    results.append({"benchmark": "duplicated", "criteria": "size", "time": time_needed, "groups": len(size_groups)})
+    print(f"{'duplicated':>10} {'size':>15} {'':>9} {round(time_needed, 3):>8}s ({len(size_groups)} groups)")
+
+    # Names, grouped like FindDuplicated does with a match percentage below 100
+    start = perf_counter()
+    name_index = FF_Grouping.NameIndex(cutoff=0.8)
+    name_groups = 0
+    for path in paths[:NAME_GROUPING_LIMIT]:
+        low_basename = os.path.basename(path).lower()
+        if low_basename not in name_index and name_index.closest_match(low_basename) is None:
+            name_index.add(low_basename)
+            name_groups += 1
+    time_needed = perf_counter() - start
+    results.append({"benchmark": "duplicated", "criteria": "name", "time": time_needed,
+                    "files": min(len(paths), NAME_GROUPING_LIMIT), "groups": name_groups})
+    print(f"{'duplicated':>10} {'name':>15} {'':>9} {round(time_needed, 3):>8}s ({name_groups} groups)")
+
+    return results
+
+
+# Comparing two snapshots of the tree, the second one has 1% of the files removed, added, modified and moved.
+# The snapshots are compared in memory and as saved searches, which are read block by block
+def benchmark_compare(paths: list[str], seed: int) -> list[dict]:
+    rng = random.Random(seed)
+
+    start = perf_counter()
+    second_metadata = FF_Files.get_snapshot_metadata(paths)
+    metadata_time = perf_counter() - start
+
+    # The first search, which is changed
+    first_files = list(paths)
+    first_metadata = [list(file_metadata) if file_metadata is not None else None for file_metadata in second_metadata]
+    changed = rng.sample(range(len(paths)), min(len(paths), max(4, len(paths) // 25)))
+    quarter = len(changed) // 4
+    for index in changed[:quarter]:
+        # Removed
+        first_files[index] = None
+    for index in changed[quarter:2 * quarter]:
+        # Moved, the metadata stays the same
+        first_files[index] = f"{paths[index]}.moved"
+    for index in changed[2 * quarter:3 * quarter]:
+        # Modified
+        if first_metadata[index] is not None and first_metadata[index][0] is not None:
+            first_metadata[index][0] += 1
+    first_metadata = [file_metadata for path, file_metadata in zip(first_files, first_metadata) if path is not None]
+    first_files = [path for path in first_files if path is not None]
+    for index in changed[3 * quarter:]:
+        # Added
+        first_files.append(f"{paths[index]}.added")
+        first_metadata.append(None)
+
+    # Comparing like CompareSearches.compare() without the user-interface
+    start = perf_counter()
+    comparison = FF_Compare_Engine.SearchComparison(is_snapshot=True)
+    comparison.compare(FF_Compare_Engine.iter_sorted_entries(first_files, first_metadata),
+                       FF_Compare_Engine.iter_sorted_entries(paths, second_metadata), read_first_metadata=False)
+    compare_time = perf_counter() - start
+
+    # Comparing the saved snapshots
+    save_folder = tempfile.mkdtemp(prefix="FF_Benchmark_")
+    try:
+        save_files = []
+        for save_name, save_paths, save_metadata in (("first", first_files, first_metadata),
+                                                     ("second", paths, second_metadata)):
+            save_files.append(os.path.join(save_folder, f"{save_name}.FFSearch"))
+            FF_Search_Format.write_search(save_files[-1], root=save_folder, matched_list=save_paths,
+                                          snapshot_metadata=save_metadata, marked_files=[], folder_mtimes={},
+                                          created=time())
+
+        start = perf_counter()
+        saved_comparison = FF_Compare_Engine.SearchComparison(is_snapshot=True)
+        saved_comparison.compare(FF_Compare_Engine.iter_saved_entries(save_files[0]),
+                                 FF_Compare_Engine.iter_saved_entries(save_files[1]), read_first_metadata=False)
+        saved_compare_time = perf_counter() - start
+    finally:
+        shutil.rmtree(save_folder)
+
+    print(f"{'compare':>10} {'metadata':>15} {'':>9} {round(metadata_time, 3):>8}s")
+    print(f"{'compare':>10} {'in memory':>15} {'':>9} {round(compare_time, 3):>8}s "
+          f"({len(comparison.modified_files)} modified, {len(comparison.moved_files)} moved)")
+    print(f"{'compare':>10} {'saved searches':>15} {'':>9} {round(saved_compare_time, 3):>8}s")
+    return [{"benchmark": "compare", "metadata_time": metadata_time, "compare_time": compare_time,
+             "saved_compare_time": saved_compare_time,
+             "added": len(comparison.files_only_in_first_search),
+             "removed": len(comparison.files_only_in_second_search),
+             "modified": len(comparison.modified_files),
+             "moved": len(comparison.moved_files)}]
+
+
+# Benchmarking searching, finding duplicated files and comparing searches on a synthetic tree,
+# the results are written as JSON, so they can be compared over time.
+# If tree_folder is passed, the tree is kept there and reused by the next run
+def benchmark_tree(scenario_name: str = "small", results_path: str | None = None, tree_folder: str | None = None):
+    scenario = SCENARIOS[scenario_name]
+    folder = tempfile.mkdtemp(prefix="FF_Benchmark_")
+    try:
+        setup_library(os.path.join(folder, "library"))
+
+        # Creating the tree or reusing it, if it was created with the same scenario
+        if tree_folder is not None:
+            root = os.path.abspath(tree_folder)
+        else:
+            root = os.path.join(folder, "tree")
+        marker_file = os.path.join(root, f".FF_Benchmark_{scenario_name}_{scenario['seed']}")
+        start = perf_counter()
+        if os.path.exists(marker_file):
+            # The files are found in the order they were created, so the results are the same
+            paths = sorted((entry for entry in
+                            (os.path.join(roots, file) for roots, _dirs, files in os.walk(root) for file in files)
+                            if entry != marker_file), key=lambda path: int(path.rsplit("_", 1)[1].split(".")[0]))
+            tree = {"files": len(paths), "reused": True}
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+            os.makedirs(root)
+            print(f"Creating {scenario['entries']} entries in {root}...")
+            paths, tree = create_tree(root, **scenario)
+            open(marker_file, "w").close()
+        tree["time"] = perf_counter() - start
+        print(f"Tree with {tree['files']} files ready in {round(tree['time'], 3)}s\n")
+
+        results = benchmark_search(root)
+        results.extend(benchmark_duplicated(paths))
+        results.extend(benchmark_compare(paths, scenario["seed"]))
+
+        if results_path is None:
+            results_path = f"benchmark_{scenario_name}_{strftime('%Y-%m-%d_%H-%M-%S')}.json"
+        with open(results_path, "w") as results_file:
+            dump({"VERSION": BENCHMARK_RESULTS_VERSION,
+                  "created": time(),
+                  "file_find_version": f"{FF_Files.VERSION_SHORT}[{FF_Files.VERSION}]",
+                  "platform": platform.platform(),
+                  "python": platform.python_version(),
+                  "cpu_count": os.cpu_count(),
+                  "scenario": {"name": scenario_name, **scenario},
+                  "tree": tree,
+                  "results": results}, results_file, indent=2)
+        print(f"\nResults written to {results_path}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def main():
+    # Which benchmark to run, both if nothing is passed
+    benchmark = sys.argv[1] if len(sys.argv) > 1 else "all"
+
+    # Synthetic trees are only benchmarked if asked for, because creating them takes long
+    if benchmark == "tree":
+        # Optionally the scenario, the results file and a folder to keep the tree in can be passed as arguments
+        benchmark_tree(*sys.argv[2:5])
+        return
+
+    if benchmark in ("all", "algorithms"):
+        benchmark_algorithms()
+        print()
+
+    if benchmark in ("all", "hashing"):
+        # Optionally the number of files and their size in MB can be passed as arguments
+        if len(sys.argv) == 4:
+            benchmark_hashing(int(sys.argv[2]), int(float(sys.argv[3]) * 1024 * 1024))
+        else:
+            benchmark_hashing()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the setup for the tests, which import the modules from the folder above
+
+# Imports
+import os
+import sys
+
+# The modules of File Find aren't a package, so their folder is added to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,87 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the tests for finding the files added since a search was saved, used by Compare to Now
+
+# Imports
+import os
+import time
+
+# Projects Libraries
+import FF_Files
+import FF_Search_Engine
+
+# Modification time the folders get before the search is saved, so adding a file always changes it
+OLD_MTIME = 946681200
+
+
+def create_file(path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as created_file:
+        created_file.write("File Find")
+
+
+def test_added_files_match_the_filters(tmp_path):
+    root = str(tmp_path)
+    create_file(os.path.join(root, "found", "report.txt"))
+    create_file(os.path.join(root, "found", "photo.jpg"))
+    os.makedirs(os.path.join(root, "nothing found"))
+    os.makedirs(os.path.join(root, "unchanged"))
+    for roots, dirs, _files in os.walk(root):
+        for folder in [roots] + [os.path.join(roots, directory) for directory in dirs]:
+            os.utime(folder, (OLD_MTIME, OLD_MTIME))
+
+    # Saving a search for text files
+    query = FF_Search_Engine.SearchQuery(root, file_extension="txt", search_for="only Files")
+    matched_list = [os.path.join(root, "found", "report.txt")]
+    type_dict = {os.path.join(root, folder): "folder" for folder in ("found", "nothing found", "unchanged")}
+    searched_folders = FF_Search_Engine.SearchEngine(query).get_searched_folders(type_dict)
+    folder_mtimes = FF_Files.get_folder_mtimes(matched_list, FF_Files.get_snapshot_metadata(matched_list),
+                                               searched_folders)
+    # Folders without found files are stored too
+    assert set(folder_mtimes) == {root, os.path.join(root, "found"), os.path.join(root, "nothing found"),
+                                  os.path.join(root, "unchanged")}
+
+    # Files created after the search was saved
+    # (the clock of the file system can be a few milliseconds behind)
+    time.sleep(0.05)
+    snapshot_time = time.time()
+    time.sleep(0.05)
+    create_file(os.path.join(root, "found", "new report.txt"))
+    create_file(os.path.join(root, "found", "new photo.jpg"))
+    create_file(os.path.join(root, "nothing found", "notes.txt"))
+    create_file(os.path.join(root, "new folder", "deeper", "summary.txt"))
+
+    added_types, listed_folders = FF_Files.find_added_files(matched_list, folder_mtimes, snapshot_time)
+    assert added_types[os.path.join(root, "new folder", "deeper")] == "folder"
+    assert added_types[os.path.join(root, "found", "new photo.jpg")] == "file"
+    assert os.path.join(root, "found", "report.txt") not in added_types
+    assert os.path.join(root, "found", "photo.jpg") not in added_types
+    # The unchanged folder isn't listed again
+    assert listed_folders == 3
+
+    # Only added files matching the filters of the search
+    filtered = FF_Search_Engine.SearchEngine(FF_Search_Engine.SearchQuery.from_dict(query.as_dict())).filter_paths(
+        list(added_types), added_types)
+    assert sorted(filtered) == sorted([os.path.join(root, "found", "new report.txt"),
+                                       os.path.join(root, "nothing found", "notes.txt"),
+                                       os.path.join(root, "new folder", "deeper", "summary.txt")])
+
+
+def test_query_from_saved_filters():
+    query = FF_Search_Engine.SearchQuery("/", name_contains="report", size=(10, 20), m_date=(0.0, 1.0))
+    # Saved with JSON, which stores tuples as lists
+    saved_filters = {key: list(value) if isinstance(value, tuple) else value for key, value in query.as_dict().items()}
+    assert FF_Search_Engine.SearchQuery.from_dict(saved_filters).as_dict() == query.as_dict()
+
+
+def test_searched_folders_skip_excluded_and_system_folders():
+    query = FF_Search_Engine.SearchQuery("/Users", excluded_files=["/Users/me/Excluded"])
+    type_dict = {"/Users/me": "folder", "/Users/me/report.txt": "file", "/Users/me/Excluded": "folder",
+                 "/Users/me/Excluded/deeper": "folder", "/Users/me/Library": "folder", "/Other": "folder"}
+    assert FF_Search_Engine.SearchEngine(query).get_searched_folders(type_dict) == ["/Users", "/Users/me"]
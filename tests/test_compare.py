@@ -0,0 +1,118 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the tests for comparing searches and saved searches
+
+# Imports
+import os
+import random
+from time import time
+
+import pytest
+
+# Projects Libraries
+import FF_Compare_Engine
+import FF_Search_Format
+
+
+def random_paths(generator: random.Random, count: int) -> list[str]:
+    return [f"/data/{generator.choice(['a', 'b', 'ä', 'B'])}/{generator.randrange(count * 2)}.txt"
+            for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_merge_join_is_the_same_as_sets(seed):
+    generator = random.Random(seed)
+    first_files = list(set(random_paths(generator, 300)))
+    second_files = list(set(random_paths(generator, 300)))
+
+    comparison = FF_Compare_Engine.SearchComparison(is_snapshot=False)
+    comparison.compare(FF_Compare_Engine.iter_sorted_entries(first_files),
+                       FF_Compare_Engine.iter_sorted_entries(second_files))
+
+    assert comparison.files_only_in_first_search == sorted(set(first_files) - set(second_files))
+    assert comparison.files_only_in_second_search == sorted(set(second_files) - set(first_files))
+    assert comparison.files_in_both_searches == len(set(first_files) & set(second_files))
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 65536])
+def test_snapshots_find_modified_and_moved_files(monkeypatch, batch_size):
+    monkeypatch.setattr(FF_Compare_Engine, "METADATA_BATCH_SIZE", batch_size)
+    # Size, modification time, device and inode
+    second_search = {"/data/kept": [1, 10, 1, 1],
+                     "/data/modified": [2, 20, 1, 2],
+                     "/data/old name": [3, 30, 1, 3],
+                     "/data/removed": [4, 40, 1, 4],
+                     "/data/folder": [None, None, 1, 5]}
+    first_search = {"/data/kept": [1, 10, 1, 1],
+                    "/data/modified": [2, 21, 1, 2],
+                    "/data/new name": [3, 30, 1, 3],
+                    "/data/added": [5, 50, 1, 6],
+                    "/data/folder": [None, None, 1, 5]}
+
+    comparison = FF_Compare_Engine.SearchComparison(is_snapshot=True)
+    comparison.compare(FF_Compare_Engine.iter_sorted_entries(list(first_search), list(first_search.values())),
+                       FF_Compare_Engine.iter_sorted_entries(list(second_search), list(second_search.values())),
+                       read_first_metadata=False)
+
+    assert comparison.files_only_in_first_search == ["/data/added"]
+    assert comparison.files_only_in_second_search == ["/data/removed"]
+    assert comparison.files_in_both_searches == 3
+    assert comparison.modified_files == ["/data/modified"]
+    assert comparison.moved_files == ["/data/new name"]
+    assert comparison.moved_from == {"/data/new name": "/data/old name"}
+
+
+def test_saved_searches_are_sorted_and_compared_block_by_block(tmp_path, monkeypatch):
+    # Small blocks, so the paths are in many blocks
+    monkeypatch.setattr(FF_Search_Format, "BLOCK_ENTRIES", 7)
+    generator = random.Random(0)
+    saved_searches = []
+    for save_name in ("first", "second"):
+        matched_list = list(set(random_paths(generator, 100)))
+        generator.shuffle(matched_list)
+        snapshot_metadata = [[generator.randrange(10), 0, 1, path_index] for path_index in range(len(matched_list))]
+        save_file = os.path.join(tmp_path, f"{save_name}.FFSearch")
+        FF_Search_Format.write_search(save_file, root="/data", matched_list=matched_list,
+                                      snapshot_metadata=snapshot_metadata, marked_files=[], folder_mtimes={},
+                                      created=time())
+        saved_searches.append((save_file, matched_list, snapshot_metadata))
+
+        # The saved entries are sorted and keep their metadata
+        assert FF_Compare_Engine.is_sorted_search(save_file)
+        assert list(FF_Compare_Engine.iter_saved_entries(save_file)) == list(
+            FF_Compare_Engine.iter_sorted_entries(matched_list, snapshot_metadata))
+
+    saved_comparison = FF_Compare_Engine.SearchComparison(is_snapshot=True)
+    saved_comparison.compare(FF_Compare_Engine.iter_saved_entries(saved_searches[0][0]),
+                             FF_Compare_Engine.iter_saved_entries(saved_searches[1][0]), read_first_metadata=False)
+    comparison = FF_Compare_Engine.SearchComparison(is_snapshot=True)
+    comparison.compare(FF_Compare_Engine.iter_sorted_entries(*saved_searches[0][1:]),
+                       FF_Compare_Engine.iter_sorted_entries(*saved_searches[1][1:]), read_first_metadata=False)
+    assert vars(saved_comparison) == vars(comparison)
+
+
+def test_saved_searches_keep_their_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(FF_Search_Format, "BLOCK_ENTRIES", 7)
+    generator = random.Random(1)
+    # Like a search sorted by size, the folder is a link to a folder, which has a size in the metadata
+    matched_list = list(set(random_paths(generator, 50)))
+    generator.shuffle(matched_list)
+    snapshot_metadata = [[path_index, 0, 1, path_index] for path_index in range(len(matched_list))]
+    type_dict = {path: "file" for path in matched_list}
+    type_dict[matched_list[3]] = "folder"
+    save_file = os.path.join(tmp_path, "sorted by size.FFSearch")
+    FF_Search_Format.write_search(save_file, root="/data", matched_list=matched_list,
+                                  snapshot_metadata=snapshot_metadata, marked_files=matched_list[:2],
+                                  folder_mtimes={}, created=time(), type_dict=type_dict)
+
+    saved_search = FF_Search_Format.read_search(save_file)
+    assert saved_search["matched_list"] == matched_list
+    assert saved_search["metadata"] == snapshot_metadata
+    assert saved_search["marked_files"] == matched_list[:2]
+    assert saved_search["type_dict"] == type_dict
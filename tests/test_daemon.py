@@ -0,0 +1,119 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the tests for loading the indexes of the search daemon
+
+# Imports
+import os
+import threading
+from time import time
+
+import pytest
+
+# Projects Libraries
+import FF_Daemon
+import FF_Files
+
+
+# Index which is only loaded when the test allows it
+class SlowIndex:
+    created = []
+    may_load = threading.Event()
+
+    def __init__(self, root: str, new_cache_file: bool = False):
+        SlowIndex.created.append(root)
+        if not SlowIndex.may_load.wait(timeout=10):
+            raise OSError("Loading wasn't allowed")
+        if root == "/broken":
+            raise OSError("Couldn't scan")
+        self.root = root
+        self.paths = [root]
+        # Scanned, because there is no cache
+        self.used_cache = False
+        self.memory = 0
+        self.last_used = time()
+
+    def is_valid(self):
+        return True
+
+    def contains(self, directory: str) -> bool:
+        return directory == self.root
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    monkeypatch.setattr(FF_Files, "cache_test", lambda is_launching: None)
+    monkeypatch.setattr(FF_Daemon, "WarmIndex", SlowIndex)
+    SlowIndex.created = []
+    SlowIndex.may_load = threading.Event()
+
+    search_daemon = FF_Daemon.SearchDaemon(os.path.join(tmp_path, "daemon.sock"))
+    yield search_daemon
+    search_daemon.server_close()
+
+
+# Calling get_index() in threads, returns the threads and a list the results are added to
+def get_index_in_threads(search_daemon, directories: list[str]):
+    results = []
+
+    def get_index(directory):
+        try:
+            results.append(search_daemon.get_index(directory, False))
+        except OSError as loading_error:
+            results.append(loading_error)
+
+    threads = [threading.Thread(target=get_index, args=(directory,)) for directory in directories]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def wait_for_loading(count: int):
+    for _attempt in range(1000):
+        if len(SlowIndex.created) >= count:
+            return
+        threading.Event().wait(0.01)
+
+
+def test_folder_is_loaded_once_without_blocking(daemon):
+    threads, results = get_index_in_threads(daemon, ["/data"] * 3 + ["/other"])
+    wait_for_loading(2)
+
+    # The status is answered while indexes are loaded
+    status = daemon.get_status()
+    assert sorted(status["loading"]) == ["/data", "/other"]
+    assert status["indexes"] == []
+
+    SlowIndex.may_load.set()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(SlowIndex.created) == ["/data", "/other"]
+    data_indexes = [index for index, _used_cache in results if index.root == "/data"]
+    assert len(data_indexes) == 3 and all(index is data_indexes[0] for index in data_indexes)
+    # The folder was scanned for these searches
+    assert not any(used_cache for _index, used_cache in results)
+    assert daemon.get_status()["loading"] == []
+    # The next search uses the index in memory
+    assert daemon.get_index("/data", False) == (data_indexes[0], True)
+
+
+def test_loading_error_is_raised_for_every_search(daemon):
+    threads, results = get_index_in_threads(daemon, ["/broken"] * 2)
+    wait_for_loading(1)
+    SlowIndex.may_load.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 2 and all(isinstance(result, OSError) for result in results)
+    # The next search tries again
+    loading_count = len(SlowIndex.created)
+    with pytest.raises(OSError):
+        daemon.get_index("/broken", False)
+    assert len(SlowIndex.created) == loading_count + 1
+    assert daemon.get_status()["loading"] == []
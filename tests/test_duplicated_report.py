@@ -0,0 +1,37 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the tests for exporting and loading reports of duplicated files
+
+# Imports
+import os
+
+import pytest
+
+# Projects Libraries
+import FF_Duplicated_Report
+
+
+@pytest.mark.parametrize("report_name", ["report.jsonl", "report.csv"])
+def test_report_keeps_the_order_of_the_files(tmp_path, report_name):
+    # Not sorted, the first file of a group is the one that is kept
+    groups = [("b-group", [os.path.join(tmp_path, name) for name in ("kept", "copy 3", "copy 1", "copy 2")]),
+              ("a-group", [os.path.join(tmp_path, name) for name in ("z", "a")])]
+    for _group_key, group_members in groups:
+        for member in group_members:
+            with open(member, "w") as member_file:
+                member_file.write("File Find")
+
+    report_file = os.path.join(tmp_path, report_name)
+    with FF_Duplicated_Report.DuplicatedReportWriter(report_file, str(tmp_path)) as report_writer:
+        for group_key, group_members in groups:
+            report_writer.add_group(group_key, group_members)
+
+    assert list(FF_Duplicated_Report.read_report_groups(report_file)) == groups
+    header = FF_Duplicated_Report.read_report_header(report_file)
+    assert (header["groups"], header["files"], header["wasted_bytes"]) == (2, 6, 4 * len("File Find"))
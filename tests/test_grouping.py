@@ -0,0 +1,114 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the tests for FF_Grouping
+
+# Imports
+import random
+from difflib import get_close_matches
+
+import pytest
+
+# Projects Libraries
+import FF_Grouping
+
+
+# Random names from a small alphabet, so many of them are similar
+def random_names(seed: int, count: int) -> list[str]:
+    generator = random.Random(seed)
+    names = []
+    for _ in range(count):
+        stem = "".join(generator.choice("abcde_01") for _ in range(generator.randrange(0, 14)))
+        names.append(stem + generator.choice(["", ".pdf", ".txt", "_copy", " (1)"]))
+    return names
+
+
+# Grouping the names like FF_Duplicated, returns the number of names that were looked at for every name
+def group_names(names: list[str], cutoff: float) -> float:
+    name_index = FF_Grouping.NameIndex(cutoff)
+    for name in names:
+        if name not in name_index and name_index.closest_match(name) is None:
+            name_index.add(name)
+    return name_index.checked_names / len(names)
+
+
+@pytest.mark.parametrize("cutoff", [0.0, 0.5, 0.6, 0.75, 0.8, 0.9, 1.0])
+@pytest.mark.parametrize("seed", range(4))
+def test_closest_match_is_the_same_as_difflib(seed, cutoff):
+    name_index = FF_Grouping.NameIndex(cutoff)
+    indexed_names = []
+    for name in random_names(seed, 300):
+        expected = get_close_matches(name, indexed_names, n=1, cutoff=cutoff)
+        assert name_index.closest_match(name) == (expected[0] if expected else None)
+        if name not in name_index:
+            name_index.add(name)
+            indexed_names.append(name)
+    assert len(name_index) == len(indexed_names)
+
+
+def test_closest_match_of_empty_index_and_names():
+    name_index = FF_Grouping.NameIndex(0.8)
+    assert name_index.closest_match("report.pdf") is None
+    name_index.add("")
+    assert "" in name_index
+    assert name_index.closest_match("") == ""
+    assert name_index.closest_match("report.pdf") is None
+
+
+@pytest.mark.parametrize("total_length", range(0, 60))
+@pytest.mark.parametrize("threshold", [0.0, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 1.0])
+def test_required_matches(total_length, threshold):
+    matches = FF_Grouping.required_matches(total_length, threshold)
+    if total_length:
+        assert 2.0 * matches / total_length >= threshold
+        assert matches == 0 or 2.0 * (matches - 1) / total_length < threshold
+
+
+# Many similar names (like report_123.pdf) used to compare every name with most of the others
+@pytest.mark.parametrize("cutoff", [0.8, 0.9])
+def test_grouping_similar_names_scales(cutoff):
+    small = group_names([f"report_{number}.pdf" for number in range(2000)], cutoff)
+    large = group_names([f"report_{number}.pdf" for number in range(8000)], cutoff)
+
+    # Comparing with all or most of the names would look at thousands of names for every name
+    assert large < 30
+    assert large < small * 4
+
+
+def test_group_by_similar_size_boundaries():
+    # With 80%, files up to 1.2 times as big as the parent are in its group
+    assert FF_Grouping.group_by_similar_size({"a": 100, "b": 120, "c": 121, "d": 145, "e": 146}, 0.8) == {
+        100: ["a", "b"], 121: ["c", "d"], 146: ["e"]}
+    # With 100%, only files with exactly the same size
+    assert FF_Grouping.group_by_similar_size({"a": 100, "b": 100, "c": 101}, 1.0) == {
+        100: ["a", "b"], 101: ["c"]}
+
+
+def test_group_by_similar_size_two_files_form_a_group():
+    assert FF_Grouping.group_by_similar_size({"small": 1000, "big": 1100}, 0.9) == {1000: ["small", "big"]}
+
+
+def test_group_by_similar_size_empty_and_unreadable_files():
+    # Empty files only match other empty files, files with a negative size couldn't be read and are skipped
+    assert FF_Grouping.group_by_similar_size({"empty": 0, "also empty": 0, "one byte": 1, "unreadable": -1}, 0.5) == {
+        0: ["also empty", "empty"], 1: ["one byte"]}
+    assert FF_Grouping.group_by_similar_size({"unreadable": -1}, 0.5) == {}
+    assert FF_Grouping.group_by_similar_size({}, 0.5) == {}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_group_by_similar_size_does_not_depend_on_the_order(seed):
+    generator = random.Random(seed)
+    file_sizes = [(f"file{number}", generator.choice([0, 0, 50, 100, 100, 110, 111, 500, -1])) for number in range(40)]
+    expected = FF_Grouping.group_by_similar_size(dict(file_sizes), 0.9)
+
+    generator.shuffle(file_sizes)
+    assert FF_Grouping.group_by_similar_size(dict(file_sizes), 0.9) == expected
+    # Files with the same size are sorted by their path, so the parent is always the same
+    for files in expected.values():
+        assert files == sorted(files, key=lambda file: (dict(file_sizes)[file], file))
@@ -0,0 +1,70 @@
+# This source file is a part of File Find made by Pixel-Master
+#
+# Copyright 2022-2025 Pixel-Master
+#
+# This software is licensed under the "GPLv3" License as described in the "LICENSE" file,
+# which should be included with this package. The terms are also available at
+# http://www.gnu.org/licenses/gpl-3.0.html
+
+# This file contains the tests for the hashing engine and finding duplicated files by their content
+
+# Imports
+import os
+import threading
+import time
+
+import pytest
+
+# Projects Libraries
+import FF_Hashing
+
+
+def create_file(path: str, content: bytes):
+    with open(path, "wb") as created_file:
+        created_file.write(content)
+
+
+def failing_jobs():
+    for job_number in range(5):
+        yield 0, job_number, pow, (job_number, 2)
+    raise OSError("Listing failed")
+
+
+def test_error_in_jobs_is_raised_after_the_results():
+    results = []
+    with pytest.raises(OSError, match="Listing failed"):
+        for job_key, result in FF_Hashing.HashingEngine(workers=2).run(failing_jobs()):
+            results.append((job_key, result))
+    assert sorted(results) == [(job_number, job_number ** 2) for job_number in range(5)]
+
+
+def test_stopping_early_finishes_all_threads():
+    started_jobs = []
+    engine = FF_Hashing.HashingEngine(workers=2, queue_size=1)
+    jobs = ((0, job_number, started_jobs.append, (job_number,)) for job_number in range(1000))
+
+    for _result in engine.run(jobs):
+        break
+
+    # The workers and the submitter stop instead of waiting for space in the queue
+    for _check in range(50):
+        if not any(thread.name.startswith("FF_Hashing") for thread in threading.enumerate()):
+            break
+        time.sleep(FF_Hashing.CANCEL_CHECK_INTERVAL)
+    assert not any(thread.name.startswith("FF_Hashing") for thread in threading.enumerate())
+    assert len(started_jobs) < 1000
+
+
+def test_groups_are_the_same_with_processes(tmp_path):
+    paths = []
+    for file_number in range(12):
+        paths.append(os.path.join(tmp_path, f"file {file_number}"))
+        create_file(paths[-1], str(file_number % 3).encode() * 1000)
+
+    thread_groups, _stats = FF_Hashing.group_by_content(list(reversed(paths)), FF_Hashing.HashingEngine(workers=4))
+    process_groups, _stats = FF_Hashing.group_by_content(
+        list(reversed(paths)), FF_Hashing.HashingEngine(workers=4, processes=2))
+    # Sorted, so the order in which the files were hashed doesn't matter
+    assert list(thread_groups.items()) == list(process_groups.items())
+    assert all(group == sorted(group) for group in thread_groups.values())
+    assert sorted(map(len, thread_groups.values())) == [4, 4, 4]